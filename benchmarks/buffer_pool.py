@@ -0,0 +1,88 @@
+"""
+Benchmark BufferPool: pipeline + before-after untuk banyak gambar
+berukuran sama, dengan dan tanpa pool buffer.
+
+Gambar contoh di input/ diperbesar ke ukuran yang sama lalu diproses
+bergantian (seperti batch foto dari satu kamera). Dicatat per gambar:
+- waktu (ms),
+- minor page fault — halaman memori baru yang disentuh; alokasi
+  buffer besar yang dilepas & diminta ulang ke OS muncul di sini,
+- alokasi buffer baru dari pool (mode pool saja).
+
+Jalankan dari root repo:
+    python benchmarks/buffer_pool.py --sizes 2 8 --count 10
+    python benchmarks/buffer_pool.py --sizes 12 --fast
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pengolahan_citra import (enhancement_pipeline, make_before_after_image,  # noqa: E402
+                              load_face_cascade, list_image_files, BufferPool)
+
+
+def resize_to_shape(img, shape):
+    return cv2.resize(img, (shape[1], shape[0]), interpolation=cv2.INTER_CUBIC)
+
+
+def minor_faults():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+
+
+def run(images, cascade, options, pool):
+    """Memproses semua gambar; mengembalikan (ms/gambar, fault/gambar)."""
+    t0, f0 = time.perf_counter(), minor_faults()
+    for img in images:
+        out = enhancement_pipeline(img, cascade, fused=True, pool=pool, **options)
+        ba = make_before_after_image(img, out, pool=pool)
+        if pool is not None:
+            pool.release(out)
+            pool.release(ba)
+    n = len(images)
+    return (time.perf_counter() - t0) * 1000 / n, (minor_faults() - f0) / n
+
+
+def main(argv=None):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--input", default=os.path.join(root, "input"))
+    ap.add_argument("--sizes", type=float, nargs="+", default=[2, 8],
+                    help="ukuran gambar uji (megapixel)")
+    ap.add_argument("--count", type=int, default=10, help="jumlah gambar per ukuran")
+    ap.add_argument("--fast", action="store_true",
+                    help="tanpa denoise/face beauty/HDR (biaya alokasi lebih dominan)")
+    args = ap.parse_args(argv)
+
+    cascade = load_face_cascade()
+    options = {}
+    if args.fast:
+        options = dict(do_denoise=False, do_face_beauty=False, do_hdr=False)
+    sources = [cv2.imread(os.path.join(args.input, f)) for f in list_image_files(args.input)]
+    sources = [s for s in sources if s is not None]
+
+    print(f"{'MP':>5}{'mode':>8}{'ms/gbr':>10}{'fault/gbr':>11}{'alokasi':>9}")
+    for mp in args.sizes:
+        h, w = sources[0].shape[:2]
+        scale = np.sqrt(mp * 1e6 / (h * w))
+        shape = (int(h * scale), int(w * scale))
+        images = [resize_to_shape(sources[i % len(sources)], shape) for i in range(args.count)]
+
+        # pemanasan: cascade, LUT label, dsb.
+        run(images[:1], cascade, options, None)
+
+        ms, faults = run(images, cascade, options, None)
+        print(f"{mp:>5g}{'biasa':>8}{ms:>10.1f}{faults:>11.0f}{'-':>9}")
+
+        pool = BufferPool()
+        ms, faults = run(images, cascade, options, pool)
+        print(f"{mp:>5g}{'pool':>8}{ms:>10.1f}{faults:>11.0f}{pool.allocations:>9}")
+
+
+if __name__ == "__main__":
+    main()
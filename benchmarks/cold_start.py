@@ -0,0 +1,113 @@
+"""
+Waktu cold start: proses Python baru untuk setiap pengukuran.
+
+Diukur (median & minimum dari --repeat kali, setelah satu pemanasan
+yang juga menulis cache bytecode .pyc):
+- python      : interpreter kosong (batas bawah),
+- import      : `import pengolahan_citra` (library tanpa GUI),
+- cli --help  : parse argumen command line,
+- cli 1 gambar: batch headless satu gambar, dari start sampai exit.
+Juga dicek modul berat yang ikut dimuat oleh import library dan CLI
+batch (tkinter, PIL.ImageTk, http.server, ...) — seharusnya tidak ada.
+
+Cache bytecode selalu diaktifkan untuk proses yang diukur
+(PYTHONDONTWRITEBYTECODE diabaikan), seperti paket yang terpasang.
+
+Jalankan dari root repo:
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --image input/noise.jpg --max-ms 1500
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modul yang hanya dibutuhkan GUI / mode --serve
+HEAVY_MODULES = ('tkinter', 'PIL.ImageTk', 'http.server', 'socketserver')
+
+_LOADED = ("import sys; sys.argv = {argv!r}; "
+           "exec({code!r}); "
+           "print('dimuat:', ','.join(m for m in {heavy!r} if m in sys.modules))")
+
+
+def environment():
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    return env
+
+
+def timed_runs(cmd, repeat, env):
+    """(median ms, minimum ms) dari repeat kali menjalankan cmd."""
+    subprocess.run(cmd, env=env, cwd=ROOT, capture_output=True, check=True)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, env=env, cwd=ROOT, capture_output=True, check=True)
+        times.append((time.perf_counter() - t0) * 1000)
+    return float(np.median(times)), min(times)
+
+
+def heavy_loaded(code, argv, env):
+    """Modul HEAVY_MODULES yang dimuat setelah menjalankan code."""
+    out = subprocess.run([sys.executable, "-c",
+                          _LOADED.format(argv=argv, code=code, heavy=HEAVY_MODULES)],
+                         env=env, cwd=ROOT, capture_output=True, text=True, check=True)
+    line = [l for l in out.stdout.splitlines() if l.startswith('dimuat:')][-1]
+    return line.split(':', 1)[1].strip()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--image", default=os.path.join(ROOT, "input", "noise.jpg"),
+                    help="gambar untuk pengukuran CLI satu gambar")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--max-ms", type=float,
+                    help="batas median CLI satu gambar; exit code 1 jika dilampaui")
+    args = ap.parse_args(argv)
+
+    env = environment()
+    work = tempfile.mkdtemp(prefix="cold_start_")
+    try:
+        src = os.path.join(work, "in")
+        os.makedirs(src)
+        shutil.copy(args.image, src)
+        cli_args = ["-i", src, "-o", os.path.join(work, "out"), "--force"]
+        py = sys.executable
+        cases = [
+            ('python', [py, "-c", "pass"]),
+            ('import', [py, "-c", "import pengolahan_citra"]),
+            ('cli --help', [py, "-m", "pengolahan_citra", "--help"]),
+            ('cli 1 gambar', [py, "-m", "pengolahan_citra"] + cli_args),
+        ]
+        print(f"{'pengukuran':<16}{'median ms':>10}{'min ms':>9}")
+        result = {}
+        for name, cmd in cases:
+            med, best = timed_runs(cmd, args.repeat, env)
+            result[name] = med
+            print(f"{name:<16}{med:>10.0f}{best:>9.0f}")
+
+        print()
+        loaded_lib = heavy_loaded("import pengolahan_citra", ["x"], env)
+        loaded_cli = heavy_loaded(
+            "from pengolahan_citra.cli import main; main(sys.argv[1:])", ["x"] + cli_args, env)
+        print(f"modul GUI/layanan setelah import : {loaded_lib or '-'}")
+        print(f"modul GUI/layanan setelah CLI    : {loaded_cli or '-'}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    if args.max_ms and result['cli 1 gambar'] > args.max_ms:
+        print(f"CLI satu gambar {result['cli 1 gambar']:.0f} ms > batas {args.max_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
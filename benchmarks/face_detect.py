@@ -0,0 +1,104 @@
+"""
+Benchmark deteksi wajah: resolusi penuh vs salinan yang diperkecil
+(detect_faces dengan FACE_DETECT_MAX_SIDE), plus cache kotak wajah.
+
+Gambar contoh di input/ diperbesar ke beberapa ukuran (megapixel).
+Untuk tiap gambar dicatat waktu deteksi dan kecocokan kotak (IoU)
+terhadap deteksi resolusi penuh.
+
+Jalankan dari root repo:
+    python benchmarks/face_detect.py --sizes 2 8 24
+"""
+import os
+import sys
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pengolahan_citra import (detect_faces, load_face_cascade, FaceBoxCache,  # noqa: E402
+                              cached_face_detector, list_image_files, FACE_DETECT_MAX_SIDE)
+
+
+def resize_to_mp(img, mp):
+    """Memperbesar/memperkecil gambar ke ukuran kira-kira mp megapixel."""
+    h, w = img.shape[:2]
+    scale = np.sqrt(mp * 1e6 / (h * w))
+    return cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_CUBIC)
+
+
+def iou(a, b):
+    """Intersection-over-union dua kotak (x, y, w, h)."""
+    ax2, ay2 = a[0] + a[2], a[1] + a[3]
+    bx2, by2 = b[0] + b[2], b[1] + b[3]
+    iw = max(0, min(ax2, bx2) - max(a[0], b[0]))
+    ih = max(0, min(ay2, by2) - max(a[1], b[1]))
+    inter = iw * ih
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+
+def match(ref, test):
+    """
+    Mencocokkan kotak test ke kotak ref (greedy, IoU terbesar).
+    Mengembalikan (jumlah cocok dengan IoU >= 0.5, rata-rata IoU).
+    """
+    used = set()
+    ious = []
+    for r in ref:
+        best, best_j = 0.0, None
+        for j, t in enumerate(test):
+            if j not in used and iou(r, t) > best:
+                best, best_j = iou(r, t), j
+        if best_j is not None:
+            used.add(best_j)
+        ious.append(best)
+    hits = sum(1 for v in ious if v >= 0.5)
+    return hits, (float(np.mean(ious)) if ious else 1.0)
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main(argv=None):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--input", default=os.path.join(root, "input"))
+    ap.add_argument("--sizes", type=float, nargs="+", default=[2, 8, 24],
+                    help="ukuran gambar uji (megapixel)")
+    ap.add_argument("--repeat", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    cascade = load_face_cascade()
+    print(f"max_side = {FACE_DETECT_MAX_SIDE}")
+    print(f"{'gambar':<22}{'MP':>5}{'full (s)':>10}{'kecil (s)':>11}{'cache (s)':>11}"
+          f"{'speedup':>9}{'wajah':>7}{'cocok':>7}{'IoU':>6}")
+
+    for fname in list_image_files(args.input):
+        src = cv2.imread(os.path.join(args.input, fname))
+        if src is None:
+            continue
+        for mp in args.sizes:
+            img = resize_to_mp(src, mp)
+            t_full, ref = timed(lambda: detect_faces(img, cascade, max_side=None), args.repeat)
+            t_small, test = timed(lambda: detect_faces(img, cascade), args.repeat)
+
+            detect = cached_face_detector(cascade, FaceBoxCache(), fname)
+            detect(img)
+            t_cache, _ = timed(lambda: detect(img), args.repeat)
+
+            hits, mean_iou = match(ref, test)
+            print(f"{fname:<22}{mp:>5g}{t_full:>10.3f}{t_small:>11.3f}{t_cache:>11.6f}"
+                  f"{t_full / t_small:>8.1f}x{len(ref):>4}/{len(test):<2}{hits:>5}{mean_iou:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
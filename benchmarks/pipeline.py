@@ -0,0 +1,200 @@
+"""
+Benchmark per tahap pipeline pada gambar contoh di input/.
+
+Setiap gambar diperbesar ke beberapa ukuran (1–50 megapixel), lalu
+tiap fungsi tahap (auto_white_balance_grayworld … final_color_tone),
+enhancement_pipeline lengkap, dan make_before_after_image diukur:
+- latensi (median & minimum dari --repeat kali),
+- throughput (megapixel per detik, dari median),
+- puncak memori alokasi array (tracemalloc; buffer internal OpenCV
+  yang tidak berupa array numpy tidak ikut terhitung).
+
+Tiap tahap menerima output tahap sebelumnya, sama seperti di dalam
+pipeline. Hasil disimpan ke JSON; dengan --baseline hasil dibandingkan
+dengan file JSON sebelumnya dan tahap yang melambat lebih dari
+--threshold ditandai sebagai regresi (exit code 1).
+
+Jalankan dari root repo:
+    python benchmarks/pipeline.py --sizes 1 4 12 -o bench.json
+    python benchmarks/pipeline.py --sizes 1 4 12 --baseline bench.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pengolahan_citra import (auto_white_balance_grayworld, auto_exposure_stretch,  # noqa: E402
+                              bilateral_denoise, face_beauty_filter, hdr_like_local_contrast,
+                              unsharp_mask, final_color_tone, enhancement_pipeline,
+                              make_before_after_image, load_face_cascade, list_image_files)
+
+
+DEFAULT_SIZES = [1, 4, 12, 24, 50]
+
+
+def resize_to_mp(img, mp):
+    """Memperbesar/memperkecil gambar ke ukuran kira-kira mp megapixel."""
+    h, w = img.shape[:2]
+    scale = np.sqrt(mp * 1e6 / (h * w))
+    return cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_CUBIC)
+
+
+def stage_list(cascade):
+    """
+    Daftar (nama, fn) tahap dengan parameter yang sama seperti di
+    enhancement_pipeline. fn menerima output tahap sebelumnya.
+    """
+    return [
+        ('auto_white_balance_grayworld', auto_white_balance_grayworld),
+        ('auto_exposure_stretch', auto_exposure_stretch),
+        ('bilateral_denoise', bilateral_denoise),
+        ('face_beauty_filter', lambda img: face_beauty_filter(img, cascade)),
+        ('hdr_like_local_contrast', hdr_like_local_contrast),
+        ('unsharp_mask', lambda img: unsharp_mask(img, amount=0.8, sigma=1.2)),
+        ('final_color_tone', final_color_tone),
+    ]
+
+
+def measure(fn, repeat):
+    """
+    Mengukur fn(): (median detik, minimum detik, puncak MB, hasil).
+
+    Puncak memori diukur pada satu panggilan terpisah agar overhead
+    tracemalloc tidak masuk ke pengukuran waktu.
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return float(np.median(times)), min(times), peak / 2**20, result
+
+
+def environment():
+    """Informasi mesin & versi library (disimpan bersama hasil)."""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'cv_threads': cv2.getNumThreads(),
+    }
+
+
+def run_benchmark(input_folder, sizes, repeat=3, images=None, log=print):
+    """Menjalankan benchmark, mengembalikan list dict hasil per tahap."""
+    cascade = load_face_cascade()
+    stages = stage_list(cascade)
+    results = []
+
+    for fname in images or list_image_files(input_folder):
+        src = cv2.imread(os.path.join(input_folder, fname))
+        if src is None:
+            continue
+        for mp in sizes:
+            img = resize_to_mp(src, mp)
+            real_mp = img.shape[0] * img.shape[1] / 1e6
+
+            def record(stage, fn):
+                med, best, peak, out = measure(fn, repeat)
+                results.append({
+                    'image': fname, 'mp': mp, 'shape': list(img.shape[:2]),
+                    'stage': stage, 'median_s': med, 'min_s': best,
+                    'mp_per_s': real_mp / med if med > 0 else None,
+                    'peak_mb': peak,
+                })
+                log(f"{fname:<22}{mp:>5g}  {stage:<30}{med:>9.4f}{real_mp / med:>9.1f}{peak:>9.1f}")
+                return out
+
+            cur = img
+            for name, fn in stages:
+                cur = record(name, lambda fn=fn, cur=cur: fn(cur))
+            out = record('enhancement_pipeline', lambda: enhancement_pipeline(img, cascade))
+            record('make_before_after_image', lambda: make_before_after_image(img, out))
+    return results
+
+
+def result_key(r):
+    return (r['image'], r['mp'], r['stage'])
+
+
+def compare(results, baseline, threshold):
+    """
+    Membandingkan median latensi dengan baseline.
+    Mengembalikan list (hasil, median baseline, rasio) yang rasionya
+    melebihi 1 + threshold.
+    """
+    base = {result_key(r): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        b = base.get(result_key(r))
+        if b is None or not b['median_s']:
+            continue
+        ratio = r['median_s'] / b['median_s']
+        if ratio > 1.0 + threshold:
+            regressions.append((r, b['median_s'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--input", default=os.path.join(root, "input"))
+    ap.add_argument("--images", nargs="+", help="nama file tertentu di folder input")
+    ap.add_argument("--sizes", type=float, nargs="+", default=DEFAULT_SIZES,
+                    help="ukuran gambar uji (megapixel)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("-o", "--output", default="benchmark_pipeline.json",
+                    help="file JSON hasil")
+    ap.add_argument("--baseline", help="file JSON hasil sebelumnya untuk dibandingkan")
+    ap.add_argument("--threshold", type=float, default=0.10,
+                    help="batas perlambatan relatif sebelum dianggap regresi (0.10 = 10%%)")
+    args = ap.parse_args(argv)
+
+    print(f"{'gambar':<22}{'MP':>5}  {'tahap':<30}{'median s':>9}{'MP/s':>9}{'peak MB':>9}")
+    results = run_benchmark(args.input, args.sizes, args.repeat, args.images)
+
+    report = {
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'environment': environment(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan ke {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if baseline.get('environment') != report['environment']:
+            print("Peringatan: baseline diukur di lingkungan yang berbeda.")
+        if not regressions:
+            print(f"Tidak ada regresi (batas {args.threshold:.0%}).")
+            return 0
+        print(f"{len(regressions)} regresi (batas {args.threshold:.0%}):")
+        for r, base_s, ratio in regressions:
+            print(f"  {r['image']} {r['mp']:g} MP {r['stage']}: "
+                  f"{base_s:.4f} s → {r['median_s']:.4f} s ({ratio:.2f}x)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Perbandingan tier kualitas (exact / balanced / fast): kecepatan & mutu.
+
+Untuk tiap gambar contoh di input/ (opsional diperbesar ke --mp
+megapixel), tahap berat diukur per tier dengan input yang sama:
+- denoise      (bilateral_denoise ↔ guided filter),
+- face_beauty  (smoothing ROI wajah, kotak wajah dideteksi sekali),
+- hdr_detail   (cv2.detailEnhance ↔ guided filter pada L),
+- pipeline     (enhancement_pipeline lengkap).
+Dilaporkan waktu median, speedup terhadap exact, serta PSNR (dB) dan
+SSIM hasil tier terhadap hasil exact.
+
+Jalankan dari root repo:
+    python benchmarks/quality_tiers.py
+    python benchmarks/quality_tiers.py --mp 12 --repeat 1
+"""
+import os
+import sys
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pengolahan_citra import (QUALITY_TIERS, auto_white_balance_grayworld,  # noqa: E402
+                              auto_exposure_stretch, denoise_fn, detail_fn, detect_faces,
+                              smooth_faces, enhancement_pipeline, load_face_cascade,
+                              list_image_files)
+
+
+def resize_to_mp(img, mp):
+    h, w = img.shape[:2]
+    scale = np.sqrt(mp * 1e6 / (h * w))
+    return cv2.resize(img, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_CUBIC)
+
+
+def ssim(a, b):
+    """SSIM rata-rata (jendela Gaussian 11x11, sigma 1.5) pada luminans."""
+    a = cv2.cvtColor(a, cv2.COLOR_BGR2GRAY).astype(np.float64)
+    b = cv2.cvtColor(b, cv2.COLOR_BGR2GRAY).astype(np.float64)
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+
+    def blur(x):
+        return cv2.GaussianBlur(x, (11, 11), 1.5)
+
+    mu_a, mu_b = blur(a), blur(b)
+    var_a = blur(a * a) - mu_a ** 2
+    var_b = blur(b * b) - mu_b ** 2
+    cov = blur(a * b) - mu_a * mu_b
+    s = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / \
+        ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(s.mean())
+
+
+def timed(fn, repeat):
+    """(median detik, hasil) dari repeat panggilan fn()."""
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times)), out
+
+
+def stage_calls(src, img, cascade, quality):
+    """
+    Daftar (nama, fn) untuk satu tier. Tahap berat menerima img (gambar
+    setelah AWB & exposure), pipeline menerima gambar asli src.
+    """
+    denoise, detail = denoise_fn(quality), detail_fn(quality)
+    faces = detect_faces(img, cascade)
+    return [
+        ('denoise', lambda: denoise(img)),
+        ('face_beauty', lambda: smooth_faces(img, faces, quality=quality)),
+        ('hdr_detail', lambda: detail(img)),
+        ('pipeline', lambda: enhancement_pipeline(src, cascade, quality=quality)),
+    ]
+
+
+def main(argv=None):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--input", default=os.path.join(root, "input"))
+    ap.add_argument("--images", nargs="+", help="nama file tertentu di folder input")
+    ap.add_argument("--mp", type=float, help="perbesar gambar ke ukuran ini (megapixel)")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    cascade = load_face_cascade()
+    print(f"{'gambar':<22}{'tahap':<13}{'tier':<10}{'median s':>9}{'speedup':>9}"
+          f"{'PSNR dB':>9}{'SSIM':>8}")
+    for fname in args.images or list_image_files(args.input):
+        src = cv2.imread(os.path.join(args.input, fname))
+        if src is None:
+            continue
+        if args.mp:
+            src = resize_to_mp(src, args.mp)
+        # input tahap berat = gambar setelah koreksi warna & exposure,
+        # seperti di dalam pipeline (wajah juga lebih mudah terdeteksi)
+        img = auto_exposure_stretch(auto_white_balance_grayworld(src))
+
+        ref = {}
+        for quality in QUALITY_TIERS:
+            for name, fn in stage_calls(src, img, cascade, quality):
+                sec, out = timed(fn, args.repeat)
+                if quality == 'exact':
+                    ref[name] = (sec, out)
+                    print(f"{fname:<22}{name:<13}{quality:<10}{sec:>9.3f}{'1.00x':>9}"
+                          f"{'-':>9}{'-':>8}")
+                    continue
+                base_s, base_out = ref[name]
+                psnr = cv2.PSNR(base_out, out)
+                print(f"{fname:<22}{name:<13}{quality:<10}{sec:>9.3f}"
+                      f"{base_s / sec:>8.2f}x{psnr:>9.1f}{ssim(base_out, out):>8.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Image Enhancer sebagai library: tahap pengolahan gambar, pipeline,
+before-after, encoder output, dan fungsi file.
+
+Impor paket ini hanya memuat OpenCV, NumPy, dan modul standar yang
+ringan. Bagian lain dimuat saat dipakai:
+- pengolahan_citra.batch   : batch headless multi-proses (run_batch),
+- pengolahan_citra.tuning  : auto-tune (auto_tune, batch_settings),
+- pengolahan_citra.video   : mode video (enhance_video),
+- pengolahan_citra.service : layanan HTTP lokal,
+- pengolahan_citra.gui     : aplikasi Tkinter (butuh Tk & display),
+- pengolahan_citra.cli     : command line (perintah pengolahan-citra).
+Pillow baru dimuat saat label before-after pertama dibuat, dan Haar
+Cascade baru di-load saat wajah pertama kali dideteksi.
+
+Contoh:
+    import cv2
+    from pengolahan_citra import enhancement_pipeline, load_face_cascade
+
+    img = cv2.imread("foto.jpg")
+    out = enhancement_pipeline(img, load_face_cascade(), fused=True)
+"""
+from .filters import (FACE_DETECT_MAX_SIDE, QUALITY_TIERS, SHARPEN_AMOUNT, FaceBoxCache,
+                      auto_exposure_stretch, auto_white_balance_grayworld,
+                      bilateral_denoise, cached_face_detector, clahe_on_luminance,
+                      denoise_fn, detail_fn, detect_faces, downscale_to_fit,
+                      face_beauty_filter, final_color_tone, hdr_like_local_contrast,
+                      smooth_faces, unsharp_mask)
+from .profiling import StageProfiler, StageStats, profiled
+from .pipeline import enhancement_pipeline
+from .fused import PIPELINE_OPTIONS, plan_pipeline, run_fused_pipeline, run_presets
+from .cache import StageCache
+from .pool import BufferPool
+from .stats import ImageStats, apply_point_stages
+from .analysis import analyze_image, auto_adjustments
+from .tiled import TILE_BUDGET_MB, enhancement_pipeline_tiled
+from .composite import make_before_after_image
+from .encoder import (DEFAULT_OUTPUTS, OUTPUT_FORMATS, encode_image, encode_outputs,
+                      make_output_specs, parse_output_spec, write_bytes)
+from .files import (FaceCascade, ThumbnailCache, ensure_dir, image_file_key, imread_reduced,
+                    list_image_files, load_face_cascade, output_paths, scan_image_files,
+                    watch_image_files)
+
+__all__ = [
+    'FACE_DETECT_MAX_SIDE', 'QUALITY_TIERS', 'SHARPEN_AMOUNT', 'FaceBoxCache',
+    'auto_exposure_stretch', 'auto_white_balance_grayworld', 'bilateral_denoise',
+    'cached_face_detector', 'clahe_on_luminance', 'denoise_fn', 'detail_fn', 'detect_faces',
+    'downscale_to_fit', 'face_beauty_filter', 'final_color_tone', 'hdr_like_local_contrast',
+    'smooth_faces', 'unsharp_mask', 'StageProfiler', 'StageStats', 'profiled',
+    'enhancement_pipeline', 'PIPELINE_OPTIONS', 'plan_pipeline', 'run_fused_pipeline',
+    'run_presets', 'StageCache', 'BufferPool', 'ImageStats', 'apply_point_stages',
+    'analyze_image', 'auto_adjustments', 'TILE_BUDGET_MB', 'enhancement_pipeline_tiled',
+    'make_before_after_image', 'DEFAULT_OUTPUTS', 'OUTPUT_FORMATS', 'encode_image',
+    'encode_outputs', 'make_output_specs', 'parse_output_spec', 'write_bytes',
+    'FaceCascade', 'ThumbnailCache', 'ensure_dir', 'image_file_key', 'imread_reduced',
+    'list_image_files', 'load_face_cascade', 'output_paths', 'scan_image_files',
+    'watch_image_files',
+]
@@ -0,0 +1,8 @@
+"""python -m pengolahan_citra: sama dengan perintah pengolahan-citra."""
+import sys
+
+from .cli import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Analisis konten untuk mode auto."""
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from .filters import FACE_DETECT_MAX_SIDE, face_min_size, histogram_percentiles
+from .profiling import profiled
+from .stats import ImageStats, gray_world_luts
+
+
+# ============================================================
+#     ANALISIS KONTEN – MODE AUTO (LEWATI TAHAP TAK PERLU)
+# ============================================================
+
+# Sisi terpanjang sampel statistik analyze_image (diambil per k pixel)
+ANALYZE_SIDE = 512
+
+# Ambang keputusan mode auto (lihat auto_adjustments)
+AUTO_CAST_MIN = 0.03          # penyimpangan gain Gray-World maksimum
+AUTO_STRETCH_TOL = 3          # percentile 1/99 sudah sejauh ini dari 0/255
+AUTO_NOISE_MIN = 1.5          # sigma noise (skala 0-255)
+AUTO_SHARP_WEAK = 1500.0      # ketajaman (varians Laplacian tanpa noise)
+AUTO_SHARP_SKIP = 5000.0
+AUTO_SHARPEN_WEAK = 0.4       # amount unsharp mask saat diperlemah
+
+# Kernel estimasi noise Immerkaer (selisih dua Laplacian)
+_NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], np.float32)
+
+
+def analyze_image(img_bgr, face_cascade=None, stats=None):
+    """
+    Analisis murah untuk mode auto: seberapa besar setiap tahap akan
+    mengubah gambar ini.
+
+    Cara kerja:
+    - Sampel diambil setiap k pixel (sisi terpanjang ANALYZE_SIDE),
+      tanpa dirata-rata sehingga noise per pixel tetap terukur.
+    - Dari sampel itu (satu kali lewat):
+      - cast      : penyimpangan gain Gray-World terbesar dari 1,
+      - low/high  : percentile 1/99 luminance setelah AWB (rentang
+                    yang akan di-stretch exposure),
+      - noise     : sigma noise (metode Immerkaer),
+      - sharpness : varians Laplacian dikurangi bagian dari noise.
+    - Jika face_cascade diisi, ada/tidaknya wajah dicek pada proxy
+      yang sudah diberi AWB, dengan skala dan minSize yang sama dengan
+      detect_faces (sisi FACE_DETECT_MAX_SIDE, lihat face_min_size)
+      sehingga wajah terkecil yang ditemukan detect_faces juga
+      ditemukan di sini. Proxy yang lebih kecil tidak bisa dipakai:
+      wajah di bawah 24 px (jendela cascade) tidak terdeteksi.
+      Stretch exposure tidak diterapkan: cascade menormalkan kontras
+      per jendela, dan stretch dari rentang sempit (latar hampir
+      rata) justru memotong wajah kecil. Deteksinya lebih sensitif
+      dari detect_faces (wajah palsu hanya berarti face beauty tetap
+      dijalankan).
+
+    Mengembalikan dict nilai di atas; 'faces' bernilai None jika
+    wajah tidak dicek.
+
+    stats (ImageStats img_bgr) dipakai bersama dengan tahap lain;
+    sampel, proxy wajah dan statistiknya disimpan di sana.
+    """
+    if stats is None:
+        stats = ImageStats(img_bgr)
+    h, w = img_bgr.shape[:2]
+    sample = stats.sample(ANALYZE_SIDE)
+
+    means = sample.means()
+    avg = sum(means) / 3.0
+    cast = max(abs(avg / (m + 1e-8) - 1.0) for m in means)
+
+    balanced = sample.mapped(gray_world_luts(means))
+    low, high = histogram_percentiles(balanced.gray_hist(), (1, 99))
+
+    Yf = balanced.gray().astype(np.float32)
+    resp = cv2.filter2D(Yf, -1, _NOISE_KERNEL)[1:-1, 1:-1]
+    noise = float(np.sqrt(np.pi / 2) * cv2.mean(np.abs(resp))[0] / 6.0)
+    lap = cv2.Laplacian(Yf, cv2.CV_32F)[1:-1, 1:-1]
+    # Laplacian 4-tetangga memperbesar varians noise putih 20x
+    sharpness = max(0.0, float(lap.var()) - 20.0 * noise ** 2)
+
+    faces = None
+    if face_cascade is not None:
+        gray = stats.downscaled(FACE_DETECT_MAX_SIDE).mapped(gray_world_luts(means)).gray()
+        min_side = face_min_size(max(gray.shape) / max(h, w))
+        faces = len(face_cascade.detectMultiScale(gray, 1.1, 2,
+                                                  minSize=(min_side, min_side)))
+
+    return {'cast': cast, 'low': float(low), 'high': float(high), 'noise': noise,
+            'sharpness': sharpness, 'faces': faces}
+
+
+def auto_adjustments(analysis, options):
+    """
+    Keputusan mode auto dari hasil analyze_image.
+
+    options: dict do_* (tahap yang dicentang). Mengembalikan
+    (perubahan, dilewati, diperlemah):
+    - perubahan : dict untuk plan_pipeline (do_* = False untuk tahap
+                  yang dilewati, sharpen_amount jika diperlemah),
+    - dilewati / diperlemah : dict nama tahap → alasan (untuk audit).
+
+    Tahap dilewati jika hampir tidak mengubah output:
+    - awb         : cast < AUTO_CAST_MIN,
+    - exposure    : percentile 1/99 sudah dalam AUTO_STRETCH_TOL dari 0/255,
+    - denoise     : noise < AUTO_NOISE_MIN,
+    - face_beauty : tidak ada wajah,
+    - sharpen     : sudah tajam (diperlemah di atas AUTO_SHARP_WEAK,
+                    dilewati di atas AUTO_SHARP_SKIP).
+    HDR dan final tone selalu dijalankan.
+    """
+    a = analysis
+    changes, skipped, weakened = {}, OrderedDict(), OrderedDict()
+
+    def skip(opt, name, reason):
+        if options.get(opt, True):
+            changes[opt] = False
+            skipped[name] = reason
+
+    if a['cast'] < AUTO_CAST_MIN:
+        skip('do_awb', 'awb', f"cast {a['cast']:.1%} < {AUTO_CAST_MIN:.0%}")
+    if a['low'] <= AUTO_STRETCH_TOL and a['high'] >= 255 - AUTO_STRETCH_TOL:
+        skip('do_exposure', 'exposure', f"rentang {a['low']:.0f}-{a['high']:.0f} sudah penuh")
+    if a['noise'] < AUTO_NOISE_MIN:
+        skip('do_denoise', 'denoise', f"noise {a['noise']:.2f} < {AUTO_NOISE_MIN}")
+    if a['faces'] == 0:
+        skip('do_face_beauty', 'face_beauty', "tidak ada wajah")
+    if a['sharpness'] > AUTO_SHARP_SKIP:
+        skip('do_sharpen', 'sharpen', f"ketajaman {a['sharpness']:.0f} > {AUTO_SHARP_SKIP:.0f}")
+    elif a['sharpness'] > AUTO_SHARP_WEAK and options.get('do_sharpen', True):
+        changes['sharpen_amount'] = AUTO_SHARPEN_WEAK
+        weakened['sharpen'] = (f"amount {AUTO_SHARPEN_WEAK}, ketajaman "
+                               f"{a['sharpness']:.0f} > {AUTO_SHARP_WEAK:.0f}")
+    return changes, skipped, weakened
+
+
+def analyze_stage(img_bgr, face_cascade, options, profile=None, stats=None):
+    """
+    analyze_image + auto_adjustments sebagai satu tahap 'analyze'
+    (stats: ImageStats img_bgr yang dipakai bersama).
+    Wajah hanya dicek jika face beauty dicentang. Tahap yang dilewati
+    / diperlemah dicatat di profile (StageProfiler) sebagai
+    'skipped' / 'weakened' pada catatan tahap 'analyze'.
+    Mengembalikan dict perubahan untuk plan_pipeline.
+    """
+    cascade = face_cascade if options.get('do_face_beauty', True) else None
+    analysis = profiled(profile, 'analyze', analyze_image, img_bgr, cascade, stats)
+    changes, skipped, weakened = auto_adjustments(analysis, options)
+    if profile is not None:
+        profile.records[-1].update(skipped=dict(skipped), weakened=dict(weakened))
+    return changes
@@ -0,0 +1,513 @@
+"""Batch engine headless multi-proses."""
+import os
+import time
+import queue
+import json
+import hashlib
+import threading
+import multiprocessing as mp
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .encoder import DEFAULT_OUTPUTS, OUTPUT_KINDS, encode_outputs, write_bytes
+from .files import (ensure_dir, image_file_key, list_image_files, load_face_cascade,
+                    output_paths)
+from .filters import FaceBoxCache
+from .fused import run_presets
+from .pipeline import enhancement_pipeline
+from .pool import BufferPool
+from .profiling import StageProfiler, profiled
+
+
+# ============================================================
+#             BATCH ENGINE (HEADLESS, MULTI-PROSES)
+# ============================================================
+
+# Haar Cascade milik worker (di-load saat wajah pertama dideteksi)
+_WORKER_CASCADE = None
+_WORKER_FACE_CACHE = None
+_WORKER_POOL = None
+
+# Batas buffer bebas di BufferPool tiap worker batch
+BATCH_POOL_BYTES = 1024 * 1024 * 1024
+
+# File cache kotak wajah di folder output (dipakai ulang saat batch diulang)
+FACE_CACHE_FILE = ".face_boxes.json"
+
+
+def batch_worker_init(cv_threads=1, face_boxes=None):
+    """
+    Inisialisasi proses worker batch.
+
+    - Haar Cascade disiapkan sekali dan dipakai ulang untuk semua
+      gambar; file XML-nya baru di-load saat wajah pertama dideteksi.
+    - Thread internal OpenCV dibatasi agar tidak berebut core
+      dengan worker lain (oversubscription).
+    - Cache kotak wajah diisi dari salinan snapshot milik proses
+      utama; dengan workers=1 worker berjalan di thread proses utama,
+      jadi dict-nya tidak boleh dipakai bersama (proses utama menyimpan
+      cache saat worker masih menulis).
+    - Buffer kerja pipeline dipinjam dari BufferPool milik worker,
+      sehingga gambar berukuran sama tidak mengalokasikan ulang.
+    """
+    global _WORKER_CASCADE, _WORKER_FACE_CACHE, _WORKER_POOL
+    if cv_threads is not None:
+        cv2.setNumThreads(cv_threads)
+    _WORKER_CASCADE = load_face_cascade()
+    _WORKER_FACE_CACHE = FaceBoxCache()
+    _WORKER_POOL = BufferPool(BATCH_POOL_BYTES)
+    if face_boxes:
+        _WORKER_FACE_CACHE.boxes = dict(face_boxes)
+
+
+def batch_worker_release():
+    """
+    Melepas state worker yang dibuat batch_worker_init di proses ini.
+
+    Dipakai run_batch dengan workers=1 (worker berjalan di proses
+    pemanggil, mis. GUI): tanpa ini BufferPool, cascade, dan cache
+    wajah tetap dirujuk global modul setelah batch selesai.
+    """
+    global _WORKER_CASCADE, _WORKER_FACE_CACHE, _WORKER_POOL
+    _WORKER_CASCADE = None
+    _WORKER_FACE_CACHE = None
+    _WORKER_POOL = None
+
+
+def process_image_file(in_path, output_folder, options, face_cascade=None,
+                       face_cache=None, output_specs=None):
+    """
+    Memproses satu file: baca → pipeline → simpan final + before-after
+    (format sesuai output_specs).
+
+    Mengembalikan path file final. Melempar ValueError jika gambar
+    tidak bisa dibaca.
+    """
+    with open(in_path, 'rb') as f:
+        data = f.read()
+    outputs = enhance_encoded(data, in_path, image_file_key(in_path), options,
+                              face_cascade, face_cache, output_specs=output_specs)
+    paths = batch_output_paths(output_folder, os.path.basename(in_path), None, output_specs)
+    for path, payload in zip(paths, outputs):
+        write_bytes(path, payload)
+    return paths[0]
+
+
+def enhance_encoded(data, name, key, options, face_cascade=None, face_cache=None,
+                    profile=None, pool=None, presets=None, output_specs=None):
+    """
+    Inti pemrosesan satu gambar dari bytes file: decode → pipeline →
+    before-after → encode (encode_outputs, format sesuai output_specs).
+
+    Mengembalikan (bytes_final, bytes_before_after). Data yang lewat
+    antar proses hanya bytes terkompresi, bukan array gambar.
+
+    presets (opsional): dict nama → opsi yang menimpa options; semua
+    preset dihitung dari satu decode dengan run_presets, dan hasilnya
+    (final, before_after) per preset berurutan dalam satu tuple
+    (lihat batch_output_paths).
+
+    profile (StageProfiler) juga mencatat decode, before-after, dan
+    encode per output. pool (default: milik worker) dipakai untuk
+    buffer kerja pipeline dan kanvas before-after.
+
+    output_specs (lihat make_output_specs): format & kualitas tiap
+    output; before_after None = hanya bytes final (per preset).
+    """
+    if face_cascade is None:
+        face_cascade = _WORKER_CASCADE
+    if face_cache is None:
+        face_cache = _WORKER_FACE_CACHE
+    if pool is None:
+        pool = _WORKER_POOL
+
+    img = profiled(profile, 'decode', cv2.imdecode,
+                   np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError(f"Gagal membuka {name}")
+
+    if presets:
+        outs = run_presets(img, face_cascade,
+                           {p: dict(options, **o) for p, o in presets.items()},
+                           face_cache, key, profile).values()
+    else:
+        outs = [enhancement_pipeline(img, face_cascade, fused=True, face_cache=face_cache,
+                                     cache_key=key, profile=profile, pool=pool, **options)]
+
+    payloads = []
+    for out in outs:
+        try:
+            payloads += encode_outputs(img, out, output_specs, profile, pool)
+        except ValueError as e:
+            raise ValueError(f"{e} untuk hasil {name}") from None
+        finally:
+            if pool is not None:
+                pool.release(out)
+    return tuple(payloads)
+
+
+def batch_output_paths(output_folder, fname, presets=None, output_specs=None):
+    """Path output sesuai urutan bytes dari enhance_encoded."""
+    specs = output_specs or DEFAULT_OUTPUTS
+    return tuple(path for preset in (presets or [None])
+                 for kind, path in zip(OUTPUT_KINDS,
+                                       output_paths(output_folder, fname, preset, specs))
+                 if specs.get(kind) is not None)
+
+
+# Manifest batch di folder output (lihat BatchManifest)
+MANIFEST_FILE = ".enhance_manifest.jsonl"
+
+# Dinaikkan setiap kali algoritma pipeline berubah sehingga hasil lama
+# tidak lagi dianggap terbaru
+PIPELINE_VERSION = 1
+
+
+def batch_signature(options):
+    """Tanda tangan opsi + versi pipeline, disimpan di manifest."""
+    return json.dumps({'version': PIPELINE_VERSION, 'options': options}, sort_keys=True)
+
+
+def file_sha256(data):
+    """Hash konten file (hex)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BatchManifest:
+    """
+    Manifest batch di folder output: untuk tiap file sumber dicatat
+    ukuran, mtime, hash konten, tanda tangan opsi pipeline, dan file
+    output yang dihasilkan (nama → ukuran).
+
+    Disimpan sebagai JSON Lines yang hanya ditambah (append) setiap
+    satu file selesai, sehingga batch yang terputus bisa dilanjutkan;
+    baris terakhir untuk file yang sama yang berlaku. compact()
+    menulis ulang file berisi satu baris per file.
+    """
+    def __init__(self, output_folder):
+        self.path = os.path.join(output_folder, MANIFEST_FILE)
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                        self.entries[rec['file']] = rec
+                    except (ValueError, KeyError):
+                        # baris terakhir bisa terpotong jika proses mati
+                        continue
+
+    def record(self, rec):
+        """Mencatat hasil satu file (langsung di-flush ke disk)."""
+        with self._lock:
+            self.entries[rec['file']] = rec
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(rec) + "\n")
+
+    def compact(self):
+        """Menulis ulang manifest: satu baris per file (atomic rename)."""
+        with self._lock:
+            tmp = self.path + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                for rec in self.entries.values():
+                    f.write(json.dumps(rec) + "\n")
+            os.replace(tmp, self.path)
+
+
+def outputs_current(rec, output_folder):
+    """True jika semua file output di rec masih ada dengan ukuran yang sama."""
+    for name, size in rec.get('outputs', {}).items():
+        try:
+            if os.path.getsize(os.path.join(output_folder, name)) != size:
+                return False
+        except OSError:
+            return False
+    return bool(rec.get('outputs'))
+
+
+def _read_task(in_path, rec, signature, output_folder):
+    """
+    Thread pembaca: cek manifest, lalu baca bytes file (I/O saja,
+    tanpa decode).
+
+    Mengembalikan ('skip', rec_baru) jika output masih terbaru, atau
+    ('data', data, key, sha256) jika file perlu diproses.
+    - Jalur cepat: ukuran & mtime sama dengan manifest → tidak dibaca.
+    - Jika berbeda, konten di-hash; hash sama (mis. file hanya
+      di-touch) tetap dianggap terbaru.
+    """
+    key = image_file_key(in_path)
+    fresh = (rec is not None and rec.get('options') == signature
+             and outputs_current(rec, output_folder))
+    if fresh and rec.get('size') == key[2] and rec.get('mtime_ns') == key[1]:
+        return ('skip', None)
+
+    with open(in_path, 'rb') as f:
+        data = f.read()
+    digest = file_sha256(data)
+    if fresh and rec.get('sha256') == digest:
+        return ('skip', dict(rec, size=key[2], mtime_ns=key[1]))
+    return ('data', data, key, digest)
+
+
+def _compute_task(data, name, key, options, profile=False, presets=None,
+                  output_specs=None):
+    """
+    Tugas compute di worker. Error tidak dilempar ke pool, melainkan
+    dikembalikan sebagai pesan agar batch tetap berjalan.
+
+    Mengembalikan (pesan_error atau None, kotak wajah baru, outputs,
+    ringkasan waktu per tahap atau None) — kotak wajah baru digabung
+    ke cache milik proses utama.
+    """
+    profiler = StageProfiler() if profile else None
+    try:
+        outputs = enhance_encoded(data, name, key, options, profile=profiler,
+                                  presets=presets, output_specs=output_specs)
+        err = None
+    except Exception as e:
+        outputs = None
+        err = f"{type(e).__name__}: {e}"
+    totals = dict(profiler.totals()) if profiler is not None else None
+    return err, _WORKER_FACE_CACHE.take_new(), outputs, totals
+
+
+def run_batch(input_folder, output_folder, options=None, workers=None,
+              progress_cb=None, files=None, queue_depth=None, io_threads=4,
+              resume=True, skip_cb=None, stage_stats=None, presets=None,
+              recursive=False, stop=None, output_specs=None, cv_threads=None):
+    """
+    Batch engine headless: memproses semua gambar di folder input
+    sebagai pipeline streaming baca → compute → tulis.
+
+    Cara kerja:
+    - Thread pembaca (io_threads) membaca bytes file lebih dulu
+      (prefetch) selagi worker masih menghitung gambar sebelumnya.
+    - Compute (decode → pipeline → encode) berjalan di process pool;
+      yang dikirim antar proses hanya bytes terkompresi, bukan array.
+      Di tiap worker, output di-encode di thread encoder (encode_outputs).
+    - Thread penulis (io_threads) menulis hasil ke disk di belakang,
+      masing-masing lewat file sementara + rename (write_bytes).
+    - Jumlah file yang sedang "di jalan" (dibaca, dihitung, atau
+      menunggu ditulis) dibatasi queue_depth, sehingga memori tetap
+      terbatas berapapun jumlah file.
+
+    Parameter:
+    - options     : dict opsi pipeline (do_awb, do_exposure, ...).
+    - workers     : jumlah proses; default = jumlah core. Jika 1,
+                    compute berjalan di satu thread proses pemanggil.
+    - progress_cb : callback(done, total, fname, error) dipanggil di
+                    thread pemanggil setiap satu file selesai;
+                    error bernilai None jika berhasil; total None
+                    jika files berupa iterator.
+    - files       : daftar nama file (relatif terhadap folder input);
+                    default = semua gambar di folder. Boleh berupa
+                    iterator yang menghasilkan nama sambil berjalan
+                    (mis. scan_image_files / watch_image_files) —
+                    batch selesai saat iterator habis.
+    - recursive   : daftar default ikut menelusuri sub-folder; struktur
+                    sub-folder dicerminkan di folder output.
+    - stop        : threading.Event untuk menghentikan batch dari luar;
+                    juga di-set saat batch selesai / terputus, sehingga
+                    iterator files yang menunggu (watch_image_files
+                    dengan event yang sama) ikut berhenti.
+    - queue_depth : maksimum file di jalan; default 2 * workers + 2.
+    - io_threads  : jumlah thread pembaca dan thread penulis.
+    - resume      : lewati file yang output-nya masih terbaru menurut
+                    manifest (MANIFEST_FILE) di folder output.
+    - skip_cb     : callback(fname) untuk file yang dilewati (progress_cb
+                    tetap dipanggil dengan error None).
+    - stage_stats : StageStats; jika diisi, tiap gambar diprofil
+                    (StageProfiler) dan ringkasannya dikumpulkan untuk
+                    laporan p50/p95 per tahap.
+    - presets     : dict nama → opsi yang menimpa options; setiap file
+                    didecode sekali dan menghasilkan output per preset
+                    (foto_<preset>_final.jpg, ...) lewat run_presets.
+    - output_specs: format / kualitas / skala tiap output
+                    (make_output_specs); default JPEG 95 ukuran penuh.
+    - cv_threads  : thread internal OpenCV per worker (lihat
+                    batch_settings / auto_tune); default 1 per proses
+                    worker, atau bawaan OpenCV jika workers=1.
+
+    Setiap file yang selesai dicatat di manifest (hash konten, opsi,
+    output), sehingga batch yang terputus bisa dilanjutkan dan batch
+    ulang hanya memproses file baru / berubah.
+
+    Kotak wajah hasil deteksi disimpan di FACE_CACHE_FILE dalam folder
+    output, sehingga batch ulang / retry tidak mendeteksi ulang.
+
+    Jika proses worker mati (pool menjadi BrokenProcessPool), batch
+    dihentikan: file yang sedang dihitung dan file sisanya dicatat
+    gagal, bukan menunggu selamanya.
+
+    Mengembalikan dict {nama_file: pesan_error} untuk file yang gagal.
+    """
+    options = dict(options or {})
+    if files is None:
+        files = list_image_files(input_folder, recursive, exclude=(output_folder,))
+    ensure_dir(output_folder)
+
+    total = len(files) if hasattr(files, '__len__') else None
+    errors = {}
+    if total == 0:
+        return errors
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, total or workers))
+    if queue_depth is None:
+        queue_depth = 2 * workers + 2
+
+    face_cache = FaceBoxCache(os.path.join(output_folder, FACE_CACHE_FILE))
+    manifest = BatchManifest(output_folder)
+    signed = dict(options)
+    if presets:
+        signed['presets'] = presets
+    if output_specs and output_specs != DEFAULT_OUTPUTS:
+        signed['outputs'] = output_specs
+    signature = batch_signature(signed)
+
+    caller_threads = cv2.getNumThreads()
+    if workers == 1:
+        batch_worker_init(cv_threads, face_cache.boxes)
+        compute = ThreadPoolExecutor(max_workers=1)
+    else:
+        # "spawn" dipakai agar worker tidak mewarisi state Tk / thread GUI
+        compute = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                                      initializer=batch_worker_init,
+                                      initargs=(cv_threads or 1, face_cache.boxes))
+    readers = ThreadPoolExecutor(max_workers=io_threads)
+    writers = ThreadPoolExecutor(max_workers=io_threads)
+
+    slots = threading.BoundedSemaphore(queue_depth)
+    events = queue.Queue()
+    if stop is None:
+        stop = threading.Event()
+    fed = None
+
+    def finish(fname, err, faces=None, rec=None, skipped=False, totals=None):
+        events.put((fname, err, faces, rec, skipped, totals))
+        slots.release()
+
+    def on_written(fname, faces, rec, totals, fut):
+        exc = fut.exception()
+        if exc is None:
+            if totals is not None:
+                totals['write'] = dict(zip(('wall_s', 'out_bytes'), fut.result()))
+            finish(fname, None, faces, rec, totals=totals)
+        else:
+            finish(fname, f"{type(exc).__name__}: {exc}", faces)
+
+    def on_computed(fname, key, digest, fut):
+        try:
+            err, faces, outputs, totals = fut.result()
+        except Exception as e:
+            # worker mati (mis. kehabisan memori): pool tidak bisa dipakai
+            # lagi, file yang belum dikirim dicatat gagal
+            if isinstance(e, BrokenExecutor):
+                stop.set()
+            finish(fname, f"{type(e).__name__}: {e}")
+            return
+        if err is not None:
+            finish(fname, err, faces)
+            return
+
+        paths = batch_output_paths(output_folder, fname, presets, output_specs)
+        rec = {'file': fname, 'size': key[2], 'mtime_ns': key[1], 'sha256': digest,
+               'options': signature,
+               'outputs': {os.path.relpath(p, output_folder): len(b)
+                           for p, b in zip(paths, outputs)}}
+
+        def write():
+            t0 = time.perf_counter()
+            ensure_dir(os.path.dirname(paths[0]))
+            written = sum(write_bytes(path, payload) for path, payload in zip(paths, outputs))
+            return time.perf_counter() - t0, written
+
+        writers.submit(write).add_done_callback(
+            lambda f: on_written(fname, faces, rec, totals, f))
+
+    def on_read(fname, fut):
+        try:
+            res = fut.result()
+        except Exception as e:
+            finish(fname, f"{type(e).__name__}: {e}")
+            return
+        if res[0] == 'skip':
+            finish(fname, None, rec=res[1], skipped=True)
+            return
+        if stop.is_set():
+            finish(fname, "dibatalkan")
+            return
+        _, data, key, digest = res
+        try:
+            task = compute.submit(_compute_task, data, fname, key, options,
+                                  stage_stats is not None, presets, output_specs)
+        except Exception as e:
+            # pool rusak (BrokenProcessPool) atau sudah ditutup: exception di
+            # done-callback hanya di-log, jadi file harus diselesaikan di sini
+            stop.set()
+            finish(fname, f"{type(e).__name__}: {e}")
+            return
+        task.add_done_callback(lambda f: on_computed(fname, key, digest, f))
+
+    def feeder():
+        nonlocal fed
+        count = 0
+        try:
+            for fname in files:
+                count += 1
+                slots.acquire()
+                if stop.is_set():
+                    slots.release()
+                    events.put((fname, "dibatalkan", None, None, False, None))
+                    if total is None:
+                        break
+                    continue
+                path = os.path.join(input_folder, fname)
+                rec = manifest.entries.get(fname) if resume else None
+                readers.submit(_read_task, path, rec, signature, output_folder).add_done_callback(
+                    lambda f, fname=fname: on_read(fname, f))
+        finally:
+            # penanda akhir: jumlah file yang dikirim sudah pasti
+            fed = count
+            events.put(None)
+
+    feed = threading.Thread(target=feeder, daemon=True)
+    feed.start()
+
+    try:
+        done = 0
+        while fed is None or done < fed:
+            event = events.get()
+            if event is None:
+                continue
+            done += 1
+            fname, err, faces, rec, skipped, totals = event
+            if faces:
+                face_cache.update(faces)
+            if totals is not None:
+                stage_stats.add(totals)
+            if rec is not None:
+                manifest.record(rec)
+            if err is not None:
+                errors[fname] = err
+            if skipped and skip_cb is not None:
+                skip_cb(fname)
+            if progress_cb is not None:
+                progress_cb(done, total, fname, err)
+    finally:
+        stop.set()
+        feed.join()
+        for pool in (readers, compute, writers):
+            pool.shutdown(wait=True)
+        if workers == 1:
+            batch_worker_release()
+        cv2.setNumThreads(caller_threads)
+        face_cache.save()
+        manifest.compact()
+
+    return errors
@@ -0,0 +1,60 @@
+"""Cache hasil antara pipeline per prefix tahap."""
+import threading
+from collections import OrderedDict
+
+
+# ============================================================
+#       CACHE PREFIX TAHAP – HANYA TAHAP SETELAH PERUBAHAN
+# ============================================================
+
+class StageCache:
+    """
+    Cache LRU hasil antara pipeline, dibatasi total byte.
+
+    Kunci: (identitas_gambar, prefix nama tahap yang aktif). Nama
+    tahap mewakili tahap beserta parameternya (tahap dengan parameter
+    berbeda harus memakai nama berbeda), sehingga prefix yang sama
+    berarti hasil yang sama. Jika satu checkbox di akhir pipeline diubah,
+    run_fused_pipeline melanjutkan dari prefix terpanjang yang masih
+    cocok dan hanya menghitung tahap sesudahnya.
+
+    Array yang disimpan dijadikan read-only agar tidak bisa diubah
+    oleh tahap berikutnya. Aman dipakai dari beberapa thread.
+    """
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        space, img = value
+        if img.nbytes > self.max_bytes:
+            return
+        img.flags.writeable = False
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1].nbytes
+            self._items[key] = value
+            self.nbytes += img.nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
@@ -0,0 +1,288 @@
+"""Command line: batch headless, video, layanan, auto-tune, atau GUI."""
+import os
+import sys
+import time
+import argparse
+import threading
+
+from .batch import run_batch
+from .encoder import make_output_specs
+from .files import watch_image_files
+from .filters import QUALITY_TIERS
+from .fused import PIPELINE_OPTIONS
+from .profiling import StageStats
+from .tiled import TILE_BUDGET_MB
+from .tuning import auto_tune, batch_settings, tuning_path
+from .video import VIDEO_STATS_INTERVAL, enhance_video
+
+
+# ============================================================
+#                         MAIN PROGRAM
+# ============================================================
+
+def build_arg_parser():
+    """Argumen command line untuk mode batch headless."""
+    ap = argparse.ArgumentParser(
+        description="Image Enhancer. Tanpa argumen: buka GUI. "
+                    "Dengan --input dan --output: batch headless.")
+    ap.add_argument("--input", "-i", help="folder berisi gambar input")
+    ap.add_argument("--output", "-o", help="folder output")
+    ap.add_argument("--workers", "-j", type=int, default=None,
+                    help="jumlah proses worker (default: jumlah core)")
+    ap.add_argument("--queue-depth", type=int, default=None,
+                    help="maksimum file yang sedang dibaca/dihitung/ditulis "
+                         "(default: 2 x workers + 2)")
+    ap.add_argument("--io-threads", type=int, default=4,
+                    help="jumlah thread pembaca dan penulis file")
+    ap.add_argument("--profile", action="store_true",
+                    help="catat waktu per tahap dan tampilkan p50/p95 di akhir batch")
+    ap.add_argument("--force", action="store_true",
+                    help="proses ulang semua file walaupun output masih terbaru")
+    ap.add_argument("--preset", action="append", default=[], metavar="NAMA=TAHAP,...",
+                    help="tambah preset output; TAHAP = tahap yang dimatikan, "
+                         "mis. --preset natural=no-hdr,no-face-beauty --preset penuh=")
+    ap.add_argument("--final-format", default="jpg", metavar="SPEC",
+                    help="format output final, mis. jpg:q=90,progressive,optimize | "
+                         "webp:q=85 | png:level=6 (default: jpg, kualitas 95)")
+    ap.add_argument("--ba-format", default="jpg", metavar="SPEC",
+                    help="format before-after; sama seperti --final-format ditambah "
+                         "scale=0.5 (diperkecil) atau off (tidak dibuat)")
+    ap.add_argument("--recursive", "-r", action="store_true",
+                    help="ikut memproses sub-folder (struktur dicerminkan di output)")
+    ap.add_argument("--watch", action="store_true",
+                    help="pantau folder input (hot folder): file yang sudah ada dan "
+                         "yang baru masuk diproses sampai Ctrl+C")
+    ap.add_argument("--serve", action="store_true",
+                    help="jalankan layanan HTTP lokal (POST /enhance, GET /metrics)")
+    ap.add_argument("--host", default="127.0.0.1", help="mode --serve: alamat TCP")
+    ap.add_argument("--port", type=int, help="mode --serve: port TCP (default 8765)")
+    ap.add_argument("--socket", metavar="PATH",
+                    help="mode --serve: dengarkan di soket Unix ini, bukan TCP")
+    ap.add_argument("--queue-size", type=int,
+                    help="mode --serve: maksimum request menunggu sebelum ditolak "
+                         "(503, default 16)")
+    ap.add_argument("--video", action="store_true",
+                    help="input/output berupa file video atau pola urutan frame "
+                         "(mis. frames/%%04d.png)")
+    ap.add_argument("--stats-interval", type=int, default=VIDEO_STATS_INTERVAL, metavar="N",
+                    help="mode video: ukur ulang statistik global setiap N frame")
+    ap.add_argument("--tile-budget", type=tile_budget_arg, default=None, metavar="MB",
+                    help="mode tiled untuk gambar sangat besar; batas memori "
+                         "buffer kerja per worker (MB), atau auto = hasil --tune")
+    ap.add_argument("--tune", action="store_true",
+                    help="kalibrasi jumlah worker, thread OpenCV, antrean, dan ukuran "
+                         "tile pada gambar contoh (-i, default input/ di folder kerja) lalu "
+                         "simpan profilnya untuk batch berikutnya")
+    ap.add_argument("--no-tuning", action="store_true",
+                    help="abaikan profil hasil --tune")
+    ap.add_argument("--quality", choices=QUALITY_TIERS, default="exact",
+                    help="tier kecepatan/kualitas filter berat (denoise, smoothing "
+                         "wajah, detail HDR); exact = hasil asli")
+    ap.add_argument("--auto", action="store_true",
+                    help="analisis tiap gambar dan lewati/perlemah tahap yang hampir "
+                         "tidak mengubahnya (alasan tampil dengan --profile)")
+    for opt in PIPELINE_OPTIONS:
+        name = opt[3:].replace('_', '-')
+        ap.add_argument(f"--no-{name}", dest=opt, action="store_false",
+                        help=f"matikan tahap {name}")
+    return ap
+
+
+def tile_budget_arg(value):
+    """Nilai --tile-budget: jumlah MB positif atau 'auto'."""
+    if value == 'auto':
+        return value
+    try:
+        mb = int(value)
+    except ValueError:
+        mb = 0
+    if mb <= 0:
+        raise argparse.ArgumentTypeError(f"harus bilangan MB positif atau auto, bukan {value!r}")
+    return mb
+
+
+def cli_options(args):
+    """Opsi pipeline (tahap, tier kualitas, auto) dari argumen command line."""
+    options = {opt: getattr(args, opt) for opt in PIPELINE_OPTIONS}
+    if args.quality != 'exact':
+        options['quality'] = args.quality
+    if args.auto:
+        options['auto'] = True
+    return options
+
+
+def parse_preset(spec):
+    """
+    Mengurai "nama=no-hdr,no-face-beauty" menjadi (nama, opsi yang
+    dimatikan). Melempar ValueError jika format / nama tahap salah.
+    """
+    name, sep, stages = spec.partition("=")
+    if not sep or not name or not name.replace("-", "").replace("_", "").isalnum():
+        raise ValueError(f"format preset salah: {spec!r}")
+    overrides = {}
+    for stage in filter(None, (st.strip() for st in stages.split(","))):
+        opt = "do_" + stage[3:].replace("-", "_") if stage.startswith("no-") else None
+        if opt not in PIPELINE_OPTIONS:
+            raise ValueError(f"tahap tidak dikenal di preset {name!r}: {stage!r}")
+        overrides[opt] = False
+    return name, overrides
+
+
+def run_cli(args):
+    """Menjalankan batch headless dari command line."""
+    options = cli_options(args)
+    presets = None
+    try:
+        if args.preset:
+            presets = dict(parse_preset(spec) for spec in args.preset)
+        output_specs = make_output_specs(args.final_format, args.ba_format)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if args.video:
+        return run_video_cli(args, options)
+
+    workers, cv_threads, queue_depth, tuned = batch_settings(
+        options, args.workers, args.queue_depth, tuning=not args.no_tuning)
+    if cv_threads is not None:
+        print(f"Profil tuning: {workers} worker x {cv_threads} thread OpenCV, "
+              f"antrean {queue_depth}.", flush=True)
+    if args.tile_budget == 'auto':
+        options['tile_budget_mb'] = tuned['tile_budget_mb'] if tuned else TILE_BUDGET_MB
+    elif args.tile_budget:
+        options['tile_budget_mb'] = args.tile_budget
+
+    skipped = set()
+    failed = set()
+    stats = StageStats() if args.profile else None
+
+    def progress(done, total, fname, err):
+        if err is not None:
+            failed.add(fname)
+        if fname in skipped:
+            status = "terbaru, dilewati"
+        else:
+            status = "OK" if err is None else f"GAGAL ({err})"
+        count = f"{done}/{total}" if total is not None else f"{done}"
+        print(f"[{count}] {fname}: {status}", flush=True)
+
+    files = None
+    stop = threading.Event()
+    if args.watch:
+        files = watch_image_files(args.input, stop, args.recursive, exclude=(args.output,))
+        print(f"Memantau {args.input} (Ctrl+C untuk berhenti)...", flush=True)
+
+    t0 = time.perf_counter()
+    try:
+        run_batch(args.input, args.output, options,
+                  workers=workers, progress_cb=progress, files=files,
+                  queue_depth=queue_depth, io_threads=args.io_threads,
+                  resume=not args.force, skip_cb=skipped.add,
+                  stage_stats=stats, presets=presets,
+                  recursive=args.recursive, stop=stop,
+                  output_specs=output_specs, cv_threads=cv_threads)
+    except KeyboardInterrupt:
+        if not args.watch:
+            raise
+        print("\nPemantauan dihentikan.")
+    dt = time.perf_counter() - t0
+    print(f"Selesai dalam {dt:.1f} s, {len(skipped)} file dilewati, "
+          f"{len(failed)} file gagal.")
+    if stats is not None and stats.images:
+        print(f"\nWaktu per tahap ({stats.images} gambar):")
+        print(stats.report())
+    return 1 if failed else 0
+
+
+def run_tune_cli(args):
+    """
+    Menjalankan auto-tune (--tune) dan menampilkan pengaturan terpilih.
+    Gambar contoh diambil dari folder -i, atau input/ di folder kerja.
+    """
+    folder = args.input or "input"
+    if not os.path.isdir(folder):
+        print(f"Folder gambar contoh tidak ditemukan: {os.path.abspath(folder)}\n"
+              "Gunakan --tune -i FOLDER dengan beberapa gambar yang mewakili batch.",
+              file=sys.stderr)
+        return 2
+    try:
+        entry = auto_tune(folder, cli_options(args))
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if entry is None:
+        return 0
+    print(f"Terpilih: {entry['workers']} worker x {entry['cv_threads']} thread OpenCV, "
+          f"antrean {entry['queue_depth']}, tile {entry['tile_budget_mb']} MB "
+          f"({entry['images_per_s']:.2f} gambar/s).")
+    print(f"Profil disimpan di {tuning_path()}; batch berikutnya memakainya otomatis.")
+    return 0
+
+
+def run_video_cli(args, options):
+    """Menjalankan mode video dari command line."""
+    def progress(done, fps):
+        if done % 25 == 0:
+            print(f"\r{done} frame, {fps:.1f} fps", end="", flush=True)
+
+    try:
+        result = enhance_video(args.input, args.output, options, workers=args.workers,
+                               queue_depth=args.queue_depth,
+                               stats_interval=args.stats_interval, progress_cb=progress)
+    except ValueError as e:
+        print(f"\nGagal: {e}", file=sys.stderr)
+        return 1
+    print(f"\rSelesai: {result['frames']} frame dalam {result['seconds']:.1f} s "
+          f"({result['fps']:.1f} fps), statistik diukur {result['refreshes']} kali, "
+          f"{result['scene_cuts']} ganti adegan.")
+    return 0
+
+
+def run_service_cli(args):
+    """Menjalankan layanan HTTP lokal sampai Ctrl+C."""
+    # http.server dkk. hanya dimuat untuk mode --serve
+    from .service import SERVICE_PORT, SERVICE_QUEUE_SIZE, EnhanceService, make_service_server
+    queue_size = SERVICE_QUEUE_SIZE if args.queue_size is None else args.queue_size
+    port = SERVICE_PORT if args.port is None else args.port
+    service = EnhanceService(args.workers, queue_size)
+    try:
+        server = make_service_server(service, args.host, port, args.socket)
+    except OSError as e:
+        service.close()
+        print(f"Gagal membuka server: {e}", file=sys.stderr)
+        return 1
+    where = args.socket or f"http://{args.host}:{server.server_port}"
+    print(f"Layanan siap di {where} ({service.workers} worker, "
+          f"antrean {service.capacity - service.workers}). Ctrl+C untuk berhenti.", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nLayanan dihentikan.")
+    finally:
+        server.server_close()
+        if args.socket:
+            os.unlink(args.socket)
+        service.close()
+    return 0
+
+
+def main(argv=None):
+    """Menjalankan batch headless (jika ada argumen) atau aplikasi Tkinter."""
+    args = build_arg_parser().parse_args(argv)
+    if args.serve:
+        return run_service_cli(args)
+    if args.tune:
+        return run_tune_cli(args)
+    if args.input or args.output:
+        if not (args.input and args.output):
+            print("--input dan --output harus diisi bersama.", file=sys.stderr)
+            return 2
+        return run_cli(args)
+
+    # Tkinter & Pillow ImageTk hanya dimuat untuk GUI
+    import tkinter as tk
+    from .gui import EnhancerGUI
+    root = tk.Tk()
+    app = EnhancerGUI(root)
+    root.mainloop()
+    return 0
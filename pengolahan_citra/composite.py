@@ -0,0 +1,123 @@
+"""Gambar before-after."""
+import cv2
+import numpy as np
+
+
+# ============================================================
+#            MEMBUAT GAMBAR BEFORE–AFTER UNTUK DISIMPAN
+# ============================================================
+
+# Tata letak gambar before-after
+BA_STRIP_HEIGHT = 48           # tinggi strip gelap di atas
+BA_STRIP_ALPHA = 140           # opasitas strip (0-255)
+BA_LABEL_POS = (12, 8)         # posisi label relatif ke tiap panel
+BA_BORDER = 6                  # border putih
+
+_LABEL_FONT = None
+_LABEL_MASKS = {}
+
+
+def _div255(v):
+    """Pembagian 255 dengan pembulatan, sama seperti DIV255 di Pillow."""
+    t = v + 128
+    return ((t >> 8) + t) >> 8
+
+
+# LUT strip gelap: hasil paste RGBA (0,0,0,alpha) di Pillow
+_STRIP_LUT = _div255(np.arange(256, dtype=np.uint32) * (255 - BA_STRIP_ALPHA)).astype(np.uint8)
+
+
+def _default_label_font():
+    """Font label (di-load saat pertama dipakai): DejaVuSans-Bold 20, fallback default."""
+    global _LABEL_FONT
+    if _LABEL_FONT is None:
+        from PIL import ImageFont
+        try:
+            _LABEL_FONT = ImageFont.truetype("DejaVuSans-Bold.ttf", 20)
+        except Exception:
+            _LABEL_FONT = ImageFont.load_default()
+    return _LABEL_FONT
+
+
+def _label_mask(text, font):
+    """
+    Mask anti-alias (uint8) sebuah label, di-render sekali per
+    (teks, font) oleh Pillow pada posisi BA_LABEL_POS lalu di-cache.
+    """
+    key = (text, id(font))
+    entry = _LABEL_MASKS.get(key)
+    if entry is None:
+        from PIL import Image, ImageDraw
+        bbox = ImageDraw.Draw(Image.new('L', (1, 1))).textbbox(BA_LABEL_POS, text, font=font)
+        canvas = Image.new('L', (bbox[2] + 2, bbox[3] + 2), 0)
+        ImageDraw.Draw(canvas).text(BA_LABEL_POS, text, font=font, fill=255)
+        # font ikut disimpan agar id(font) tidak dipakai ulang objek lain
+        entry = (font, np.array(canvas))
+        _LABEL_MASKS[key] = entry
+    return entry[1]
+
+
+def _blend_white(region, mask):
+    """Menggambar teks putih lewat mask: out = (out*(255-m) + 255*m) / 255."""
+    m = mask.astype(np.uint32)[:, :, None]
+    region[:] = _div255(region.astype(np.uint32) * (255 - m) + 255 * m).astype(np.uint8)
+
+
+def make_before_after_image(before_bgr, after_bgr, label_font=None, pool=None):
+    """
+    Membuat gambar gabungan (Before & After) dalam satu file.
+    
+    Langkah:
+    - Samakan tinggi kedua gambar
+    - Gabungkan secara horizontal
+    - Tambahkan strip hitam semi-transparan di atas
+    - Tulis label BEFORE dan AFTER
+    - Beri border putih
+    
+    Hasil akhir: cocok untuk perbandingan visual.
+
+    Semua langkah ditulis langsung ke satu kanvas BGR berukuran akhir
+    (tanpa konversi ke PIL); strip gelap memakai LUT dan mask label
+    di-cache, dengan hasil identik dengan versi berbasis PIL.
+
+    pool (BufferPool, opsional): kanvas dipinjam dari pool.
+    """
+    H = max(before_bgr.shape[0], after_bgr.shape[0])
+
+    def resize_to_h(img, H):
+        if img.shape[0] == H:
+            return img
+        scale = H / img.shape[0]
+        return cv2.resize(img, (int(img.shape[1]*scale), H))
+
+    b = resize_to_h(before_bgr, H)
+    a = resize_to_h(after_bgr, H)
+    W = b.shape[1] + a.shape[1]
+    mid = W // 2
+
+    border = BA_BORDER
+    shape = (H + 2*border, W + 2*border, 3)
+    canvas = pool.lease(shape) if pool is not None else np.empty(shape, np.uint8)
+    canvas[:border] = 255
+    canvas[-border:] = 255
+    canvas[:, :border] = 255
+    canvas[:, -border:] = 255
+
+    inner = canvas[border:border + H, border:border + W]
+    inner[:, :b.shape[1]] = b
+    inner[:, b.shape[1]:] = a
+
+    strip = inner[:BA_STRIP_HEIGHT]
+    strip[:] = cv2.LUT(strip, _STRIP_LUT)
+
+    if label_font is None:
+        label_font = _default_label_font()
+
+    for text, x0 in (("BEFORE", 0), ("AFTER", mid)):
+        mask = _label_mask(text, label_font)
+        h = min(mask.shape[0], H)
+        w = min(mask.shape[1], W - x0)
+        if h > 0 and w > 0:
+            _blend_white(inner[:h, x0:x0 + w], mask[:h, :w])
+
+    return canvas
@@ -0,0 +1,214 @@
+"""Encoder output (format, kualitas) dan penulisan file atomik."""
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import cv2
+
+from .composite import make_before_after_image
+from .profiling import profiled
+
+
+# ============================================================
+#      ENCODER OUTPUT – FORMAT, KUALITAS & PENULISAN ATOMIK
+# ============================================================
+
+# Format output: nama → ekstensi file
+OUTPUT_FORMATS = {'jpg': '.jpg', 'webp': '.webp', 'png': '.png'}
+
+# Jenis output per gambar, berurutan seperti bytes dari enhance_encoded
+OUTPUT_KINDS = ('final', 'before_after')
+
+# Parameter yang berlaku per format beserta default-nya. JPEG 95 sama
+# dengan default OpenCV; level PNG None = default OpenCV (paling cepat).
+OUTPUT_DEFAULTS = {
+    'jpg': {'quality': 95, 'progressive': False, 'optimize': False},
+    'webp': {'quality': 90},
+    'png': {'level': None},
+}
+
+# Batas nilai parameter output
+OUTPUT_RANGES = {'quality': (1, 100), 'level': (0, 9), 'scale': (0.01, 1.0)}
+
+# Jumlah thread encoder per proses (cv2.imencode melepas GIL)
+ENCODE_THREADS = 2
+
+_ENCODER = None
+_ENCODER_LOCK = threading.Lock()
+
+
+def parse_output_spec(text, kind='final'):
+    """
+    Mengurai pengaturan satu jenis output menjadi dict spec, mis.:
+    - "jpg:q=90,progressive,optimize"
+    - "webp:q=80,scale=0.5"  (scale < 1: gambar diperkecil sebelum encode)
+    - "png:level=6"
+    - "off"                  (hanya untuk before_after: tidak dibuat)
+
+    Spec berisi format, semua parameter format itu (default dari
+    OUTPUT_DEFAULTS), dan scale; "off" menjadi None. Melempar ValueError
+    jika format / parameter / nilainya salah.
+    """
+    fmt, _, params = text.strip().lower().partition(':')
+    if fmt == 'off':
+        if kind == 'final':
+            raise ValueError("output final tidak bisa dimatikan")
+        if params:
+            raise ValueError(f"'off' tidak menerima parameter: {text!r}")
+        return None
+    fmt = 'jpg' if fmt == 'jpeg' else fmt
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"format output tidak dikenal: {fmt!r}")
+
+    spec = dict(OUTPUT_DEFAULTS[fmt], format=fmt, scale=1.0)
+    for item in filter(None, (p.strip() for p in params.split(','))):
+        name, sep, value = item.partition('=')
+        name = 'quality' if name == 'q' else name
+        if name != 'scale' and name not in OUTPUT_DEFAULTS[fmt]:
+            raise ValueError(f"parameter {name!r} tidak berlaku untuk {fmt}")
+        is_flag = isinstance(spec[name], bool)
+        try:
+            if is_flag:
+                spec[name] = not sep or bool(int(value))
+                continue
+            spec[name] = float(value) if name == 'scale' else int(value)
+        except ValueError:
+            raise ValueError(f"nilai {name} salah: {value!r}") from None
+        lo, hi = OUTPUT_RANGES[name]
+        if not lo <= spec[name] <= hi:
+            raise ValueError(f"nilai {name} harus {lo}–{hi}, bukan {value}")
+    return spec
+
+
+def make_output_specs(final="jpg", before_after="jpg"):
+    """Dict jenis output → spec (lihat parse_output_spec) dari teks pengaturan."""
+    return {'final': parse_output_spec(final, 'final'),
+            'before_after': parse_output_spec(before_after, 'before_after')}
+
+
+# Final & before-after JPEG ukuran penuh (hasil sama seperti cv2.imwrite)
+DEFAULT_OUTPUTS = make_output_specs()
+
+
+def output_ext(specs, kind):
+    """Ekstensi file untuk jenis output kind (default .jpg jika dimatikan)."""
+    spec = (specs or DEFAULT_OUTPUTS).get(kind) or DEFAULT_OUTPUTS[kind]
+    return OUTPUT_FORMATS[spec['format']]
+
+
+def encode_params(spec):
+    """(ekstensi, parameter cv2.imencode) untuk sebuah spec output."""
+    fmt = spec['format']
+    if fmt == 'jpg':
+        params = [cv2.IMWRITE_JPEG_QUALITY, spec['quality']]
+        if spec['progressive']:
+            params += [cv2.IMWRITE_JPEG_PROGRESSIVE, 1]
+        if spec['optimize']:
+            params += [cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+    elif fmt == 'webp':
+        params = [cv2.IMWRITE_WEBP_QUALITY, spec['quality']]
+    else:
+        params = [] if spec['level'] is None else [cv2.IMWRITE_PNG_COMPRESSION, spec['level']]
+    return OUTPUT_FORMATS[fmt], params
+
+
+def encode_image(img_bgr, spec):
+    """Meng-encode gambar sesuai spec menjadi bytes (ValueError jika gagal)."""
+    ext, params = encode_params(spec)
+    ok, buf = cv2.imencode(ext, img_bgr, params)
+    if not ok:
+        raise ValueError(f"Gagal meng-encode {ext}")
+    return buf.tobytes()
+
+
+def _output_scaled(img_bgr, spec):
+    """Gambar yang diperkecil sesuai spec['scale'] (gambar asli jika 1)."""
+    scale = spec['scale']
+    if scale >= 1.0:
+        return img_bgr
+    h, w = img_bgr.shape[:2]
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return cv2.resize(img_bgr, size, interpolation=cv2.INTER_AREA)
+
+
+def _encode_job(img_bgr, spec):
+    """Tugas thread encoder: (bytes, detik wall, detik CPU thread)."""
+    c0, t0 = time.thread_time(), time.perf_counter()
+    data = encode_image(img_bgr, spec)
+    return data, time.perf_counter() - t0, time.thread_time() - c0
+
+
+def encoder_pool():
+    """Thread pool encoder milik proses ini (dibuat saat pertama dipakai)."""
+    global _ENCODER
+    with _ENCODER_LOCK:
+        if _ENCODER is None:
+            _ENCODER = ThreadPoolExecutor(max_workers=ENCODE_THREADS,
+                                          thread_name_prefix="encode")
+    return _ENCODER
+
+
+def encode_outputs(before_bgr, after_bgr, specs=None, profile=None, pool=None):
+    """
+    Meng-encode semua output satu gambar sesuai specs (default
+    DEFAULT_OUTPUTS): final, lalu before-after jika tidak dimatikan.
+
+    Cara kerja:
+    - Encode final dikirim ke thread encoder lebih dulu, sehingga
+      berjalan bersamaan dengan pembuatan kanvas before-after.
+    - Kanvas before-after dibuat dari before/after yang sudah
+      diperkecil (scale < 1), jadi komposit kecil juga lebih murah.
+    - Setiap encode dicatat ke profile sebagai tahap encode:<jenis>
+      dengan waktu dan ukuran bytes hasilnya.
+    - Kanvas dari pool dikembalikan setelah semua encode selesai;
+      after_bgr tetap milik pemanggil.
+
+    Mengembalikan list bytes berurutan seperti OUTPUT_KINDS (tanpa
+    jenis yang dimatikan).
+    """
+    specs = specs or DEFAULT_OUTPUTS
+    encoder = encoder_pool()
+    final_spec, ba_spec = specs['final'], specs.get('before_after')
+    jobs = [('final', encoder.submit(_encode_job, _output_scaled(after_bgr, final_spec),
+                                     final_spec))]
+    ba_img = None
+    try:
+        if ba_spec is not None:
+            ba_img = profiled(profile, 'before_after', make_before_after_image,
+                              _output_scaled(before_bgr, ba_spec),
+                              _output_scaled(after_bgr, ba_spec), None, pool)
+            jobs.append(('before_after', encoder.submit(_encode_job, ba_img, ba_spec)))
+    finally:
+        # kanvas & after_bgr baru boleh dipakai ulang setelah encode selesai
+        wait([fut for _, fut in jobs])
+        if pool is not None and ba_img is not None:
+            pool.release(ba_img)
+
+    payloads = []
+    for kind, fut in jobs:
+        data, wall, cpu = fut.result()
+        if profile is not None:
+            profile.add(f"encode:{kind}", wall_s=wall, cpu_s=cpu, out_bytes=len(data))
+        payloads.append(data)
+    return payloads
+
+
+def write_bytes(path, data):
+    """
+    Menulis bytes ke file secara atomik: isi ditulis ke file sementara
+    tersembunyi di folder yang sama lalu di-rename ke path, sehingga
+    pembaca (atau batch yang terputus) tidak pernah melihat file
+    setengah jadi. Mengembalikan jumlah bytes yang ditulis.
+    """
+    folder, name = os.path.split(path)
+    tmp = os.path.join(folder, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return len(data)
@@ -0,0 +1,358 @@
+"""Fungsi file & direktori: daftar gambar, path output, thumbnail, cascade."""
+import os
+import time
+import hashlib
+import threading
+
+import cv2
+
+from .encoder import OUTPUT_KINDS, output_ext
+from .filters import downscale_to_fit
+
+
+# ============================================================
+#                     FUNGSI FILE & DIREKTORI
+# ============================================================
+
+def ensure_dir(path):
+    """
+    Membuat folder jika belum ada.
+    Berguna untuk memastikan folder output tersedia.
+    """
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def _scan_entries(folder, recursive=False, exclude=()):
+    """
+    Generator (path_relatif, os.DirEntry) untuk file gambar di folder,
+    dengan os.scandir (tanpa stat tambahan per file di kebanyakan OS).
+    Sub-folder ditelusuri jika recursive; folder tersembunyi (".xxx")
+    dan folder di exclude (mis. folder output) dilewati, begitu juga
+    sub-folder yang tidak bisa dibaca.
+    """
+    exclude = {os.path.realpath(p) for p in exclude}
+    stack = [(folder, "")]
+    while stack:
+        path, rel = stack.pop()
+        try:
+            it = os.scandir(path)
+        except OSError:
+            if not rel:
+                raise
+            continue
+        with it:
+            for entry in it:
+                name = rel + entry.name
+                try:
+                    if entry.is_file():
+                        if entry.name.lower().endswith(IMAGE_EXTS):
+                            yield name, entry
+                    elif (recursive and entry.is_dir() and not entry.name.startswith(".")
+                          and os.path.realpath(entry.path) not in exclude):
+                        stack.append((entry.path, name + os.sep))
+                except OSError:
+                    continue
+
+
+def scan_image_files(folder, recursive=False, exclude=()):
+    """
+    Generator nama file gambar (relatif terhadap folder, mis.
+    "sub/foto.jpg") dalam urutan direktori — hasil pertama langsung
+    tersedia tanpa menunggu seluruh folder terbaca. Lihat _scan_entries.
+    """
+    for name, _ in _scan_entries(folder, recursive, exclude):
+        yield name
+
+
+def list_image_files(folder, recursive=False, exclude=()):
+    """
+    Mengambil daftar nama file gambar (terurut) di dalam folder.
+    Hanya ekstensi pada IMAGE_EXTS yang diambil; recursive ikut
+    menelusuri sub-folder (lihat scan_image_files).
+    """
+    return sorted(scan_image_files(folder, recursive, exclude))
+
+
+def image_file_complete(path):
+    """
+    Cek cepat apakah file gambar sudah selesai ditulis, dari penanda
+    akhir formatnya: JPEG berakhir dengan EOI (FF D9, boleh diikuti
+    padding byte nol), PNG dengan chunk IEND, BMP sepanjang ukuran di
+    header. Format lain dianggap lengkap. FF D9 di tengah file (mis.
+    akhir thumbnail EXIF) tidak dihitung sebagai akhir JPEG.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        with open(path, 'rb') as f:
+            if ext == '.bmp':
+                head = f.read(6)
+                return len(head) == 6 and int.from_bytes(head[2:6], 'little') <= os.fstat(f.fileno()).st_size
+            size = os.fstat(f.fileno()).st_size
+            f.seek(max(0, size - 4096))
+            tail = f.read()
+    except OSError:
+        return False
+    if ext in ('.jpg', '.jpeg'):
+        return tail.rstrip(b'\x00').endswith(b'\xff\xd9')
+    if ext == '.png':
+        return tail.endswith(b'IEND\xaeB`\x82')
+    return True
+
+
+# Mode pantau folder (watch_image_files): jeda antar scan & lama file
+# harus tidak berubah sebelum dianggap selesai disalin (detik)
+WATCH_INTERVAL = 1.0
+WATCH_SETTLE = 2.0
+
+
+def watch_image_files(folder, stop, recursive=False, exclude=(),
+                      interval=WATCH_INTERVAL, settle=WATCH_SETTLE):
+    """
+    Generator untuk hot folder: menghasilkan nama file gambar (relatif)
+    yang sudah ada maupun yang baru masuk, sampai stop
+    (threading.Event) di-set.
+
+    Cara kerja:
+    - Folder di-scan ulang setiap interval detik (_scan_entries).
+    - Debounce: file dihasilkan setelah tidak ditulis selama settle
+      detik — ukuran & mtime tidak berubah antar scan selama itu,
+      atau mtime-nya sudah lebih lama dari settle (file yang sudah
+      ada sejak awal langsung diproses) — dan image_file_complete
+      memastikan penanda akhir formatnya sudah ada, sehingga file
+      yang masih disalin tidak ikut diproses setengah jadi.
+    - File yang kemudian ditimpa (ukuran/mtime berubah) dihasilkan
+      lagi; file yang dihapus dilupakan.
+    Dalam satu scan, file dihasilkan berurutan menurut nama.
+    """
+    pending = {}    # nama → ((ukuran, mtime_ns), waktu pertama terlihat)
+    emitted = {}    # nama → (ukuran, mtime_ns) saat dihasilkan
+    while not stop.is_set():
+        now = time.monotonic()
+        ready = []
+        seen = set()
+        for name, entry in _scan_entries(folder, recursive, exclude):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            seen.add(name)
+            state = (st.st_size, st.st_mtime_ns)
+            if emitted.get(name) == state:
+                continue
+            idle = time.time() - st.st_mtime >= settle
+            prev = pending.get(name)
+            if prev is not None and prev[0] == state:
+                stable = idle or now - prev[1] >= settle
+            else:
+                pending[name] = (state, now)
+                stable = prev is None and idle
+            if stable and image_file_complete(entry.path):
+                ready.append(name)
+                emitted[name] = state
+                del pending[name]
+        for gone in [n for n in list(pending) + list(emitted) if n not in seen]:
+            pending.pop(gone, None)
+            emitted.pop(gone, None)
+        for name in sorted(ready):
+            yield name
+        stop.wait(interval)
+
+
+def output_paths(output_folder, fname, preset=None, output_specs=None):
+    """
+    Mengembalikan path output (final, before_after) untuk sebuah file input.
+    preset (opsional) ditambahkan ke nama file: foto_<preset>_final.jpg.
+    Ekstensi mengikuti format di output_specs (default .jpg).
+    """
+    base = os.path.splitext(fname)[0]
+    if preset:
+        base = f"{base}_{preset}"
+    return tuple(os.path.join(output_folder, f"{base}_{kind}{output_ext(output_specs, kind)}")
+                 for kind in OUTPUT_KINDS)
+
+
+# Sisi terpanjang proxy untuk preview (2x ukuran label preview GUI)
+PREVIEW_MAX_SIDE = 960
+
+# Mode decode JPEG tereduksi (1/2, 1/4, 1/8) dari yang paling kecil
+_REDUCED_MODES = ((8, cv2.IMREAD_REDUCED_COLOR_8),
+                  (4, cv2.IMREAD_REDUCED_COLOR_4),
+                  (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+
+def imread_reduced(path, max_side):
+    """
+    Membaca gambar untuk preview dengan sisi terpanjang <= max_side.
+
+    Untuk JPEG dipakai decode tereduksi (IMREAD_REDUCED_*): decoder
+    hanya menghitung 1/2, 1/4 atau 1/8 resolusi sehingga jauh lebih
+    cepat daripada decode penuh. Faktor terbesar dipilih selama hasilnya
+    masih >= max_side, lalu diperkecil dengan INTER_AREA.
+    Mengembalikan None jika file tidak bisa dibaca.
+    """
+    flags = cv2.IMREAD_COLOR
+    if path.lower().endswith(('.jpg', '.jpeg')):
+        from PIL import Image
+        try:
+            with Image.open(path) as im:
+                longest = max(im.size)
+        except OSError:
+            longest = 0
+        for factor, mode in _REDUCED_MODES:
+            if longest // factor >= max_side:
+                flags = mode
+                break
+
+    img = cv2.imread(path, flags)
+    if img is None:
+        return None
+    return downscale_to_fit(img, max_side)
+
+
+def default_cache_dir():
+    """Folder cache aplikasi ($XDG_CACHE_HOME atau ~/.cache)/image_enhancer."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "image_enhancer")
+
+
+# Batas ukuran cache thumbnail di disk (bytes)
+THUMB_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ThumbnailCache:
+    """
+    Cache thumbnail preview di disk.
+
+    Kunci: path absolut, mtime, ukuran file, dan max_side. File yang
+    berubah otomatis mendapat kunci baru. Thumbnail disimpan sebagai
+    PNG (lossless) agar preview dari cache identik dengan hasil decode.
+
+    Ukuran cache dibatasi max_bytes: thumbnail yang dipakai disentuh
+    (mtime diperbarui), dan jika batas terlewati thumbnail yang paling
+    lama tidak dipakai dihapus sampai ukuran turun ke 3/4 batas (LRU).
+    clear() mengosongkan seluruh cache; folder cache juga aman dihapus
+    manual kapan saja.
+    """
+    def __init__(self, folder=None, max_side=PREVIEW_MAX_SIDE, max_bytes=THUMB_CACHE_MAX_BYTES):
+        self.folder = folder or os.path.join(default_cache_dir(), "thumbs")
+        self.max_side = max_side
+        self.max_bytes = max_bytes
+        ensure_dir(self.folder)
+        self.nbytes = sum(size for _, _, size in self._entries())
+        if self.nbytes > self.max_bytes:
+            self.prune()
+
+    def _cache_path(self, key):
+        digest = hashlib.sha1("|".join(map(str, key + (self.max_side,))).encode()).hexdigest()
+        return os.path.join(self.folder, digest[:2], digest + ".png")
+
+    def _entries(self):
+        """(path, mtime, ukuran) semua thumbnail di folder cache."""
+        out = []
+        for sub in os.scandir(self.folder):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith(".png"):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    out.append((entry.path, st.st_mtime, st.st_size))
+        return out
+
+    def prune(self, target=None):
+        """
+        Menghapus thumbnail yang paling lama tidak dipakai sampai ukuran
+        cache <= target (default 3/4 max_bytes, agar tidak memangkas
+        pada setiap thumbnail baru).
+        """
+        if target is None:
+            target = self.max_bytes * 3 // 4
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self.nbytes = total
+
+    def clear(self):
+        """Menghapus semua thumbnail di cache."""
+        self.prune(target=0)
+
+    def load(self, path, key=None):
+        """
+        Thumbnail untuk path (key = image_file_key(path) jika tidak
+        diisi). Jika belum ada di cache, dibuat dengan imread_reduced
+        lalu disimpan. Mengembalikan None jika file tidak bisa dibaca.
+        """
+        if key is None:
+            key = image_file_key(path)
+        cache_path = self._cache_path(key)
+        if os.path.exists(cache_path):
+            img = cv2.imread(cache_path)
+            if img is not None:
+                try:
+                    os.utime(cache_path)
+                except OSError:
+                    pass
+                return img
+
+        img = imread_reduced(path, self.max_side)
+        if img is not None:
+            try:
+                ensure_dir(os.path.dirname(cache_path))
+                tmp = f"{cache_path}.{os.getpid()}.tmp.png"
+                cv2.imwrite(tmp, img, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+                os.replace(tmp, cache_path)
+                self.nbytes += os.path.getsize(cache_path)
+            except (OSError, cv2.error):
+                pass
+            if self.nbytes > self.max_bytes:
+                self.prune()
+        return img
+
+
+def image_file_key(path):
+    """Identitas file gambar: (path absolut, mtime_ns, ukuran)."""
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+# Haar Cascade yang sudah di-load, satu per thread (lihat FaceCascade)
+_CASCADES = threading.local()
+
+
+class FaceCascade:
+    """
+    Haar Cascade wajah (cv2.data.haarcascades) yang baru di-load saat
+    detectMultiScale pertama dipanggil, sehingga proses yang tidak
+    mendeteksi wajah (face beauty mati, kotak wajah dari cache) tidak
+    membayar biaya load XML.
+
+    cv2.CascadeClassifier tidak thread-safe: classifier disimpan per
+    thread dan dipakai bersama oleh semua FaceCascade di thread itu.
+    """
+    def detectMultiScale(self, *args, **kwargs):
+        cascade = getattr(_CASCADES, 'cascade', None)
+        if cascade is None:
+            path = os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+            cascade = _CASCADES.cascade = cv2.CascadeClassifier(path)
+        return cascade.detectMultiScale(*args, **kwargs)
+
+
+def load_face_cascade():
+    """
+    Haar Cascade wajah untuk pipeline (FaceCascade: di-load saat
+    pertama dipakai, dipakai bersama per thread).
+    """
+    return FaceCascade()
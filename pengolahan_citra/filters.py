@@ -0,0 +1,522 @@
+"""Fungsi tahap pengolahan gambar dan tier kualitas (exact / balanced / fast)."""
+import os
+import json
+
+import cv2
+import numpy as np
+
+
+# ============================================================
+#                FUNGSI-FUNGSI PENDUKUNG GAMBAR
+# ============================================================
+
+def auto_white_balance_grayworld(img_bgr):
+    """
+    Melakukan koreksi Auto White Balance menggunakan metode Gray-World.
+    Konsep: rata-rata nilai R, G, B harus sama (abu-abu).
+    
+    Cara kerja:
+    - Hitung rata-rata channel R, G, B.
+    - Hitung rata-rata keseluruhan.
+    - Skala tiap channel agar mendekati nilai rata-rata keseluruhan.
+    
+    Hasil: warna gambar lebih netral dan tidak dominan warna tertentu.
+    """
+    img = img_bgr.astype(np.float32)
+    r_avg = img[:, :, 2].mean()
+    g_avg = img[:, :, 1].mean()
+    b_avg = img[:, :, 0].mean()
+    avg = (r_avg + g_avg + b_avg) / 3.0
+
+    img[:, :, 2] = np.clip(img[:, :, 2] * (avg / (r_avg + 1e-8)), 0, 255)
+    img[:, :, 1] = np.clip(img[:, :, 1] * (avg / (g_avg + 1e-8)), 0, 255)
+    img[:, :, 0] = np.clip(img[:, :, 0] * (avg / (b_avg + 1e-8)), 0, 255)
+    return img.astype(np.uint8)
+
+
+def auto_exposure_stretch(img_bgr, low_perc=1, high_perc=99):
+    """
+    Melakukan koreksi exposure dengan contrast stretching.
+    
+    Cara kerja:
+    - Konversi gambar ke YCrCb.
+    - Ambil channel Y (luminance / terang).
+    - Ambil nilai percentile rendah & tinggi.
+    - Rentang pixel diregangkan sehingga kontras meningkat.
+    
+    Efek: gambar tampak lebih cerah & jelas tanpa merusak warna.
+    """
+    img_yuv = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2YCrCb)
+    img_yuv[:, :, 0] = stretch_luminance(img_yuv[:, :, 0], low_perc, high_perc)
+
+    return cv2.cvtColor(img_yuv, cv2.COLOR_YCrCb2BGR)
+
+
+def stretch_luminance(Y, low_perc=1, high_perc=99):
+    """
+    Contrast stretching pada satu plane luminance (uint8).
+    Dipakai oleh auto_exposure_stretch dan mode pipeline fused.
+
+    Karena Y 8-bit, percentile dibaca dari histogram kumulatif
+    256-bin dan stretching diterapkan sebagai LUT 256 entri —
+    tanpa sorting dan tanpa buffer float seukuran gambar.
+    """
+    hist = cv2.calcHist([Y], [0], None, [256], [0, 256]).ravel()
+    low, high = histogram_percentiles(hist, (low_perc, high_perc))
+    return cv2.LUT(Y, stretch_lut(low, high))
+
+
+def histogram_percentiles(hist, percs):
+    """
+    Percentile dari histogram 256-bin, identik dengan np.percentile
+    (interpolasi linear) pada pixel aslinya.
+
+    Nilai dengan rank k (0-based, terurut) adalah bin pertama yang
+    jumlah kumulatifnya > k.
+    """
+    cdf = np.cumsum(hist, dtype=np.int64)
+    n = int(cdf[-1])
+    out = []
+    for p in percs:
+        rank = (n - 1) * (p / 100.0)
+        k = int(np.floor(rank))
+        frac = rank - k
+        v_lo = int(np.searchsorted(cdf, k, side='right'))
+        v_hi = int(np.searchsorted(cdf, min(k + 1, n - 1), side='right'))
+        out.append(np.float32(v_lo + (v_hi - v_lo) * frac))
+    return out
+
+
+def stretch_lut(low, high):
+    """LUT 256 entri untuk (v - low) * 255 / (high - low), di-clip ke uint8."""
+    v = np.arange(256, dtype=np.float32)
+    lut = (v - low) * (255.0 / (high - low + 1e-8))
+    return np.clip(lut, 0, 255).astype(np.uint8)
+
+
+def bilateral_denoise(img_bgr, d=9, sigmaColor=75, sigmaSpace=75, dst=None):
+    """
+    Denoise menggunakan Bilateral Filter.
+    
+    Keunggulan:
+    - Menghaluskan noise
+    - Tepi tetap tajam (tidak blur seperti Gaussian)
+    
+    Cocok untuk potret atau gambar detail.
+
+    dst (opsional): buffer tujuan, tidak boleh sama dengan img_bgr.
+    """
+    return cv2.bilateralFilter(img_bgr, d, sigmaColor, sigmaSpace, dst=dst)
+
+
+def face_beauty_filter(img_bgr, face_cascade, strength=0.6, faces=None):
+    """
+    Filter smoothing khusus area wajah (beauty filter).
+    
+    Cara kerja:
+    - Deteksi wajah dengan Haar Cascade.
+    - Tambah padding agar smoothing terlihat natural.
+    - Terapkan bilateral + edgePreservingFilter pada area wajah.
+    - Blend (campur) hasil smoothing dengan gambar asli sesuai strength.
+    
+    Hasil: kulit wajah lebih halus tapi tetap natural.
+
+    faces (opsional) berisi kotak wajah yang sudah dideteksi
+    sebelumnya; jika diisi, deteksi dilewati.
+    """
+    if faces is None:
+        faces = detect_faces(img_bgr, face_cascade)
+    return smooth_faces(img_bgr, faces, strength)
+
+
+# Sisi terpanjang gambar untuk deteksi wajah; gambar lebih besar
+# diperkecil dulu lalu kotaknya diskalakan kembali
+FACE_DETECT_MAX_SIDE = 1280
+
+
+def face_min_size(scale):
+    """
+    minSize deteksi wajah (px) pada gambar yang diperkecil dengan
+    faktor scale: 30 px di resolusi asli, minimal 24 px (ukuran
+    jendela cascade; wajah lebih kecil tidak bisa terdeteksi).
+    """
+    return max(24, int(round(30 * scale)))
+
+
+def detect_faces(img_bgr, face_cascade, max_side=FACE_DETECT_MAX_SIDE):
+    """
+    Deteksi wajah dengan Haar Cascade, mengembalikan list kotak
+    (x, y, w, h) pada resolusi img_bgr.
+
+    Jika sisi terpanjang > max_side, deteksi dijalankan pada salinan
+    grayscale yang diperkecil (minSize ikut diskalakan, minimal 24 px
+    = ukuran jendela cascade) lalu kotak dipetakan kembali.
+    max_side=None: selalu resolusi penuh.
+    """
+    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+    scale = 1.0
+    if max_side is not None and max(gray.shape) > max_side:
+        scale = max_side / max(gray.shape)
+        gray = cv2.resize(gray, (max(1, int(gray.shape[1] * scale)),
+                                 max(1, int(gray.shape[0] * scale))),
+                          interpolation=cv2.INTER_AREA)
+
+    min_side = face_min_size(scale)
+    faces = face_cascade.detectMultiScale(gray, 1.1, 5, minSize=(min_side, min_side))
+    return [tuple(int(round(v / scale)) for v in box) for box in faces]
+
+
+class FaceBoxCache:
+    """
+    Cache kotak wajah per gambar sumber, agar pipeline ulang dan
+    retry batch tidak perlu mendeteksi ulang.
+
+    Kunci berupa string (lihat face_cache_key). Jika path diisi,
+    cache dibaca dari / disimpan ke file JSON.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.boxes = {}
+        self.new = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self.boxes = {k: [tuple(b) for b in v] for k, v in json.load(f).items()}
+            except (OSError, ValueError):
+                self.boxes = {}
+
+    def get(self, key):
+        return self.boxes.get(key)
+
+    def put(self, key, faces):
+        faces = [tuple(int(v) for v in b) for b in faces]
+        self.boxes[key] = faces
+        self.new[key] = faces
+
+    def take_new(self):
+        """Mengambil (dan mengosongkan) entri yang ditambahkan sejak panggilan terakhir."""
+        new, self.new = self.new, {}
+        return new
+
+    def update(self, entries):
+        for key, faces in entries.items():
+            self.put(key, faces)
+
+    def save(self):
+        """Menulis cache ke file JSON (atomic: tulis file sementara lalu rename)."""
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.boxes, f)
+        os.replace(tmp, self.path)
+
+
+def face_cache_key(image_key, prefix):
+    """
+    Kunci FaceBoxCache: identitas gambar sumber + nama tahap sebelum
+    face beauty (input deteksi bergantung pada tahap-tahap itu).
+    """
+    return "|".join([str(v) for v in image_key] + list(prefix))
+
+
+def cached_face_detector(face_cascade, face_cache, key):
+    """Fungsi deteksi wajah yang membaca/mengisi face_cache dengan kunci key."""
+    def detect(img_bgr):
+        faces = face_cache.get(key)
+        if faces is None:
+            faces = detect_faces(img_bgr, face_cascade)
+            face_cache.put(key, faces)
+        return faces
+    return detect
+
+
+def smooth_faces(img_bgr, faces, strength=0.6, dst=None, quality='exact'):
+    """
+    Smoothing pada setiap kotak wajah (lihat face_beauty_filter).
+    Kotak yang berada di luar gambar dilewati.
+
+    dst (opsional): buffer tujuan; boleh sama dengan img_bgr (in-place).
+    Semua ROI dihitung dari gambar asli sebelum ditulis, sehingga
+    kotak yang tumpang tindih memberi hasil yang sama di kedua mode.
+
+    quality 'balanced' / 'fast': filter smoothing dihitung pada ROI
+    yang diperkecil (lihat TIER_PARAMS) lalu di-upsample.
+    """
+    scale = TIER_PARAMS[quality]['face'] if quality != 'exact' else 1
+    patches = []
+    for (x, y, w, h) in faces:
+        pad = int(0.2 * w)
+        x1 = max(0, x - pad)
+        y1 = max(0, y - pad)
+        x2 = min(img_bgr.shape[1], x + w + pad)
+        y2 = min(img_bgr.shape[0], y + h + pad)
+        if x2 <= x1 or y2 <= y1:
+            continue
+
+        roi = img_bgr[y1:y2, x1:x2].copy()
+        smooth = _smooth_roi(roi, scale)
+        blended = cv2.addWeighted(roi, 1.0 - strength, smooth, strength, 0)
+        patches.append((y1, y2, x1, x2, blended))
+
+    if dst is None:
+        img_out = img_bgr.copy()
+    else:
+        img_out = dst
+        if dst is not img_bgr:
+            np.copyto(dst, img_bgr)
+    for y1, y2, x1, x2, blended in patches:
+        img_out[y1:y2, x1:x2] = blended
+
+    return img_out
+
+
+def _smooth_roi(roi, scale=1):
+    """
+    Campuran bilateral + edgePreservingFilter untuk satu ROI wajah.
+    scale > 1: dihitung pada ROI yang diperkecil scale kali (diameter
+    dan sigma_s ikut diperkecil) lalu di-upsample.
+    """
+    h, w = roi.shape[:2]
+    src = roi
+    if scale > 1 and min(h, w) >= 4 * scale:
+        src = cv2.resize(roi, (w // scale, h // scale), interpolation=cv2.INTER_AREA)
+    else:
+        scale = 1
+
+    sm1 = cv2.bilateralFilter(src, max(3, (9 // scale) | 1), 90, 90)
+
+    try:
+        sm2 = cv2.edgePreservingFilter(src, flags=1, sigma_s=60 / scale, sigma_r=0.4)
+    except Exception:
+        sm2 = cv2.detailEnhance(src, sigma_s=10 / scale, sigma_r=0.15)
+
+    smooth = cv2.addWeighted(sm1, 0.5, sm2, 0.5, 0)
+    if scale > 1:
+        smooth = cv2.resize(smooth, (w, h), interpolation=cv2.INTER_LINEAR)
+    return smooth
+
+
+def clahe_on_luminance(img_bgr, clipLimit=2.0, tileGridSize=(8,8)):
+    """
+    CLAHE hanya pada channel luminance Y.
+    
+    Kelebihan:
+    - Meningkatkan kontras lokal
+    - Tidak merusak warna (Cr/Cb tidak diubah)
+    """
+    ycrcb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2YCrCb)
+    Y, Cr, Cb = cv2.split(ycrcb)
+
+    Yc = clahe_luminance(Y, clipLimit, tileGridSize)
+
+    ycrcbc = cv2.merge((Yc, Cr, Cb))
+    return cv2.cvtColor(ycrcbc, cv2.COLOR_YCrCb2BGR)
+
+
+def clahe_luminance(Y, clipLimit=2.0, tileGridSize=(8,8)):
+    """CLAHE pada satu plane luminance (uint8)."""
+    clahe = cv2.createCLAHE(clipLimit=clipLimit, tileGridSize=tileGridSize)
+    return clahe.apply(Y)
+
+
+def hdr_like_local_contrast(img_bgr):
+    """
+    Efek pseudo-HDR.
+    
+    Cara kerja:
+    1. detailEnhance → menonjolkan detail.
+    2. CLAHE → menambah local contrast.
+    
+    Hasil: gambar terlihat lebih “pop” dan dramatis seperti HDR.
+    """
+    de = hdr_detail_enhance(img_bgr)
+    clahe = clahe_on_luminance(de, clipLimit=2.2)
+    return clahe
+
+
+def hdr_detail_enhance(img_bgr, dst=None):
+    """
+    Tahap pertama HDR-like: detailEnhance (fallback: bilateral).
+    dst (opsional): buffer tujuan, tidak boleh sama dengan img_bgr.
+    """
+    try:
+        return cv2.detailEnhance(img_bgr, dst=dst, sigma_s=12, sigma_r=0.15)
+    except Exception:
+        return cv2.bilateralFilter(img_bgr, 9, 75, 75, dst=dst)
+
+
+# Amount unsharp mask yang dipakai pipeline
+SHARPEN_AMOUNT = 0.8
+
+
+def unsharp_mask(img_bgr, amount=1.5, sigma=1.0, dst=None):
+    """
+    Sharpening menggunakan teknik Unsharp Mask.
+    
+    Cara kerja:
+    - Blur gambar
+    - Gabungkan gambar asli dengan gambar blur → meningkatkan edge
+    
+    Hasil: gambar lebih tajam tapi tetap natural.
+
+    dst (opsional): buffer tujuan (tidak boleh sama dengan img_bgr);
+    blur ditulis ke dst lalu digabung di tempat, tanpa buffer lain.
+    """
+    if dst is not None:
+        blur = cv2.GaussianBlur(img_bgr, (0,0), sigma, dst=dst)
+        return cv2.addWeighted(img_bgr, 1.0 + amount, blur, -amount, 0, dst=dst)
+    blur = cv2.GaussianBlur(img_bgr, (0,0), sigma)
+    sharp = cv2.addWeighted(img_bgr, 1.0 + amount, blur, -amount, 0)
+    return np.clip(sharp, 0, 255).astype(np.uint8)
+
+
+def final_color_tone(img_bgr):
+    """
+    Pengaturan tone akhir:
+    - Naikkan saturasi (warna lebih vivid)
+    - Turunkan brightness sedikit agar tidak overexposed.
+    """
+    hsv = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2HSV)
+    return cv2.cvtColor(tone_hsv(hsv), cv2.COLOR_HSV2BGR)
+
+
+def tone_hsv(hsv, sat=1.06, val=0.98):
+    """Skala saturasi (S) & brightness (V) pada gambar HSV uint8."""
+    hsv = hsv.astype(np.float32)
+    hsv[:, :, 1] = np.clip(hsv[:, :, 1] * sat, 0, 255)
+    hsv[:, :, 2] = np.clip(hsv[:, :, 2] * val, 0, 255)
+    return hsv.astype(np.uint8)
+
+
+def downscale_to_fit(img_bgr, max_side):
+    """
+    Memperkecil gambar (INTER_AREA) agar sisi terpanjang <= max_side.
+    Gambar yang sudah cukup kecil dikembalikan apa adanya.
+    """
+    h, w = img_bgr.shape[:2]
+    scale = max_side / max(h, w)
+    if scale >= 1.0:
+        return img_bgr
+    return cv2.resize(img_bgr, (max(1, int(w * scale)), max(1, int(h * scale))),
+                      interpolation=cv2.INTER_AREA)
+
+
+
+# ============================================================
+#     TIER KUALITAS – PENDEKATAN CEPAT UNTUK FILTER BERAT
+# ============================================================
+
+# 'exact' = filter asli; 'balanced' / 'fast' = pendekatan yang lebih
+# murah untuk denoise, smoothing wajah, dan detailEnhance (HDR)
+QUALITY_TIERS = ('exact', 'balanced', 'fast')
+
+# Parameter pendekatan per tier (dipilih dengan benchmarks/quality_tiers.py):
+# - denoise : guided filter (radius, eps [pixel^2], subsample)
+# - face    : faktor perkecil ROI untuk bilateral + edgePreservingFilter
+# - hdr     : guided filter pada L (radius, eps [(L/255)^2], subsample)
+TIER_PARAMS = {
+    'balanced': {'denoise': (2, 300.0, 1), 'face': 2, 'hdr': (8, 0.15 ** 2 / 4, 2)},
+    'fast': {'denoise': (2, 200.0, 2), 'face': 4, 'hdr': (8, 0.15 ** 2 / 4, 4)},
+}
+
+
+def check_quality(quality):
+    """Melempar ValueError jika quality bukan salah satu QUALITY_TIERS."""
+    if quality not in QUALITY_TIERS:
+        raise ValueError(f"quality harus salah satu dari {QUALITY_TIERS}, bukan {quality!r}")
+
+
+def tier_stage_name(name, quality):
+    """Nama tahap di rencana: 'denoise' (exact) atau 'denoise:fast'."""
+    return name if quality == 'exact' else f"{name}:{quality}"
+
+
+def stage_base_name(name):
+    """Nama tahap tanpa tier ('denoise:fast' → 'denoise')."""
+    return name.partition(':')[0]
+
+
+def _box(x, r):
+    return cv2.boxFilter(x, -1, (2 * r + 1, 2 * r + 1), borderType=cv2.BORDER_REFLECT)
+
+
+def guided_filter_self(img, radius, eps, subsample=1, dst=None):
+    """
+    Guided filter (He dkk.) dengan gambar itu sendiri sebagai guide,
+    per channel — smoothing yang menjaga tepi dengan biaya O(1) per
+    pixel (hanya box filter), berapa pun radius-nya.
+
+    Cara kerja:
+    - a = var / (var + eps), b = mean * (1 - a) dalam jendela radius.
+    - Hasil = mean(a) * I + mean(b).
+    - subsample > 1 ("fast guided filter"): a dan b dihitung pada
+      gambar yang diperkecil lalu di-upsample; I tetap resolusi penuh.
+
+    Input uint8 → hasil uint8 (dibulatkan, ke dst jika diisi);
+    input float32 → hasil float32.
+    """
+    I = img.astype(np.float32) if img.dtype != np.float32 else img
+    h, w = I.shape[:2]
+    small = I
+    if subsample > 1:
+        small = cv2.resize(I, (max(1, w // subsample), max(1, h // subsample)),
+                           interpolation=cv2.INTER_AREA)
+        radius = max(1, radius // subsample)
+
+    mean = _box(small, radius)
+    var = _box(cv2.multiply(small, small), radius) - cv2.multiply(mean, mean)
+    a = cv2.divide(var, var + eps)
+    b = mean - cv2.multiply(a, mean)
+    mean_a = _box(a, radius)
+    mean_b = _box(b, radius)
+    if subsample > 1:
+        mean_a = cv2.resize(mean_a, (w, h), interpolation=cv2.INTER_LINEAR)
+        mean_b = cv2.resize(mean_b, (w, h), interpolation=cv2.INTER_LINEAR)
+
+    if img.dtype == np.uint8:
+        return cv2.add(cv2.multiply(mean_a, I), mean_b, dst=dst, dtype=cv2.CV_8U)
+    return cv2.multiply(mean_a, I) + mean_b
+
+
+def guided_denoise(img_bgr, quality='balanced', dst=None):
+    """Pengganti bilateral_denoise untuk tier balanced / fast (guided filter)."""
+    radius, eps, subsample = TIER_PARAMS[quality]['denoise']
+    return guided_filter_self(img_bgr, radius, eps, subsample, dst)
+
+
+def approx_detail_enhance(img_bgr, quality='balanced', dst=None):
+    """
+    Pengganti hdr_detail_enhance untuk tier balanced / fast.
+
+    Mengikuti langkah cv2.detailEnhance (Lab float, L dibagi 255,
+    detail = L - base dikuatkan 3x), tetapi base layer dihitung dengan
+    guided filter alih-alih domain transform filter.
+    """
+    radius, eps, subsample = TIER_PARAMS[quality]['hdr']
+    lab = cv2.cvtColor(img_bgr.astype(np.float32) * np.float32(1 / 255.0), cv2.COLOR_BGR2Lab)
+    L = lab[:, :, 0] * np.float32(1 / 255.0)
+    base = guided_filter_self(L, radius, eps, subsample)
+    lab[:, :, 0] = (3.0 * L - 2.0 * base) * 255.0
+    out = cv2.cvtColor(lab, cv2.COLOR_Lab2BGR)
+    out *= 255.0
+    np.rint(out, out=out)
+    np.clip(out, 0, 255, out=out)
+    if dst is None:
+        return out.astype(np.uint8)
+    np.copyto(dst, out, casting='unsafe')
+    return dst
+
+
+def denoise_fn(quality='exact'):
+    """Fungsi tahap denoise untuk tier quality (menerima dst)."""
+    if quality == 'exact':
+        return bilateral_denoise
+    return lambda img, dst=None: guided_denoise(img, quality, dst)
+
+
+def detail_fn(quality='exact'):
+    """Fungsi tahap detailEnhance HDR untuk tier quality (menerima dst)."""
+    if quality == 'exact':
+        return hdr_detail_enhance
+    return lambda img, dst=None: approx_detail_enhance(img, quality, dst)
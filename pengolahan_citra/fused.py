@@ -0,0 +1,341 @@
+"""Mode fused: rencana tahap, konversi ruang warna sekali, dan preset."""
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from .analysis import analyze_image, auto_adjustments
+from .filters import (SHARPEN_AMOUNT, auto_white_balance_grayworld, cached_face_detector,
+                      check_quality, clahe_luminance, denoise_fn, detail_fn, face_cache_key,
+                      stage_base_name, stretch_luminance, tier_stage_name, tone_hsv,
+                      unsharp_mask)
+from .profiling import face_stage, profiled
+from .stats import ImageStats, apply_point_stages, awb_luts, exposure_luts, tone_luts
+
+
+# ============================================================
+#       MODE FUSED – RENCANA KONVERSI RUANG WARNA SEKALI
+# ============================================================
+# Opsi tahap (do_*) enhancement_pipeline / plan_pipeline
+PIPELINE_OPTIONS = ('do_awb', 'do_exposure', 'do_denoise', 'do_face_beauty',
+                    'do_hdr', 'do_sharpen', 'do_final_tone')
+
+
+# Konversi dari/ke BGR untuk tiap ruang warna kerja
+_TO_SPACE = {'ycrcb': cv2.COLOR_BGR2YCrCb, 'hsv': cv2.COLOR_BGR2HSV}
+_FROM_SPACE = {'ycrcb': cv2.COLOR_YCrCb2BGR, 'hsv': cv2.COLOR_HSV2BGR}
+
+
+def _on_y_plane(fn):
+    """
+    Membungkus fungsi plane-Y menjadi tahap yang bekerja pada gambar
+    YCrCb: Y diambil, diproses, lalu ditulis kembali di tempat
+    (Cr/Cb tidak disentuh, tanpa split/merge). Gambar read-only
+    (mis. milik StageCache) disalin dulu; jika dst diisi, hasil
+    ditulis ke dst (boleh sama dengan ycrcb).
+    """
+    def stage(ycrcb, dst=None):
+        if dst is not None:
+            if dst is not ycrcb:
+                np.copyto(dst, ycrcb)
+            ycrcb = dst
+        elif not ycrcb.flags.writeable:
+            ycrcb = ycrcb.copy()
+        Y = cv2.extractChannel(ycrcb, 0)
+        cv2.insertChannel(fn(Y), ycrcb, 0)
+        return ycrcb
+    return stage
+
+
+def plan_pipeline(face_cascade,
+                  do_awb=True,
+                  do_exposure=True,
+                  do_denoise=True,
+                  do_face_beauty=True,
+                  do_hdr=True,
+                  do_sharpen=True,
+                  do_final_tone=True,
+                  face_cache=None,
+                  image_key=None,
+                  profile=None,
+                  quality='exact',
+                  sharpen_amount=SHARPEN_AMOUNT):
+    """
+    Menyusun daftar tahap untuk mode fused.
+
+    Setiap tahap berupa (nama, ruang_warna, fungsi, fungsi_lut).
+    Ruang warna:
+    - 'bgr'   : fungsi menerima & mengembalikan gambar BGR
+    - 'ycrcb' : fungsi bekerja pada gambar YCrCb (hanya channel Y)
+    - 'hsv'   : fungsi bekerja pada gambar HSV
+
+    fungsi_lut diisi untuk tahap point-wise (AWB, stretch exposure,
+    skala S/V tone) dan None untuk tahap lainnya; lihat
+    apply_point_stages.
+
+    HDR dipecah menjadi detailEnhance (BGR) + CLAHE (Y) agar CLAHE
+    bisa berbagi plane Y dengan tahap luminance yang bersebelahan.
+
+    Jika face_cache (FaceBoxCache) dan image_key diisi, kotak wajah
+    diambil dari cache bila gambar & tahap sebelumnya sama.
+
+    profile (StageProfiler) menerima jumlah & luas wajah yang terdeteksi.
+
+    quality memilih tier filter berat; tahap yang didekati diberi nama
+    bertier (mis. 'denoise:fast', lihat tier_stage_name) agar cache
+    tidak tertukar antar tier.
+
+    sharpen_amount selain SHARPEN_AMOUNT (sharpen diperlemah mode
+    auto) juga memberi nama tahap tersendiri, mis. 'sharpen:0.4'.
+    """
+    check_quality(quality)
+    plan = []
+    if do_awb:
+        plan.append(('awb', 'bgr', auto_white_balance_grayworld, awb_luts))
+    if do_exposure:
+        plan.append(('exposure', 'ycrcb', _on_y_plane(stretch_luminance),
+                     exposure_luts))
+    if do_denoise:
+        plan.append((tier_stage_name('denoise', quality), 'bgr', denoise_fn(quality), None))
+    if do_face_beauty:
+        detect = None
+        if face_cache is not None and image_key is not None:
+            detect = cached_face_detector(
+                face_cascade, face_cache,
+                face_cache_key(image_key, [st[0] for st in plan]))
+        plan.append((tier_stage_name('face_beauty', quality), 'bgr',
+                     face_stage(face_cascade, detect, profile, quality=quality), None))
+    if do_hdr:
+        plan.append((tier_stage_name('hdr_detail', quality), 'bgr', detail_fn(quality), None))
+        plan.append(('hdr_clahe', 'ycrcb',
+                     _on_y_plane(lambda Y: clahe_luminance(Y, clipLimit=2.2)), None))
+    if do_sharpen:
+        plan.append((_sharpen_name(sharpen_amount), 'bgr',
+                     lambda img, dst=None: unsharp_mask(img, amount=sharpen_amount, sigma=1.2,
+                                                        dst=dst),
+                     None))
+    if do_final_tone:
+        plan.append(('final_tone', 'hsv', tone_hsv, tone_luts))
+    return plan
+
+
+def _sharpen_name(amount):
+    return 'sharpen' if amount == SHARPEN_AMOUNT else f"sharpen:{amount:g}"
+
+
+def _plan_steps(plan):
+    """
+    Mengelompokkan rencana tahap menjadi langkah eksekusi:
+    (nama_tahap, ruang_warna, fungsi, daftar_fungsi_lut). Tahap
+    point-wise berurutan dalam ruang warna yang sama menjadi satu
+    langkah LUT.
+    """
+    steps = []
+    i = 0
+    while i < len(plan):
+        name, space, fn, lut_fn = plan[i]
+        j = i
+        while j < len(plan) and plan[j][1] == space and plan[j][3] is not None:
+            j += 1
+        if j > i:
+            steps.append((tuple(st[0] for st in plan[i:j]), space, None,
+                          [st[3] for st in plan[i:j]]))
+            i = j
+        else:
+            steps.append(((name,), space, fn, None))
+            i += 1
+    return steps
+
+
+# Tahap yang boleh menulis hasil ke buffer inputnya sendiri (mode pool)
+_INPLACE_STAGES = {'face_beauty', 'hdr_clahe'}
+
+
+def run_fused_pipeline(img_bgr, plan, cache=None, cache_key=None, profile=None,
+                       pool=None, stats=None):
+    """
+    Menjalankan rencana tahap dari plan_pipeline.
+
+    Cara kerja:
+    - Data kerja disimpan dalam satu representasi (BGR/YCrCb/HSV).
+    - Konversi hanya dilakukan saat ruang warna tahap berikutnya
+      berbeda, sehingga tahap luminance yang bersebelahan berbagi
+      satu plane Y tanpa bolak-balik ke BGR.
+    - Tidak ada salinan awal img_bgr; tahap pertama selalu
+      menghasilkan buffer baru.
+    - Tahap point-wise berurutan dalam ruang warna yang sama
+      digabung menjadi satu LUT per channel (apply_point_stages).
+
+    Jika cache (StageCache) dan cache_key (identitas gambar) diisi,
+    hasil setiap langkah disimpan dengan kunci (cache_key, prefix
+    nama tahap); eksekusi dilanjutkan dari prefix terpanjang yang
+    sudah ada di cache.
+
+    profile (StageProfiler) mencatat tiap langkah (langkah LUT gabungan
+    bernama 'awb+exposure' dst.) serta konversi ruang warna ('convert').
+
+    Jika pool (BufferPool) diisi (dan cache tidak dipakai), setiap
+    langkah menulis ke buffer pinjaman dari pool: LUT, konversi ruang
+    warna, dan tahap di _INPLACE_STAGES langsung di buffer kerja,
+    tahap lain ke buffer kedua (ping-pong). Hasil akhir adalah buffer
+    milik pool; kembalikan dengan pool.release() setelah selesai.
+
+    stats (ImageStats img_bgr) dipakai oleh langkah LUT yang membaca
+    img_bgr langsung; langkah LUT lain mengukur input mereka sendiri.
+    """
+    steps = _plan_steps(plan)
+    img = img_bgr
+    space = 'bgr'
+    start = 0
+
+    use_cache = cache is not None and cache_key is not None
+    use_pool = pool is not None and not use_cache
+
+    def run(name, call, inplace):
+        """img = call(img, dst); dst = buffer pool (atau None tanpa pool)."""
+        nonlocal img
+        if not use_pool:
+            img = profiled(profile, name, call, img, None)
+            return
+        src = img
+        dst = src if inplace and src is not img_bgr else pool.lease(src.shape, src.dtype)
+        img = profiled(profile, name, call, src, dst)
+        if img is not src and src is not img_bgr:
+            pool.release(src)
+
+    def convert(code):
+        run('convert', lambda src, dst: cv2.cvtColor(src, code, dst=dst), True)
+
+    prefixes = []
+    if use_cache:
+        names = ()
+        for step in steps:
+            names += step[0]
+            prefixes.append((cache_key, names))
+        for k in range(len(steps), 0, -1):
+            hit = cache.get(prefixes[k - 1])
+            if hit is not None:
+                space, img = hit
+                start = k
+                break
+
+    for k in range(start, len(steps)):
+        names, stage_space, fn, lut_fns = steps[k]
+        if stage_space != space:
+            if space != 'bgr':
+                convert(_FROM_SPACE[space])
+            if stage_space != 'bgr':
+                convert(_TO_SPACE[stage_space])
+            space = stage_space
+
+        if lut_fns is not None:
+            src_stats = stats if img is img_bgr else None
+            run("+".join(names),
+                lambda src, dst, luts=lut_fns, st=src_stats: apply_point_stages(src, luts, dst, st),
+                True)
+        else:
+            run(names[0],
+                lambda src, dst, fn=fn: fn(src) if dst is None else fn(src, dst=dst),
+                stage_base_name(names[0]) in _INPLACE_STAGES)
+
+        if use_cache:
+            cache.put(prefixes[k], (space, img))
+
+    if space != 'bgr':
+        convert(_FROM_SPACE[space])
+    elif img is img_bgr or not img.flags.writeable:
+        img = img.copy()
+    return img
+
+
+
+def run_presets(img_bgr, face_cascade, presets, face_cache=None, cache_key=None,
+                profile=None, stats=None):
+    """
+    Menjalankan beberapa preset pipeline pada satu gambar sekaligus.
+
+    presets: dict nama → dict opsi (do_awb=..., quality, auto seperti
+    enhancement_pipeline; opsi lain seperti tile_budget_mb diabaikan).
+    Untuk preset dengan auto, analisis konten dijalankan sekali untuk
+    semua preset.
+    Mengembalikan dict nama → gambar BGR hasil, identik dengan
+    menjalankan enhancement_pipeline per preset.
+
+    Cara kerja:
+    - Langkah setiap preset (_plan_steps) disusun menjadi pohon prefix:
+      langkah yang sama dengan prefix yang sama (mis. AWB → exposure
+      → denoise) menjadi satu simpul dan hanya dijalankan sekali.
+    - Pohon ditelusuri depth-first; hasil simpul yang dipakai lebih
+      dari satu cabang dijadikan read-only agar tidak diubah di tempat
+      oleh cabang lain, dan konversi ruang warna dari simpul yang sama
+      juga dipakai bersama.
+    - Biaya sebanding dengan jumlah simpul unik, bukan preset x tahap.
+    - Statistik img_bgr (ImageStats) diukur sekali untuk analisis
+      auto dan semua langkah LUT yang membaca img_bgr.
+    """
+    if stats is None:
+        stats = ImageStats(img_bgr)
+    root = {'children': OrderedDict(), 'presets': []}
+    analysis = None
+    for name, opts in presets.items():
+        auto = opts.get('auto', False)
+        opts = {k: v for k, v in opts.items() if k in PIPELINE_OPTIONS or k == 'quality'}
+        if auto:
+            if analysis is None:
+                want_faces = any(o.get('auto') and o.get('do_face_beauty', True)
+                                 for o in presets.values())
+                analysis = profiled(profile, 'analyze', analyze_image, img_bgr,
+                                    face_cascade if want_faces else None, stats)
+                record = profile.records[-1] if profile is not None else None
+            changes, skipped, weakened = auto_adjustments(analysis, opts)
+            if record is not None:
+                record.setdefault('skipped', {}).update(skipped)
+                record.setdefault('weakened', {}).update(weakened)
+            opts.update(changes)
+        plan = plan_pipeline(face_cascade, face_cache=face_cache, image_key=cache_key,
+                             profile=profile, **opts)
+        node = root
+        for step in _plan_steps(plan):
+            node = node['children'].setdefault(
+                (step[0], step[1]), {'step': step, 'children': OrderedDict(), 'presets': []})
+        node['presets'].append(name)
+
+    results = {}
+
+    def visit(node, img, space):
+        shared = len(node['children']) + len(node['presets']) > 1
+        views = {space: img}
+
+        def view(target):
+            if target not in views:
+                bgr = views.get('bgr')
+                if bgr is None:
+                    bgr = profiled(profile, 'convert', cv2.cvtColor, img, _FROM_SPACE[space])
+                    views['bgr'] = bgr
+                if target != 'bgr':
+                    views[target] = profiled(profile, 'convert', cv2.cvtColor,
+                                             bgr, _TO_SPACE[target])
+                if shared:
+                    views[target].flags.writeable = False
+            return views[target]
+
+        if shared and img is not img_bgr:
+            img.flags.writeable = False
+        for name in node['presets']:
+            out = view('bgr')
+            if out is img_bgr or not out.flags.writeable:
+                out = out.copy()
+            results[name] = out
+
+        for (names, stage_space), child in node['children'].items():
+            _, _, fn, lut_fns = child['step']
+            src = view(stage_space)
+            if lut_fns is not None:
+                out = profiled(profile, "+".join(names), apply_point_stages, src, lut_fns,
+                               None, stats if src is img_bgr else None)
+            else:
+                out = profiled(profile, names[0], fn, src)
+            visit(child, out, stage_space)
+
+    visit(root, img_bgr, 'bgr')
+    return {name: results[name] for name in presets}
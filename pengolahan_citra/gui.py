@@ -0,0 +1,724 @@
+"""Aplikasi GUI Tkinter."""
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+from PIL import Image, ImageTk
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk, font as tkfont
+
+from .batch import batch_output_paths, run_batch
+from .cache import StageCache
+from .encoder import OUTPUT_FORMATS, encode_outputs, make_output_specs, write_bytes
+from .files import (ThumbnailCache, ensure_dir, image_file_key, list_image_files,
+                    load_face_cascade, scan_image_files)
+from .filters import QUALITY_TIERS, FaceBoxCache
+from .pipeline import enhancement_pipeline
+from .profiling import StageProfiler, StageStats
+from .tuning import batch_settings
+
+
+# ============================================================
+#                   KELAS GUI TKINTER – APLIKASI
+# ============================================================
+
+# Batas memori cache hasil antar tahap di GUI
+STAGE_CACHE_BYTES = 1024 * 1024 * 1024
+
+# Jumlah nama file per pesan dari thread scan ke GUI
+SCAN_CHUNK = 500
+
+# Pilihan before-after di GUI (penuh / diperkecil setengah / tidak dibuat)
+GUI_BA_CHOICES = ('penuh', 'setengah', 'mati')
+
+
+class VirtualFileList(tk.Frame):
+    """
+    Daftar file tervirtualisasi untuk folder berisi sangat banyak file.
+
+    Listbox hanya berisi baris yang sedang terlihat (self.rows);
+    seluruh nama disimpan di list Python self.items. Scroll (scrollbar,
+    roda mouse, tombol panah / PageUp / PageDown) hanya menggeser
+    jendela self.top lalu mengisi ulang beberapa baris tersebut,
+    sehingga mengisi 100 ribu nama sama murahnya dengan 30 nama.
+
+    on_select(index) dipanggil dengan indeks pada self.items.
+    """
+    def __init__(self, master, on_select=None, width=40, height=30):
+        super().__init__(master)
+        self.items = []
+        self.top = 0
+        self.rows = height
+        self.selected = None
+        self.on_select = on_select
+
+        self.lst = tk.Listbox(self, width=width, height=height,
+                              exportselection=False, activestyle='none')
+        self.lst.pack(side=tk.LEFT, fill=tk.Y)
+        self.sb = tk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.sb.pack(side=tk.LEFT, fill=tk.Y)
+
+        line = tkfont.Font(font=self.lst.cget('font')).metrics('linespace')
+        self._line_height = line + 1 + 2 * int(self.lst.cget('selectborderwidth'))
+        self._border = 2 * (int(self.lst.cget('borderwidth')) +
+                            int(self.lst.cget('highlightthickness')))
+
+        self.lst.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.lst.bind("<Configure>", self._on_configure)
+        self.lst.bind("<MouseWheel>", lambda e: self._scroll(-3 if e.delta > 0 else 3))
+        self.lst.bind("<Button-4>", lambda e: self._scroll(-3))
+        self.lst.bind("<Button-5>", lambda e: self._scroll(3))
+        for key, step in (("<Up>", -1), ("<Down>", 1)):
+            self.lst.bind(key, lambda e, step=step: self._move(step))
+        for key, sign in (("<Prior>", -1), ("<Next>", 1)):
+            self.lst.bind(key, lambda e, sign=sign: self._move(sign * self.rows))
+
+    def set_items(self, items, selected=None):
+        """Mengganti seluruh isi daftar (selected: indeks terpilih atau None)."""
+        self.items = items
+        self.selected = selected
+        if selected is not None:
+            self._reveal(selected)
+        self._refresh()
+
+    def extend(self, names):
+        """Menambah nama di akhir daftar; Listbox hanya diisi ulang jika terlihat."""
+        start = len(self.items)
+        self.items.extend(names)
+        if start < self.top + self.rows:
+            self._refresh()
+        else:
+            self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        n = max(len(self.items), 1)
+        self.sb.set(self.top / n, min(1.0, (self.top + self.rows) / n))
+
+    def _refresh(self):
+        self.top = max(0, min(self.top, len(self.items) - self.rows))
+        self.lst.delete(0, tk.END)
+        visible = self.items[self.top:self.top + self.rows]
+        if visible:
+            self.lst.insert(tk.END, *visible)
+        if self.selected is not None and 0 <= self.selected - self.top < len(visible):
+            self.lst.selection_set(self.selected - self.top)
+        self._update_scrollbar()
+
+    def _scroll(self, delta):
+        self.top += delta
+        self._refresh()
+        return "break"
+
+    def _reveal(self, index):
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + self.rows:
+            self.top = index - self.rows + 1
+
+    def _on_scrollbar(self, *args):
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * len(self.items))
+        elif args[0] == 'scroll':
+            self.top += int(args[1]) * (self.rows if args[2] == 'pages' else 1)
+        self._refresh()
+
+    def _on_configure(self, event):
+        rows = max(1, (event.height - self._border) // self._line_height)
+        if rows != self.rows:
+            self.rows = rows
+            self._refresh()
+
+    def _on_listbox_select(self, event):
+        sel = self.lst.curselection()
+        if sel:
+            self.select(self.top + sel[0])
+
+    def _move(self, step):
+        if self.items:
+            cur = self.top if self.selected is None else self.selected
+            self.select(max(0, min(len(self.items) - 1, cur + step)))
+        return "break"
+
+    def select(self, index):
+        """Memilih baris index (digeser agar terlihat) dan memanggil on_select."""
+        self.selected = index
+        self._reveal(index)
+        self._refresh()
+        if self.on_select is not None:
+            self.on_select(index)
+
+
+class EnhancerGUI:
+    """
+    Kelas inti GUI untuk Image Enhancer.
+
+    Fitur utama:
+    - Memilih folder input & output
+    - Preview gambar BEFORE & AFTER
+    - Enhancement single file
+    - Enhancement batch (semua gambar)
+    - Opsi pipeline lengkap (checkbox)
+
+    Preview AFTER dihitung pada proxy (sisi terpanjang
+    PREVIEW_MAX_SIDE) di thread latar belakang; render resolusi penuh
+    menyusul di thread lain dan dipakai oleh Simpan Hasil. Setiap
+    perubahan pilihan file / checkbox menaikkan self.generation
+    sehingga hasil yang sudah basi dibuang.
+    """
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Image Enhancer - Single + Batch (Before/After)")
+        self.root.geometry("1000x700")
+
+        self.input_folder = None
+        self.output_folder = None
+        self.current_before = None
+        self.current_after = None
+        self.current_filename = None
+
+        # di-load per thread (preview & render) saat wajah pertama dideteksi
+        self.face_cascade = load_face_cascade()
+        self.batch_queue = None
+
+        # render latar belakang: preview (proxy) & resolusi penuh
+        self.current_proxy = None
+        self.generation = 0
+        self.preview_shown = False
+        self.pending_save = False
+        self.preview_future = None
+        self.render_future = None
+        self.preview_pool = ThreadPoolExecutor(max_workers=1)
+        self.render_pool = ThreadPoolExecutor(max_workers=1)
+        self.ui_queue = queue.Queue()
+        # hasil antar tahap: ganti checkbox → hanya tahap sesudahnya dihitung
+        self.stage_cache = StageCache(STAGE_CACHE_BYTES)
+        self.face_box_cache = FaceBoxCache()
+        self.thumbs = ThumbnailCache()
+        self.current_key = None
+        self.current_path = None
+
+        # scan folder input berjalan di thread; hasilnya lewat ui_queue
+        self.scan_generation = 0
+        self.scanning = False
+
+        self._build_ui()
+        self.file_list = self.file_view.items
+        self.root.after(50, self._poll_ui)
+
+
+    # --------------------------------------------------------
+    #             MEMBANGUN UI (TOMBOL / LIST / PREVIEW)
+    # --------------------------------------------------------
+    def _build_ui(self):
+        """
+        Membuat seluruh tampilan GUI:
+        - Tombol folder input/output
+        - List file gambar
+        - Preview BEFORE–AFTER
+        - Tombol Enhance + Save
+        - Progressbar batch
+        - Checkbox pipeline
+        """
+        frm_top = tk.Frame(self.root)
+        frm_top.pack(fill=tk.X, padx=8, pady=6)
+
+        btn_in = tk.Button(frm_top, text="Pilih Folder Input", command=self.choose_input_folder, width=18)
+        btn_in.pack(side=tk.LEFT, padx=4)
+        btn_out = tk.Button(frm_top, text="Pilih Folder Output", command=self.choose_output_folder, width=18)
+        btn_out.pack(side=tk.LEFT, padx=4)
+        btn_refresh = tk.Button(frm_top, text="Refresh Daftar", command=self.load_file_list)
+        btn_refresh.pack(side=tk.LEFT, padx=4)
+        self.var_recursive = tk.BooleanVar(value=False)
+        tk.Checkbutton(frm_top, text="Termasuk sub-folder", variable=self.var_recursive,
+                       command=self.load_file_list).pack(side=tk.LEFT, padx=4)
+
+        left_panel = tk.Frame(self.root)
+        left_panel.pack(side=tk.LEFT, fill=tk.Y, padx=8)
+
+        lbl = tk.Label(left_panel, text="Daftar Gambar (klik untuk pilih):")
+        lbl.pack(anchor='w')
+
+        self.file_view = VirtualFileList(left_panel, on_select=self.on_select)
+        self.file_view.pack(side=tk.LEFT, fill=tk.Y)
+
+        right_panel = tk.Frame(self.root)
+        right_panel.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=8)
+
+        preview_frame = tk.Frame(right_panel)
+        preview_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.canvas_before = tk.Label(preview_frame, text="BEFORE", compound=tk.TOP)
+        self.canvas_before.pack(side=tk.LEFT, expand=True, fill=tk.BOTH, padx=4, pady=4)
+
+        self.canvas_after = tk.Label(preview_frame, text="AFTER", compound=tk.TOP)
+        self.canvas_after.pack(side=tk.LEFT, expand=True, fill=tk.BOTH, padx=4, pady=4)
+
+        ctrl_frame = tk.Frame(right_panel)
+        ctrl_frame.pack(fill=tk.X, pady=6)
+
+        self.btn_save = tk.Button(ctrl_frame, text="Simpan Hasil", command=self.save_result, width=14)
+        self.btn_save.pack(side=tk.LEFT, padx=4)
+
+        self.btn_enhance_sel = tk.Button(ctrl_frame, text="Enhance Selected", command=self.enhance_selected, width=18)
+        self.btn_enhance_sel.pack(side=tk.LEFT, padx=4)
+
+        self.btn_enhance_all = tk.Button(ctrl_frame, text="Enhance All (Batch)", command=self.enhance_all_batch, width=18)
+        self.btn_enhance_all.pack(side=tk.LEFT, padx=4)
+
+        self.progress = ttk.Progressbar(ctrl_frame, orient='horizontal', mode='determinate')
+        self.progress.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=6)
+
+        self.lbl_status = tk.Label(right_panel, text="", anchor='w')
+        self.lbl_status.pack(fill=tk.X, padx=4)
+
+        # rincian waktu per tahap dari render terakhir (StageProfiler)
+        self.lbl_profile = tk.Label(right_panel, text="", anchor='w', justify=tk.LEFT,
+                                    font=("Courier", 9))
+        self.lbl_profile.pack(fill=tk.X, padx=4)
+
+        opt_frame = tk.LabelFrame(right_panel, text="Opsi Pipeline (centang/uncentang)")
+        opt_frame.pack(fill=tk.X, padx=4, pady=4)
+
+        self.var_awb = tk.BooleanVar(value=True)
+        self.var_exposure = tk.BooleanVar(value=True)
+        self.var_denoise = tk.BooleanVar(value=True)
+        self.var_face = tk.BooleanVar(value=True)
+        self.var_hdr = tk.BooleanVar(value=True)
+        self.var_sharp = tk.BooleanVar(value=True)
+        self.var_final = tk.BooleanVar(value=True)
+
+        tk.Checkbutton(opt_frame, text="Auto White Balance", variable=self.var_awb).pack(anchor='w')
+        tk.Checkbutton(opt_frame, text="Auto Exposure", variable=self.var_exposure).pack(anchor='w')
+        tk.Checkbutton(opt_frame, text="Denoise (Bilateral)", variable=self.var_denoise).pack(anchor='w')
+        tk.Checkbutton(opt_frame, text="Face Beauty (smooth wajah)", variable=self.var_face).pack(anchor='w')
+        tk.Checkbutton(opt_frame, text="HDR-like (detail+CLAHE)", variable=self.var_hdr).pack(anchor='w')
+        tk.Checkbutton(opt_frame, text="Sharpen (Unsharp)", variable=self.var_sharp).pack(anchor='w')
+        tk.Checkbutton(opt_frame, text="Final Tone", variable=self.var_final).pack(anchor='w')
+
+        quality_row = tk.Frame(opt_frame)
+        quality_row.pack(anchor='w', pady=(2, 0))
+        tk.Label(quality_row, text="Kualitas:").pack(side=tk.LEFT)
+        self.var_quality = tk.StringVar(value='exact')
+        ttk.Combobox(quality_row, textvariable=self.var_quality, values=QUALITY_TIERS,
+                     state='readonly', width=10).pack(side=tk.LEFT, padx=4)
+
+        self.var_auto = tk.BooleanVar(value=False)
+        tk.Checkbutton(opt_frame, text="Auto (lewati tahap yang tidak perlu)",
+                       variable=self.var_auto).pack(anchor='w')
+
+        for var in (self.var_awb, self.var_exposure, self.var_denoise, self.var_face,
+                    self.var_hdr, self.var_sharp, self.var_final, self.var_quality,
+                    self.var_auto):
+            var.trace_add('write', self.on_options_changed)
+
+        out_frame = tk.LabelFrame(right_panel, text="Output")
+        out_frame.pack(fill=tk.X, padx=4, pady=4)
+        self.var_format = tk.StringVar(value='jpg')
+        self.var_ba = tk.StringVar(value=GUI_BA_CHOICES[0])
+        for text, var, values in (("Format:", self.var_format, tuple(OUTPUT_FORMATS)),
+                                  ("Before-After:", self.var_ba, GUI_BA_CHOICES)):
+            row = tk.Frame(out_frame)
+            row.pack(anchor='w', pady=(2, 0))
+            tk.Label(row, text=text, width=12, anchor='w').pack(side=tk.LEFT)
+            ttk.Combobox(row, textvariable=var, values=values,
+                         state='readonly', width=10).pack(side=tk.LEFT, padx=4)
+
+
+    # ============================================================
+    #                       EVENT HANDLER
+    # ============================================================
+
+    def choose_input_folder(self):
+        """Memilih folder berisi gambar input."""
+        p = filedialog.askdirectory(title="Pilih folder yang berisi gambar input")
+        if p:
+            self.input_folder = p
+            self.load_file_list()
+
+    def choose_output_folder(self):
+        """Memilih folder tujuan output dan memastikan folder tersedia."""
+        p = filedialog.askdirectory(title="Pilih folder output (akan dibuat jika kosong)")
+        if p:
+            self.output_folder = p
+            ensure_dir(self.output_folder)
+            messagebox.showinfo("Folder Output", f"Folder output diset ke:\n{self.output_folder}")
+
+    def load_file_list(self):
+        """
+        Meload daftar gambar dari folder input.
+
+        Folder di-scan di thread latar belakang (scan_image_files);
+        nama dikirim ke ui_queue per SCAN_CHUNK dan langsung tampil,
+        lalu diurutkan sekali setelah scan selesai (_on_scan).
+        """
+        self.scan_generation += 1
+        self.file_list = []
+        self.file_view.set_items(self.file_list)
+        if not self.input_folder:
+            return
+
+        gen = self.scan_generation
+        folder = self.input_folder
+        recursive = self.var_recursive.get()
+        exclude = (self.output_folder,) if self.output_folder else ()
+        self.scanning = True
+        self.lbl_status.config(text="Memindai folder...")
+
+        def scan():
+            chunk = []
+            try:
+                for name in scan_image_files(folder, recursive, exclude):
+                    chunk.append(name)
+                    if len(chunk) >= SCAN_CHUNK:
+                        self.ui_queue.put(('scan', gen, chunk))
+                        chunk = []
+                self.ui_queue.put(('scan', gen, chunk))
+                self.ui_queue.put(('scan_done', gen, None))
+            except OSError as e:
+                self.ui_queue.put(('scan_done', gen, e))
+
+        threading.Thread(target=scan, daemon=True).start()
+
+    def _on_scan(self, kind, gen, result):
+        """Pesan dari thread scan (dipanggil dari _poll_ui)."""
+        if gen != self.scan_generation:
+            return
+        if kind == 'scan':
+            self.file_view.extend(result)
+            self.lbl_status.config(text=f"Memindai folder... {len(self.file_list)} gambar")
+            return
+
+        self.scanning = False
+        if isinstance(result, Exception):
+            self.lbl_status.config(text="")
+            messagebox.showerror("Error", f"Gagal membaca folder:\n{result}")
+            return
+        view = self.file_view
+        selected = view.items[view.selected] if view.selected is not None else None
+        self.file_list.sort()
+        view.set_items(self.file_list,
+                       self.file_list.index(selected) if selected is not None else None)
+        self.lbl_status.config(text=f"{len(self.file_list)} gambar")
+
+    def on_select(self, idx):
+        """Menampilkan preview gambar ketika dipilih di daftar file."""
+        fname = self.file_list[idx]
+        path = os.path.join(self.input_folder, fname)
+        try:
+            key = image_file_key(path)
+            proxy = self.thumbs.load(path, key)
+        except OSError:
+            proxy = None
+
+        if proxy is None:
+            messagebox.showerror("Error", f"Gagal membuka {fname}")
+            return
+
+        # gambar resolusi penuh baru di-decode oleh render full-res
+        self._cancel_renders()
+        self.current_key = key
+        self.current_path = path
+        self.current_filename = fname
+        self.current_before = None
+        self.current_proxy = proxy
+        self.preview_shown = False
+
+        self.show_image_on_label(proxy, self.canvas_before)
+        self.canvas_after.config(image='', text='AFTER')
+        self.lbl_status.config(text="")
+        self.lbl_profile.config(text="")
+
+    def on_options_changed(self, *args):
+        """Checkbox berubah: batalkan render lama, perbarui preview jika sudah diminta."""
+        if self.preview_shown or self.preview_future is not None:
+            self._start_preview()
+        else:
+            self._cancel_renders()
+
+    def show_image_on_label(self, img_bgr, label_widget, maxsize=(480,480)):
+        """
+        Menampilkan gambar pada label widget Tkinter.
+        - Resize otomatis agar muat di preview.
+        - Konversi BGR → RGB → PhotoImage (Tkinter)
+        """
+        h0, w0 = img_bgr.shape[:2]
+        maxw, maxh = maxsize
+        scale = min(maxw / w0, maxh / h0, 1.0)
+
+        if scale < 1.0:
+            img_rs = cv2.resize(img_bgr, (int(w0*scale), int(h0*scale)))
+        else:
+            img_rs = img_bgr.copy()
+
+        img_rgb = cv2.cvtColor(img_rs, cv2.COLOR_BGR2RGB)
+        pil = Image.fromarray(img_rgb)
+        tkimg = ImageTk.PhotoImage(pil)
+
+        label_widget.image = tkimg
+        label_widget.config(image=tkimg, text='')
+
+    def pipeline_options(self):
+        """Mengambil opsi pipeline dari checkbox, kualitas & auto sebagai dict."""
+        options = dict(
+            do_awb=self.var_awb.get(),
+            do_exposure=self.var_exposure.get(),
+            do_denoise=self.var_denoise.get(),
+            do_face_beauty=self.var_face.get(),
+            do_hdr=self.var_hdr.get(),
+            do_sharpen=self.var_sharp.get(),
+            do_final_tone=self.var_final.get()
+        )
+        if self.var_quality.get() != 'exact':
+            options['quality'] = self.var_quality.get()
+        if self.var_auto.get():
+            options['auto'] = True
+        return options
+
+    def output_specs(self):
+        """Pengaturan output (format & before-after) dari pilihan GUI."""
+        fmt = self.var_format.get()
+        before_after = {'penuh': fmt, 'setengah': f"{fmt}:scale=0.5",
+                        'mati': 'off'}[self.var_ba.get()]
+        return make_output_specs(fmt, before_after)
+
+    def enhance_selected(self):
+        """
+        Enhancing satu gambar yang dipilih.
+        Menjalankan pipeline sesuai opsi checkbox.
+
+        Preview AFTER dihitung pada proxy di thread latar belakang
+        sehingga UI tidak membeku; render resolusi penuh menyusul
+        setelah preview tampil.
+        """
+        if self.current_proxy is None:
+            messagebox.showwarning("Pilih file", "Silakan pilih satu file dari daftar.")
+            return
+
+        self._start_preview()
+
+    # --------------------------------------------------------
+    #          RENDER LATAR BELAKANG (PREVIEW & FULL-RES)
+    # --------------------------------------------------------
+    def _cancel_renders(self):
+        """Menandai semua render yang sedang berjalan/antre sebagai basi."""
+        self.generation += 1
+        self.current_after = None
+        self.pending_save = False
+        for fut in (self.preview_future, self.render_future):
+            if fut is not None:
+                fut.cancel()
+        self.preview_future = None
+        self.render_future = None
+
+    def _render(self, gen, src, face_cascade, options, cache_key):
+        """
+        Dijalankan di thread pool; render basi dilewati sebelum dimulai.
+        src berupa array gambar atau path (di-decode di thread ini).
+        Mengembalikan (gambar_input, hasil, StageProfiler).
+        """
+        if gen != self.generation:
+            return None
+        profile = StageProfiler()
+        img = src
+        if isinstance(src, str):
+            img = profile.run('decode', cv2.imread, src)
+            if img is None:
+                raise ValueError(f"Gagal membuka {src}")
+        out = enhancement_pipeline(img, face_cascade, cache=self.stage_cache,
+                                   face_cache=self.face_box_cache,
+                                   cache_key=cache_key, profile=profile, **options)
+        return img, out, profile
+
+    def _submit(self, pool, kind, img, face_cascade):
+        """Menjalankan render di pool dan mengirim hasilnya ke ui_queue."""
+        gen = self.generation
+        fut = pool.submit(self._render, gen, img, face_cascade,
+                          self.pipeline_options(), self.current_key + (kind,))
+
+        def done(f):
+            if f.cancelled():
+                return
+            err = f.exception()
+            self.ui_queue.put((kind, gen, f.result() if err is None else err))
+
+        fut.add_done_callback(done)
+        return fut
+
+    def _start_preview(self):
+        """Memulai render preview pada proxy (render lama dibatalkan)."""
+        self._cancel_renders()
+        self.lbl_status.config(text="Memproses preview...")
+        self.preview_future = self._submit(self.preview_pool, 'preview',
+                                           self.current_proxy, self.face_cascade)
+
+    def _poll_ui(self):
+        """Menerima hasil render dari thread latar belakang (event loop Tk)."""
+        while True:
+            try:
+                kind, gen, result = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind in ('scan', 'scan_done'):
+                self._on_scan(kind, gen, result)
+                continue
+            if gen != self.generation or result is None:
+                continue
+
+            if isinstance(result, Exception):
+                self.lbl_status.config(text="")
+                messagebox.showerror("Error", f"Enhancement gagal:\n{result}")
+                continue
+
+            if kind == 'preview':
+                self.preview_shown = True
+                self.show_image_on_label(result[1], self.canvas_after)
+                self.lbl_status.config(text="Preview siap. Render resolusi penuh berjalan...")
+                self.lbl_profile.config(text="Preview:\n" + result[2].report())
+                src = self.current_before if self.current_before is not None else self.current_path
+                self.render_future = self._submit(self.render_pool, 'full',
+                                                  src, self.face_cascade)
+            else:
+                self.current_before, self.current_after, profile = result
+                self.lbl_profile.config(text="Resolusi penuh:\n" + profile.report())
+                self.lbl_status.config(text="Selesai. Klik 'Simpan Hasil' untuk menyimpan file.")
+                if self.pending_save:
+                    self.pending_save = False
+                    self._write_result()
+
+        self.root.after(50, self._poll_ui)
+
+    def save_result(self):
+        """
+        Menyimpan hasil enhancement dan versi Before–After.
+        Jika render resolusi penuh belum selesai, penyimpanan
+        dilakukan otomatis begitu render selesai.
+        """
+        rendering = self.preview_future is not None or self.render_future is not None
+        if self.current_proxy is None or (self.current_after is None and not rendering):
+            messagebox.showwarning("Tidak ada hasil", "Lakukan Enhance terlebih dahulu.")
+            return
+
+        if not self.output_folder:
+            messagebox.showwarning("Belum ada output", "Pilih folder output terlebih dahulu.")
+            return
+
+        if self.current_after is None:
+            self.pending_save = True
+            self.lbl_status.config(text="Menunggu render resolusi penuh, lalu menyimpan...")
+            return
+
+        self._write_result()
+
+    def _write_result(self):
+        """
+        Menulis file final + before-after dari render resolusi penuh,
+        sesuai pilihan output (encode paralel, tulis atomik).
+        """
+        specs = self.output_specs()
+        paths = batch_output_paths(self.output_folder, self.current_filename, None, specs)
+        ensure_dir(os.path.dirname(paths[0]))
+        payloads = encode_outputs(self.current_before, self.current_after, specs)
+        for path, payload in zip(paths, payloads):
+            write_bytes(path, payload)
+
+        messagebox.showinfo("Disimpan", "Hasil tersimpan:\n" + "\n".join(paths))
+
+    def enhance_all_batch(self):
+        """
+        Memproses semua gambar dalam folder input secara batch.
+        
+        Mekanisme:
+        - Batch engine (run_batch) dijalankan di thread terpisah
+        - Gambar disebar ke process pool (satu worker per core)
+        - Progress & error per file dikirim lewat queue
+        - Progress bar diperbarui dari event loop Tkinter (polling)
+        
+        GUI tetap responsif selama batch berjalan.
+        """
+        if self.batch_queue is not None:
+            messagebox.showinfo("Batch", "Batch sedang berjalan.")
+            return
+
+        if not self.input_folder:
+            messagebox.showwarning("Folder input", "Tentukan folder input terlebih dahulu.")
+            return
+
+        if not self.output_folder:
+            messagebox.showwarning("Folder output", "Tentukan folder output terlebih dahulu.")
+            return
+
+        # daftar hasil scan dipakai ulang; scan ulang hanya jika belum selesai
+        if self.scanning or not self.file_list:
+            files = list_image_files(self.input_folder, self.var_recursive.get(),
+                                     exclude=(self.output_folder,))
+        else:
+            files = list(self.file_list)
+
+        total = len(files)
+        if total == 0:
+            messagebox.showinfo("Kosong", "Folder input tidak berisi gambar.")
+            return
+
+        self.progress['maximum'] = total
+        self.progress['value'] = 0
+        self.btn_enhance_all.config(state=tk.DISABLED)
+
+        q = queue.Queue()
+        self.batch_queue = q
+        options = self.pipeline_options()
+        specs = self.output_specs()
+        workers, cv_threads, queue_depth, _ = batch_settings(options)
+
+        def worker():
+            try:
+                stats = StageStats()
+                errors = run_batch(self.input_folder, self.output_folder, options,
+                                   progress_cb=lambda done, total, fname, err:
+                                       q.put(('progress', done, fname, err)),
+                                   files=files, stage_stats=stats, output_specs=specs,
+                                   workers=workers, queue_depth=queue_depth,
+                                   cv_threads=cv_threads)
+                q.put(('done', errors, stats))
+            except Exception as e:
+                q.put(('failed', e))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(100, self._poll_batch)
+
+    def _poll_batch(self):
+        """Membaca pesan dari batch engine dan memperbarui progress bar."""
+        q = self.batch_queue
+        while True:
+            try:
+                msg = q.get_nowait()
+            except queue.Empty:
+                break
+
+            if msg[0] == 'progress':
+                _, done, fname, err = msg
+                if err is not None:
+                    print("Lewati:", fname, "-", err)
+                self.progress['value'] = done
+                continue
+
+            self.batch_queue = None
+            self.progress['value'] = 0
+            self.btn_enhance_all.config(state=tk.NORMAL)
+
+            if msg[0] == 'failed':
+                messagebox.showerror("Error", f"Batch gagal:\n{msg[1]}")
+            else:
+                errors, stats = msg[1], msg[2]
+                if stats.images:
+                    report = stats.report()
+                    print(f"Waktu per tahap ({stats.images} gambar):\n{report}")
+                    self.lbl_profile.config(text=f"Batch ({stats.images} gambar):\n{report}")
+                info = f"Semua gambar telah diproses dan disimpan di:\n{self.output_folder}"
+                if errors:
+                    info += f"\n\n{len(errors)} file dilewati (lihat console)."
+                messagebox.showinfo("Selesai", info)
+            return
+
+        self.root.after(100, self._poll_batch)
@@ -0,0 +1,114 @@
+"""Pipeline utama peningkatan kualitas gambar (enhancement_pipeline)."""
+from .analysis import analyze_stage
+from .filters import (SHARPEN_AMOUNT, auto_exposure_stretch, auto_white_balance_grayworld,
+                      bilateral_denoise, check_quality, final_color_tone,
+                      hdr_like_local_contrast, unsharp_mask)
+from .fused import plan_pipeline, run_fused_pipeline
+from .profiling import face_stage, profiled
+from .stats import ImageStats
+from .tiled import enhancement_pipeline_tiled
+
+
+# ============================================================
+#        PIPELINE UTAMA – MENGGABUNGKAN SEMUA LANGKAH
+# ============================================================
+
+def enhancement_pipeline(img_bgr, face_cascade,
+                         do_awb=True,
+                         do_exposure=True,
+                         do_denoise=True,
+                         do_face_beauty=True,
+                         do_hdr=True,
+                         do_sharpen=True,
+                         do_final_tone=True,
+                         fused=False,
+                         tile_budget_mb=None,
+                         cache=None,
+                         cache_key=None,
+                         face_cache=None,
+                         profile=None,
+                         pool=None,
+                         quality='exact',
+                         auto=False,
+                         stats=None):
+    """
+    Pipeline lengkap peningkatan kualitas gambar.
+    
+    Urutan proses:
+    1. Auto White Balance
+    2. Exposure Correction
+    3. Denoise
+    4. Beauty Face Filter
+    5. HDR-like Enhancement
+    6. Sharpening
+    7. Tone Adjustment
+    
+    Setiap langkah bisa dinyalakan/dimatikan dengan checkbox di GUI.
+
+    fused=True menjalankan mode fused (lihat run_fused_pipeline):
+    konversi ruang warna direncanakan sekali untuk seluruh pipeline.
+
+    tile_budget_mb (MB) menjalankan mode tiled untuk gambar sangat
+    besar (lihat enhancement_pipeline_tiled).
+
+    cache (StageCache) + cache_key (identitas gambar) menyimpan hasil
+    antar tahap; otomatis memakai mode fused. face_cache
+    (FaceBoxCache) + cache_key menyimpan kotak wajah hasil deteksi.
+
+    profile (StageProfiler) mencatat waktu & memori per tahap.
+
+    pool (BufferPool) menjalankan mode fused dengan buffer pinjaman
+    yang dipakai ulang antar gambar (tanpa cache); hasilnya milik pool
+    dan dikembalikan dengan pool.release() setelah dipakai.
+
+    quality ('exact' / 'balanced' / 'fast', lihat QUALITY_TIERS)
+    memilih pendekatan yang lebih cepat untuk denoise, smoothing wajah,
+    dan detailEnhance; selain 'exact' memakai mode fused.
+
+    auto=True menjalankan analyze_image lebih dulu dan melewati /
+    memperlemah tahap yang hampir tidak mengubah gambar ini (lihat
+    auto_adjustments); alasannya dicatat di profile. Memakai mode fused.
+
+    stats (ImageStats img_bgr, dibuat jika kosong) dipakai bersama oleh
+    analisis auto, tahap LUT pertama mode fused, dan statistik global
+    mode tiled, sehingga gambar input hanya diukur sekali.
+    """
+    check_quality(quality)
+    if stats is None:
+        stats = ImageStats(img_bgr)
+    stages = dict(do_awb=do_awb, do_exposure=do_exposure,
+                  do_denoise=do_denoise, do_face_beauty=do_face_beauty,
+                  do_hdr=do_hdr, do_sharpen=do_sharpen, do_final_tone=do_final_tone)
+    if auto:
+        stages.update(analyze_stage(img_bgr, face_cascade, stages, profile, stats))
+
+    if tile_budget_mb:
+        return enhancement_pipeline_tiled(
+            img_bgr, face_cascade, budget_mb=tile_budget_mb,
+            profile=profile, quality=quality, stats=stats, **stages)
+
+    if (fused or cache is not None or face_cache is not None or pool is not None
+            or quality != 'exact' or auto):
+        plan = plan_pipeline(face_cascade, face_cache=face_cache, image_key=cache_key,
+                             profile=profile, quality=quality, **stages)
+        return run_fused_pipeline(img_bgr, plan, cache, cache_key, profile, pool, stats)
+
+    img = img_bgr.copy()
+
+    if do_awb:
+        img = profiled(profile, 'awb', auto_white_balance_grayworld, img)
+    if do_exposure:
+        img = profiled(profile, 'exposure', auto_exposure_stretch, img)
+    if do_denoise:
+        img = profiled(profile, 'denoise', bilateral_denoise, img)
+    if do_face_beauty:
+        img = profiled(profile, 'face_beauty', face_stage(face_cascade, profile=profile), img)
+    if do_hdr:
+        img = profiled(profile, 'hdr', hdr_like_local_contrast, img)
+    if do_sharpen:
+        img = profiled(profile, 'sharpen',
+                       lambda im: unsharp_mask(im, amount=SHARPEN_AMOUNT, sigma=1.2), img)
+    if do_final_tone:
+        img = profiled(profile, 'final_tone', final_color_tone, img)
+
+    return img
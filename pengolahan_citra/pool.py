@@ -0,0 +1,65 @@
+"""Pool buffer kerja yang dipakai ulang antar gambar."""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+# ============================================================
+#        BUFFER POOL – MEMAKAI ULANG BUFFER ANTAR GAMBAR
+# ============================================================
+
+class BufferPool:
+    """
+    Pool array numpy yang dikelompokkan per (shape, dtype), untuk
+    dipakai ulang antar gambar berukuran sama (mis. batch foto dari
+    satu kamera) alih-alih mengalokasikan buffer seukuran gambar
+    untuk setiap tahap.
+
+    lease() mengambil buffer bebas (isinya sembarang) atau
+    mengalokasikan yang baru; release() mengembalikannya. Buffer bebas
+    dibatasi max_bytes (yang paling lama tidak dipakai dibuang).
+    allocations / reuses mencatat jumlah alokasi baru dan pemakaian
+    ulang. Aman dipakai dari beberapa thread.
+    """
+    def __init__(self, max_bytes=1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.allocations = 0
+        self.reuses = 0
+        self._free = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lease(self, shape, dtype=np.uint8):
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            bufs = self._free.get(key)
+            if bufs:
+                buf = bufs.pop()
+                if not bufs:
+                    del self._free[key]
+                self.nbytes -= buf.nbytes
+                self.reuses += 1
+                return buf
+            self.allocations += 1
+        return np.empty(shape, dtype)
+
+    def release(self, buf):
+        """Mengembalikan buffer ke pool (view dari array lain diabaikan)."""
+        if buf is None or buf.base is not None or buf.nbytes > self.max_bytes:
+            return
+        key = (buf.shape, buf.dtype.str)
+        with self._lock:
+            self._free.setdefault(key, []).append(buf)
+            self._free.move_to_end(key)
+            self.nbytes += buf.nbytes
+            while self.nbytes > self.max_bytes:
+                old_key, bufs = next(iter(self._free.items()))
+                self.nbytes -= bufs.pop(0).nbytes
+                if not bufs:
+                    del self._free[old_key]
+
+    def clear(self):
+        with self._lock:
+            self._free.clear()
+            self.nbytes = 0
@@ -0,0 +1,198 @@
+"""Profiling waktu & memori per tahap pipeline."""
+import time
+import tracemalloc
+from collections import OrderedDict
+
+import numpy as np
+
+from .filters import detect_faces, smooth_faces, stage_base_name
+
+
+# ============================================================
+#          PROFILING PER TAHAP (OPSIONAL, PARAMETER profile)
+# ============================================================
+
+class StageProfiler:
+    """
+    Pencatat waktu per tahap pipeline.
+
+    Setiap pemanggilan tahap dicatat sebagai dict: nama tahap, waktu
+    wall & CPU (detik), ukuran output (bytes), dan — jika
+    track_memory=True — puncak alokasi selama tahap (tracemalloc,
+    hanya buffer numpy/Python). Tahap face beauty juga mencatat
+    jumlah wajah dan luas total ROI wajah (piksel).
+
+    Waktu CPU diukur dengan time.thread_time: hanya thread yang
+    menjalankan tahap, sehingga thread lain di proses yang sama (encoder,
+    worker video/layanan) tidak ikut terhitung. Thread internal OpenCV
+    juga tidak terhitung; untuk tahap yang diparalelkan OpenCV, wall
+    bisa lebih besar dari CPU.
+
+    Pipeline menerima profile=None secara default; tanpa profiler
+    tidak ada pengukuran sama sekali (lihat profiled).
+    """
+    def __init__(self, track_memory=False):
+        self.records = []
+        self.track_memory = track_memory
+        self._current = None
+
+    def run(self, name, fn, *args):
+        """Menjalankan fn(*args) sebagai tahap name dan mencatat biayanya."""
+        rec = {'stage': name}
+        outer, self._current = self._current, rec
+        tracing = False
+        if self.track_memory:
+            tracing = not tracemalloc.is_tracing()
+            if tracing:
+                tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        c0, t0 = time.thread_time(), time.perf_counter()
+        try:
+            out = fn(*args)
+        finally:
+            rec['wall_s'] = time.perf_counter() - t0
+            rec['cpu_s'] = time.thread_time() - c0
+            if self.track_memory:
+                rec['alloc_bytes'] = tracemalloc.get_traced_memory()[1] - base
+                if tracing:
+                    tracemalloc.stop()
+            self._current = outer
+        rec['out_bytes'] = int(getattr(out, 'nbytes', 0) or 0)
+        self.records.append(rec)
+        return out
+
+    def note(self, **values):
+        """Menambah nilai ke catatan tahap yang sedang berjalan."""
+        if self._current is not None:
+            self._current.update(values)
+
+    def add(self, name, **values):
+        """
+        Mencatat tahap yang diukur di luar run (mis. encode di thread
+        encoder); values minimal berisi wall_s dan cpu_s.
+        """
+        self.records.append(dict(values, stage=name))
+
+    def totals(self):
+        """
+        Ringkasan per nama tahap (urutan kemunculan): jumlah wall/cpu,
+        jumlah panggilan, dan nilai lain (bytes, wajah) dijumlahkan;
+        alloc_bytes diambil maksimumnya, dict (tahap yang dilewati
+        mode auto) digabung. Berguna untuk mode tiled di
+        mana satu tahap dipanggil per tile.
+        """
+        out = OrderedDict()
+        for rec in self.records:
+            tot = out.setdefault(rec['stage'], {'calls': 0})
+            tot['calls'] += 1
+            for k, v in rec.items():
+                if k == 'stage':
+                    continue
+                if k == 'alloc_bytes':
+                    tot[k] = max(tot.get(k, 0), v)
+                elif isinstance(v, dict):
+                    tot.setdefault(k, {}).update(v)
+                else:
+                    tot[k] = tot.get(k, 0) + v
+        return out
+
+    def report(self):
+        """Tabel teks rincian waktu per tahap."""
+        totals = self.totals()
+        wall = sum(t['wall_s'] for t in totals.values()) or 1.0
+        lines = []
+        for name, t in totals.items():
+            line = (f"{name:<22}{t['wall_s'] * 1000:>9.1f} ms{t['wall_s'] / wall:>6.0%}"
+                    f"  cpu {t['cpu_s'] * 1000:.0f} ms")
+            if 'faces' in t:
+                line += f"  wajah {t['faces']} ({t['face_roi_area'] / 1e6:.2f} MP)"
+            lines.append(line)
+            for key, label in (('skipped', 'dilewati'), ('weakened', 'diperlemah')):
+                for stage, reason in t.get(key, {}).items():
+                    lines.append(f"  {label} {stage}: {reason}")
+        return "\n".join(lines)
+
+
+def profiled(profile, name, fn, *args):
+    """fn(*args), dicatat sebagai tahap name jika profile (StageProfiler) diisi."""
+    if profile is None:
+        return fn(*args)
+    return profile.run(name, fn, *args)
+
+
+def face_stage(face_cascade, detect=None, profile=None, strength=0.6, quality='exact'):
+    """
+    Fungsi tahap face beauty untuk pipeline: deteksi (detect, default
+    detect_faces) → smooth_faces. Sama dengan face_beauty_filter,
+    ditambah pencatatan jumlah & luas wajah ke profile.
+    Deteksi wajah sama untuk semua tier; hanya smoothing yang didekati.
+    """
+    def stage(img_bgr, dst=None):
+        if detect is None:
+            faces = detect_faces(img_bgr, face_cascade)
+        else:
+            faces = detect(img_bgr)
+        if profile is not None:
+            profile.note(faces=len(faces),
+                         face_roi_area=int(sum(w * h for (_, _, w, h) in faces)))
+        return smooth_faces(img_bgr, faces, strength, dst, quality)
+    return stage
+
+
+class StageStats:
+    """
+    Kumpulan StageProfiler.totals() dari banyak gambar (batch);
+    report() menghasilkan p50/p95 waktu wall per tahap, ditambah
+    jumlah tahap yang dilewati / diperlemah mode auto beserta
+    perkiraan waktu yang dihemat (jumlah dilewati x p50 tahap itu
+    pada gambar yang menjalankannya), serta bytes per output untuk
+    tahap encode:<jenis> dan write.
+    """
+    def __init__(self):
+        self.samples = OrderedDict()
+        self.bytes = OrderedDict()
+        self.skipped = OrderedDict()
+        self.weakened = OrderedDict()
+        self.images = 0
+
+    def add(self, totals):
+        self.images += 1
+        for name, t in totals.items():
+            self.samples.setdefault(name, []).append(t['wall_s'])
+            if stage_base_name(name) in ('encode', 'write') and 'out_bytes' in t:
+                self.bytes.setdefault(name, []).append(t['out_bytes'])
+            for stage in t.get('skipped', ()):
+                self.skipped[stage] = self.skipped.get(stage, 0) + 1
+            for stage in t.get('weakened', ()):
+                self.weakened[stage] = self.weakened.get(stage, 0) + 1
+
+    def saved_estimate(self, stage):
+        """Perkiraan detik yang dihemat karena stage dilewati (None jika tak ada sampel)."""
+        vals = [v for name, vs in self.samples.items()
+                if stage_base_name(name) == stage for v in vs]
+        if not vals:
+            return None
+        return self.skipped.get(stage, 0) * float(np.percentile(vals, 50))
+
+    def report(self):
+        lines = [f"{'tahap':<22}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'total s':>10}"]
+        for name, vals in self.samples.items():
+            v = np.asarray(vals) * 1000
+            lines.append(f"{name:<22}{len(v):>6}{np.percentile(v, 50):>10.1f}"
+                         f"{np.percentile(v, 95):>10.1f}{v.sum() / 1000:>10.2f}")
+        if self.skipped or self.weakened:
+            lines.append(f"{'mode auto':<22}{'lewat':>6}{'lemah':>10}{'hemat s':>10}")
+            for stage in OrderedDict.fromkeys(list(self.skipped) + list(self.weakened)):
+                saved = self.saved_estimate(stage) if stage in self.skipped else None
+                lines.append(f"{stage:<22}{self.skipped.get(stage, 0):>6}"
+                             f"{self.weakened.get(stage, 0):>10}"
+                             f"{'-' if saved is None else f'~{saved:.2f}':>10}")
+        if self.bytes:
+            lines.append(f"{'output':<22}{'n':>6}{'p50 KB':>10}{'total MB':>10}{'MB/s':>10}")
+            for name, vals in self.bytes.items():
+                b = np.asarray(vals, np.float64)
+                secs = sum(self.samples[name]) or float('inf')
+                lines.append(f"{name:<22}{len(b):>6}{np.percentile(b, 50) / 1024:>10.0f}"
+                             f"{b.sum() / 2**20:>10.1f}{b.sum() / 2**20 / secs:>10.1f}")
+        return "\n".join(lines)
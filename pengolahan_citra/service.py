@@ -0,0 +1,365 @@
+"""Layanan HTTP lokal dengan worker hangat dan antrean terbatas."""
+import os
+import time
+import queue
+import json
+import threading
+import stat
+import signal
+import socket
+import socketserver
+import multiprocessing as mp
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .batch import batch_worker_init, batch_worker_release, enhance_encoded
+from .encoder import DEFAULT_OUTPUTS
+from .filters import check_quality
+from .fused import PIPELINE_OPTIONS
+
+
+# ============================================================
+#        LAYANAN HTTP LOKAL – WORKER HANGAT & ANTREAN TERBATAS
+# ============================================================
+
+SERVICE_PORT = 8765
+
+# Maksimum request yang menunggu worker (di luar yang sedang dihitung)
+SERVICE_QUEUE_SIZE = 16
+
+# Batas ukuran body request (bytes)
+SERVICE_MAX_BODY = 200 * 1024 * 1024
+
+# Jumlah request terakhir untuk persentil latensi di /metrics
+SERVICE_LATENCY_WINDOW = 1000
+
+
+def _service_worker_init():
+    """
+    Inisialisasi proses worker layanan: seperti worker batch, tetapi
+    Ctrl+C diabaikan — proses utama yang menghentikan pool dengan rapi.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    batch_worker_init(1)
+
+
+def _service_warmup():
+    """Tugas pemanasan: satu pipeline kecil agar kode OpenCV sudah siap."""
+    img = np.full((64, 64, 3), 128, np.uint8)
+    ok, data = cv2.imencode('.jpg', img)
+    enhance_encoded(data.tobytes(), 'warmup', None, {})
+    return os.getpid()
+
+
+def _service_task(data, options, before_after):
+    """Tugas compute di worker: (payloads, waktu mulai, detik compute)."""
+    start = time.time()
+    t0 = time.perf_counter()
+    specs = DEFAULT_OUTPUTS if before_after else dict(DEFAULT_OUTPUTS, before_after=None)
+    payloads = enhance_encoded(data, 'request', None, options, output_specs=specs)
+    return payloads, start, time.perf_counter() - t0
+
+
+class EnhanceService:
+    """
+    Inti layanan enhancement: process pool yang sudah dipanaskan dan
+    antrean request terbatas.
+
+    Cara kerja:
+    - Worker (proses, atau satu thread jika workers=1) diinisialisasi
+      seperti worker batch (_service_worker_init: Haar Cascade, BufferPool)
+      lalu masing-masing menjalankan satu pipeline kecil, sehingga
+      request pertama tidak menanggung biaya start.
+    - Kapasitas = workers + queue_size request. Request yang datang saat
+      kapasitas penuh langsung ditolak dengan queue.Full (backpressure:
+      klien mencoba lagi nanti, memori server tetap terbatas). reserve()
+      memesan slot sebelum body dibaca, agar request yang ditolak tidak
+      sempat memakan memori.
+    - Jika proses worker mati (pool menjadi BrokenProcessPool), request
+      yang terkena gagal dan pool dibuat ulang + dipanaskan lagi untuk
+      request berikutnya.
+    - metrics() mengembalikan kedalaman antrean, jumlah request, jumlah
+      pool dibuat ulang, dan persentil latensi (total, tunggu antrean,
+      compute).
+    """
+    def __init__(self, workers=None, queue_size=SERVICE_QUEUE_SIZE):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.capacity = self.workers + max(0, queue_size)
+        self.slots = threading.BoundedSemaphore(self.capacity)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.counts = {'accepted': 0, 'rejected': 0, 'completed': 0, 'failed': 0,
+                       'pool_restarts': 0}
+        self.latency = {name: deque(maxlen=SERVICE_LATENCY_WINDOW)
+                        for name in ('total', 'queue', 'compute')}
+        self.started = time.time()
+        self.restart_lock = threading.Lock()
+        self._start_executor()
+
+    def _start_executor(self):
+        """Membuat pool worker lalu memanaskannya (satu tugas per worker)."""
+        if self.workers == 1:
+            batch_worker_init(None)
+            executor = ThreadPoolExecutor(max_workers=1)
+        else:
+            executor = ProcessPoolExecutor(max_workers=self.workers,
+                                           mp_context=mp.get_context("spawn"),
+                                           initializer=_service_worker_init)
+        # satu tugas per worker: pool proses "spawn" membuat proses baru
+        # selama belum ada worker yang menganggur
+        warm = [executor.submit(_service_warmup) for _ in range(self.workers)]
+        self.worker_pids = sorted({f.result() for f in warm})
+        self.executor = executor
+
+    def _restart_executor(self, broken):
+        """Mengganti pool yang rusak (sekali, walau banyak request melihatnya)."""
+        with self.restart_lock:
+            if self.executor is not broken:
+                return
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._start_executor()
+            with self.lock:
+                self.counts['pool_restarts'] += 1
+
+    def reserve(self):
+        """
+        Memesan satu slot kapasitas untuk submit(..., reserved=True).
+        Melempar queue.Full jika antrean penuh. Slot yang tidak jadi
+        dipakai dikembalikan dengan unreserve().
+        """
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.counts['rejected'] += 1
+            raise queue.Full
+
+    def unreserve(self):
+        self.slots.release()
+
+    def submit(self, data, options, before_after=False, reserved=False):
+        """
+        Memproses satu gambar (bytes) dan menunggu hasilnya: tuple bytes
+        JPEG (final[, before_after]). Melempar queue.Full jika antrean
+        penuh; error pipeline diteruskan ke pemanggil.
+
+        reserved=True: slot sudah dipesan dengan reserve().
+        """
+        if not reserved:
+            self.reserve()
+        t0, submitted = time.perf_counter(), time.time()
+        with self.lock:
+            self.counts['accepted'] += 1
+            self.in_flight += 1
+        ok = False
+        executor = self.executor
+        try:
+            try:
+                payloads, start, compute_s = executor.submit(
+                    _service_task, data, options, before_after).result()
+            except BrokenExecutor:
+                self._restart_executor(executor)
+                raise
+            ok = True
+            return payloads
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                self.counts['completed' if ok else 'failed'] += 1
+                if ok:
+                    self.latency['total'].append(time.perf_counter() - t0)
+                    self.latency['queue'].append(max(0.0, start - submitted))
+                    self.latency['compute'].append(compute_s)
+            self.slots.release()
+
+    def metrics(self):
+        """Snapshot metrik layanan (dict, siap di-JSON-kan)."""
+        with self.lock:
+            out = dict(self.counts,
+                       workers=self.workers, capacity=self.capacity,
+                       in_flight=self.in_flight,
+                       queue_depth=max(0, self.in_flight - self.workers),
+                       uptime_s=round(time.time() - self.started, 1))
+            for name, vals in self.latency.items():
+                v = np.asarray(vals) * 1000
+                out[f'{name}_ms'] = ({'p50': round(float(np.percentile(v, 50)), 1),
+                                      'p95': round(float(np.percentile(v, 95)), 1),
+                                      'p99': round(float(np.percentile(v, 99)), 1),
+                                      'n': len(v)} if len(v) else None)
+        return out
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        if self.workers == 1:
+            batch_worker_release()
+
+
+_TRUE_WORDS = ('1', 'true', 'yes', 'ya', 'on')
+_FALSE_WORDS = ('0', 'false', 'no', 'tidak', 'off')
+
+
+def parse_service_options(query):
+    """
+    Mengurai query string request /enhance, mis.
+    "do_hdr=0&quality=fast&auto=1&before_after=1", menjadi
+    (opsi pipeline, before_after). Melempar ValueError untuk nama
+    atau nilai yang tidak dikenal.
+    """
+    options, before_after = {}, False
+    for name, value in parse_qsl(query, keep_blank_values=True):
+        if name == 'quality':
+            check_quality(value)
+            if value != 'exact':
+                options['quality'] = value
+            continue
+        if name not in PIPELINE_OPTIONS + ('auto', 'before_after'):
+            raise ValueError(f"opsi tidak dikenal: {name!r}")
+        if value.lower() in _TRUE_WORDS:
+            flag = True
+        elif value.lower() in _FALSE_WORDS:
+            flag = False
+        else:
+            raise ValueError(f"nilai {name} harus 0/1, bukan {value!r}")
+        if name == 'before_after':
+            before_after = flag
+        elif name != 'auto' or flag:
+            options[name] = flag
+    return options, before_after
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    """
+    Endpoint:
+    - POST /enhance?opsi  body = bytes gambar → image/jpeg hasil, atau
+      multipart/mixed (final + before_after) jika before_after=1.
+    - GET /metrics → JSON EnhanceService.metrics().
+    - GET /health  → "ok".
+    Antrean penuh → 503 + Retry-After (dicek sebelum body dibaca);
+    input atau Content-Length salah → 400; tanpa Content-Length → 411.
+    """
+    service = None
+    protocol_version = "HTTP/1.1"
+
+    def address_string(self):
+        # soket Unix tidak punya alamat klien (host, port)
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def _send(self, code, body, content_type="text/plain; charset=utf-8", headers=()):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/metrics":
+            self._send(200, json.dumps(self.service.metrics()), "application/json")
+        elif path == "/health":
+            self._send(200, "ok\n")
+        else:
+            self._send(404, "tidak ditemukan\n")
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/enhance":
+            self.close_connection = True
+            self._send(404, "tidak ditemukan\n")
+            return
+        # body belum dibaca di cabang error: koneksi ditutup agar sisa
+        # body tidak terbaca sebagai request berikutnya
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self.close_connection = True
+            self._send(411, "header Content-Length wajib diisi\n")
+            return
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        if not 0 < length <= SERVICE_MAX_BODY:
+            self.close_connection = True
+            self._send(413 if length > SERVICE_MAX_BODY else 400,
+                       "body harus berisi bytes gambar "
+                       f"(maks. {SERVICE_MAX_BODY // 2**20} MB)\n")
+            return
+        try:
+            options, before_after = parse_service_options(url.query)
+            self.service.reserve()
+        except queue.Full:
+            self.close_connection = True
+            self._send(503, "antrean penuh, coba lagi\n", headers=[("Retry-After", "1")])
+            return
+        except ValueError as e:
+            self.close_connection = True
+            self._send(400, f"{e}\n")
+            return
+
+        try:
+            data = self.rfile.read(length)
+        except BaseException:
+            self.service.unreserve()
+            raise
+        if len(data) < length:
+            self.service.unreserve()
+            self.close_connection = True
+            return
+        try:
+            payloads = self.service.submit(data, options, before_after, reserved=True)
+        except ValueError as e:
+            self._send(400, f"{e}\n")
+            return
+        except Exception as e:
+            self._send(500, f"{type(e).__name__}: {e}\n")
+            return
+
+        if not before_after:
+            self._send(200, payloads[0], "image/jpeg")
+            return
+        boundary = "enhance-" + os.urandom(8).hex()
+        parts = []
+        for name, payload in zip(("final", "before_after"), payloads):
+            parts.append(f"--{boundary}\r\nContent-Type: image/jpeg\r\n"
+                         f"Content-Disposition: attachment; name=\"{name}\"; "
+                         f"filename=\"{name}.jpg\"\r\n\r\n".encode() + payload + b"\r\n")
+        body = b"".join(parts) + f"--{boundary}--\r\n".encode()
+        self._send(200, body, f"multipart/mixed; boundary={boundary}")
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+class _UnixHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer pada soket Unix (path file)."""
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        # soket sisa service sebelumnya dihapus (file biasa tidak disentuh)
+        try:
+            if stat.S_ISSOCK(os.stat(self.server_address).st_mode):
+                os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+def make_service_server(service, host="127.0.0.1", port=SERVICE_PORT, unix_socket=None):
+    """
+    Server HTTP untuk service (EnhanceService): TCP di host:port
+    (default hanya localhost), atau soket Unix jika unix_socket diisi.
+    Setiap koneksi ditangani satu thread; compute tetap dibatasi
+    kapasitas service. Jalankan dengan server.serve_forever().
+    """
+    handler = type('ServiceHandler', (_ServiceHandler,), {'service': service})
+    if unix_socket:
+        return _UnixHTTPServer(unix_socket, handler)
+    return ThreadingHTTPServer((host, port), handler)
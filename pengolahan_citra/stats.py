@@ -0,0 +1,186 @@
+"""Statistik gambar bersama dan tahap point-wise berbasis LUT."""
+import cv2
+import numpy as np
+
+from .filters import downscale_to_fit, histogram_percentiles, stretch_lut
+
+
+# ============================================================
+#      STATISTIK BERSAMA – SATU PENGUKURAN PER GAMBAR
+# ============================================================
+
+class ImageStats:
+    """
+    Konteks statistik global satu gambar (3 channel) yang dipakai
+    bersama oleh semua tahap yang membutuhkannya: rata-rata channel
+    (Gray-World), histogram channel (tahap LUT), plane grayscale dan
+    histogram luminance (analisis mode auto, deteksi wajah, exposure
+    mode video / tiled).
+
+    Cara kerja:
+    - Setiap statistik dihitung saat pertama diminta lalu disimpan,
+      sehingga tahap lain yang butuh nilai yang sama tidak membaca
+      ulang gambar. Rata-rata ketiga channel diambil dalam satu
+      lintasan (cv2.mean), tanpa salinan float32.
+    - sample(side) / downscaled(side): konteks untuk resolusi
+      tereduksi (sampel setiap k pixel / proxy INTER_AREA), disimpan
+      per ukuran sehingga pemakai yang berbeda berbagi proxy yang sama.
+    - mapped(luts): konteks untuk output tahap LUT per channel.
+      Histogram dipetakan lewat LUT (rata-rata dihitung dari
+      histogram itu) tanpa membaca gambar; gambar hasil LUT baru
+      dibuat jika statistik lain (gray, proxy) diminta.
+
+    Gambar tidak boleh diubah selama konteksnya masih dipakai.
+    """
+    def __init__(self, img=None, parent=None, luts=None):
+        self._img = img
+        self._parent = parent
+        self._luts = luts
+        self.shape = img.shape if img is not None else parent.shape
+        self._hists = [None] * self.shape[2]
+        self._means = None
+        self._gray = None
+        self._gray_hist = None
+        self._luma_hist = None
+        self._derived = {}
+
+    @property
+    def image(self):
+        """Gambar yang diukur (hasil LUT konteks mapped dibuat saat pertama dibutuhkan)."""
+        if self._img is None:
+            luts = [_IDENTITY_LUT if lut is None else lut for lut in self._luts]
+            self._img = cv2.LUT(self._parent.image,
+                                np.stack(luts, axis=-1).reshape(1, 256, len(luts)))
+        return self._img
+
+    def hist(self, c):
+        """Histogram 256-bin channel c."""
+        if self._hists[c] is None:
+            if self._parent is not None:
+                h, lut = self._parent.hist(c), self._luts[c]
+                self._hists[c] = h if lut is None else np.bincount(lut, weights=h, minlength=256)
+            else:
+                self._hists[c] = cv2.calcHist([self._img], [c], None, [256], [0, 256]).ravel()
+        return self._hists[c]
+
+    def means(self):
+        """Rata-rata tiap channel, berurutan seperti channel gambar (B, G, R)."""
+        if self._means is None:
+            if self._img is None:
+                self._means = [histogram_mean(self.hist(c)) for c in range(self.shape[2])]
+            else:
+                self._means = list(cv2.mean(self._img)[:self.shape[2]])
+        return self._means
+
+    def gray(self):
+        """Plane grayscale (cv2.COLOR_BGR2GRAY), seperti untuk deteksi wajah."""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    def gray_hist(self):
+        """Histogram 256-bin plane grayscale."""
+        if self._gray_hist is None:
+            self._gray_hist = cv2.calcHist([self.gray()], [0], None, [256], [0, 256]).ravel()
+        return self._gray_hist
+
+    def luma_hist(self):
+        """Histogram 256-bin channel Y (YCrCb), yang diregangkan tahap exposure."""
+        if self._luma_hist is None:
+            ycrcb = cv2.cvtColor(self.image, cv2.COLOR_BGR2YCrCb)
+            self._luma_hist = cv2.calcHist([ycrcb], [0], None, [256], [0, 256]).ravel()
+        return self._luma_hist
+
+    def sample(self, side):
+        """Konteks sampel setiap k pixel (tanpa dirata-rata), sisi terpanjang <= side."""
+        key = ('sample', side)
+        if key not in self._derived:
+            k = max(1, -(-max(self.shape[:2]) // side))
+            self._derived[key] = (self if k == 1 else
+                                  ImageStats(np.ascontiguousarray(self.image[::k, ::k])))
+        return self._derived[key]
+
+    def downscaled(self, side):
+        """Konteks proxy INTER_AREA (downscale_to_fit) dengan sisi terpanjang <= side."""
+        key = ('proxy', side)
+        if key not in self._derived:
+            proxy = downscale_to_fit(self.image, side)
+            self._derived[key] = self if proxy is self.image else ImageStats(proxy)
+        return self._derived[key]
+
+    def mapped(self, luts):
+        """Konteks untuk gambar ini setelah LUT per channel (None = identitas)."""
+        return ImageStats(parent=self, luts=list(luts))
+
+
+
+# ============================================================
+#        TAHAP POINT-WISE – KOMPOSISI LUT PER CHANNEL
+# ============================================================
+
+_IDENTITY_LUT = np.arange(256, dtype=np.uint8)
+
+
+def scale_lut(k):
+    """LUT 256 entri untuk v * k, di-clip ke uint8 (float32 seperti aslinya)."""
+    v = np.arange(256, dtype=np.float32)
+    return np.clip(v * np.float32(k), 0, 255).astype(np.uint8)
+
+
+def histogram_mean(hist):
+    """Rata-rata nilai pixel dari histogram 256-bin."""
+    return float(np.dot(hist, np.arange(256, dtype=np.float64)) / max(hist.sum(), 1))
+
+
+def awb_luts(stats):
+    """LUT per channel BGR untuk Gray-World dari ImageStats input tahap."""
+    return gray_world_luts(stats.means())
+
+
+def gray_world_luts(means):
+    """LUT per channel BGR untuk Gray-World dari rata-rata channel B, G, R."""
+    means = [np.float32(m) for m in means]
+    avg = (means[0] + means[1] + means[2]) / np.float32(3.0)
+    return [scale_lut(avg / (m + np.float32(1e-8))) for m in means]
+
+
+def exposure_luts(stats, low_perc=1, high_perc=99):
+    """LUT untuk channel Y (YCrCb) dari contrast stretching; Cr/Cb tetap."""
+    low, high = histogram_percentiles(stats.hist(0), (low_perc, high_perc))
+    return [stretch_lut(low, high), None, None]
+
+
+def tone_luts(stats, sat=1.06, val=0.98):
+    """LUT untuk channel S dan V (HSV) dari final_color_tone; H tetap."""
+    return [None, scale_lut(sat), scale_lut(val)]
+
+
+def apply_point_stages(img, lut_fns, dst=None, stats=None):
+    """
+    Menjalankan beberapa tahap point-wise sebagai satu LUT per channel.
+
+    Cara kerja:
+    - Setiap fungsi_lut menerima ImageStats input tahapnya dan
+      mengembalikan 3 LUT (None = identitas). Tahap pertama memakai
+      stats (konteks img yang sudah ada, mis. milik pipeline) atau
+      konteks baru.
+    - Statistik tahap berikutnya diperbarui secara inkremental
+      (ImageStats.mapped): histogram dihitung sekali dari gambar awal
+      lalu dipetakan lewat LUT tahap-tahap sebelumnya.
+    - LUT dikomposisi: lut_total = lut_baru[lut_total].
+    - Gambar dibaca & ditulis satu kali dengan cv2.LUT (ke dst jika
+      diisi; dst boleh sama dengan img).
+    """
+    n_ch = img.shape[2]
+    if stats is None:
+        stats = ImageStats(img)
+    composed = [_IDENTITY_LUT] * n_ch
+    for lut_fn in lut_fns:
+        luts = lut_fn(stats)
+        stats = stats.mapped(luts)
+        for c, lut in enumerate(luts):
+            if lut is not None:
+                composed[c] = lut[composed[c]]
+
+    lut3 = np.stack(composed, axis=-1).reshape(1, 256, n_ch)
+    return cv2.LUT(img, lut3, dst=dst)
@@ -0,0 +1,379 @@
+"""Mode tiled untuk gambar sangat besar dengan memori terbatas."""
+import cv2
+import numpy as np
+
+from .filters import (FACE_DETECT_MAX_SIDE, SHARPEN_AMOUNT, denoise_fn, detail_fn,
+                      detect_faces, histogram_percentiles, smooth_faces, stretch_lut,
+                      tier_stage_name, tone_hsv, unsharp_mask)
+from .fused import _on_y_plane, run_fused_pipeline, _sharpen_name
+from .profiling import profiled
+from .stats import ImageStats, awb_luts, tone_luts
+
+
+# ============================================================
+#      MODE TILED – MEMORI TERBATAS UNTUK GAMBAR SANGAT BESAR
+# ============================================================
+
+# Halo (jumlah baris tambahan di atas & bawah band) per tahap,
+# disesuaikan dengan jangkauan filter masing-masing
+TILE_HALOS = {
+    'denoise': 9 // 2,        # bilateralFilter d=9
+    'face_beauty': 64,        # bilateral d=9 + edgePreservingFilter sigma_s=60
+    'hdr_detail': 3 * 12,     # detailEnhance sigma_s=12
+    'sharpen': 5,             # GaussianBlur sigma=1.2 (kernel 9)
+}
+
+# Perkiraan byte buffer kerja per pixel tile (salinan antar tahap,
+# buffer float detailEnhance / edgePreservingFilter, dsb.);
+# diukur dari puncak RSS pipeline penuh (~120 byte/pixel)
+TILE_BYTES_PER_PIXEL = 128
+
+# Sisi terpanjang gambar proxy untuk deteksi wajah cepat (_detect_faces_proxy)
+TILE_FACE_PROXY_SIDE = FACE_DETECT_MAX_SIDE
+
+# Anggaran memori default mode tiled (MB per worker)
+TILE_BUDGET_MB = 512
+
+CLAHE_GRID = (8, 8)
+
+
+def _fixed_luts(luts):
+    """Fungsi LUT untuk apply_point_stages yang selalu memakai LUT tetap."""
+    return lambda stats: luts
+
+
+def _spans(n, step):
+    """Membagi rentang [0, n) menjadi potongan [a, b) sepanjang step."""
+    return [(a, min(a + step, n)) for a in range(0, n, step)]
+
+
+def _run_tiles(src, dst, tile, halo, fn, after=None):
+    """
+    Menjalankan fn(crop, row0, col0) per tile dengan halo di keempat sisi.
+
+    - Gambar diproses per band baris setinggi tile[0]; setiap band
+      dibagi lagi menjadi tile selebar tile[1].
+    - crop = tile + halo (dipotong di tepi gambar); hanya bagian inti
+      yang disalin ke dst. (row0, col0) = posisi crop di gambar.
+    - Jika src is dst (in-place), baris halo di atas band diambil dari
+      salinan kecil (carry) yang disimpan sebelum band sebelumnya
+      ditimpa. Karena itu tinggi tile harus >= halo.
+    - after(r0, r1) dipanggil setelah satu band selesai ditulis ke dst.
+    """
+    H, W = src.shape[:2]
+    tile_h, tile_w = tile
+    inplace = src is dst
+    carry = None
+
+    for r0, r1 in _spans(H, tile_h):
+        a = max(0, r0 - halo)
+        b = min(H, r1 + halo)
+        if inplace and a < r0:
+            rows = np.concatenate((carry[len(carry) - (r0 - a):], src[r0:b]))
+        else:
+            rows = src[a:b]
+
+        band = np.empty((r1 - r0,) + src.shape[1:], src.dtype) if inplace else dst[r0:r1]
+        for c0, c1 in _spans(W, tile_w):
+            ca = max(0, c0 - halo)
+            cb = min(W, c1 + halo)
+            res = fn(rows[:, ca:cb], a, ca)
+            band[:, c0:c1] = res[r0 - a:r1 - a, c0 - ca:c1 - ca]
+
+        if inplace:
+            carry = src[max(r0, r1 - halo):r1].copy()
+            dst[r0:r1] = band
+        if after is not None:
+            after(r0, r1)
+
+
+def clahe_geometry(shape, grid=CLAHE_GRID):
+    """
+    Ukuran sel CLAHE seperti cv2.createCLAHE: jika dimensi tidak habis
+    dibagi grid, gambar dianggap diberi border reflect-101 sebanyak
+    (grid - sisa) di kanan & bawah.
+
+    Mengembalikan ((lebar_sel, tinggi_sel), pad_x, pad_y).
+    """
+    H, W = shape[:2]
+    gx, gy = grid
+    if W % gx == 0 and H % gy == 0:
+        return (W // gx, H // gy), 0, 0
+    pad_x = gx - W % gx
+    pad_y = gy - H % gy
+    return ((W + pad_x) // gx, (H + pad_y) // gy), pad_x, pad_y
+
+
+def clahe_cell_luts(cell_hists, cell_area, clipLimit):
+    """
+    LUT CLAHE per sel dari histogram sel (grid_y, grid_x, 256),
+    identik dengan perhitungan LUT di cv2.CLAHE: histogram di-clip,
+    kelebihannya dibagi rata, lalu dijadikan CDF.
+    """
+    gy, gx, _ = cell_hists.shape
+    luts = np.empty((gy, gx, 256), np.float32)
+    clip = max(int(clipLimit * cell_area / 256), 1) if clipLimit > 0 else 0
+    scale = np.float32(255.0 / cell_area)
+
+    for ty in range(gy):
+        for tx in range(gx):
+            h = cell_hists[ty, tx].astype(np.int64)
+            if clip > 0:
+                clipped = int(np.maximum(h - clip, 0).sum())
+                h = np.minimum(h, clip)
+                batch = clipped // 256
+                residual = clipped - batch * 256
+                h += batch
+                if residual:
+                    step = max(256 // residual, 1)
+                    h[np.arange(0, 256, step)[:residual]] += 1
+            cdf = np.cumsum(h).astype(np.float32)
+            luts[ty, tx] = np.clip(np.rint(cdf * scale), 0, 255)
+    return luts
+
+
+def clahe_interpolate(Y, row0, col0, luts, cell_size):
+    """
+    Menerapkan LUT sel CLAHE pada potongan Y yang dimulai di
+    (row0, col0) (interpolasi bilinear antar pusat sel, seperti cv2.CLAHE).
+    """
+    gy, gx, _ = luts.shape
+    tw, th = cell_size
+    h, W = Y.shape
+    one = np.float32(1.0)
+
+    # bobot tetap float32 (txf - floor(txf)), sama dengan cv2.CLAHE;
+    # dengan bobot float64 hasil berbeda ±1 pada nilai yang tepat .5
+    txf = np.arange(col0, col0 + W, dtype=np.float32) * (one / np.float32(tw)) - np.float32(0.5)
+    xa = txf - np.floor(txf)
+    tx1 = np.floor(txf).astype(np.intp)
+    tx2 = np.minimum(tx1 + 1, gx - 1)
+    tx1 = np.maximum(tx1, 0)
+
+    tyf = np.arange(row0, row0 + h, dtype=np.float32) * (one / np.float32(th)) - np.float32(0.5)
+    ya = (tyf - np.floor(tyf))[:, None]
+    ty1 = np.floor(tyf).astype(np.intp)
+    ty2 = np.minimum(ty1 + 1, gy - 1)[:, None]
+    ty1 = np.maximum(ty1, 0)[:, None]
+
+    xa1 = one - xa
+    top = luts[ty1, tx1, Y] * xa1 + luts[ty1, tx2, Y] * xa
+    bot = luts[ty2, tx1, Y] * xa1 + luts[ty2, tx2, Y] * xa
+    res = top * (one - ya) + bot * ya
+    return np.clip(np.rint(res), 0, 255).astype(np.uint8)
+
+
+class _ClaheCellHistograms:
+    """
+    Akumulator histogram sel CLAHE untuk seluruh gambar, diisi per band
+    sehingga CLAHE di mode tiled memakai statistik global yang sama
+    dengan cv2.CLAHE pada gambar utuh.
+    """
+    def __init__(self, shape, grid=CLAHE_GRID):
+        self.H, self.W = shape[:2]
+        self.grid = grid
+        (self.tw, self.th), self.pad_x, self.pad_y = clahe_geometry(shape, grid)
+        self.hists = np.zeros((grid[1], grid[0], 256), np.float64)
+
+    def _add(self, Y, ty):
+        """Menambah histogram Y (semua baris di baris-sel ty) per kolom sel."""
+        for tx in range(self.grid[0]):
+            c0, c1 = tx * self.tw, min((tx + 1) * self.tw, Y.shape[1])
+            if c1 > c0:
+                self.hists[ty, tx] += cv2.calcHist(
+                    [np.ascontiguousarray(Y[:, c0:c1])], [0], None, [256], [0, 256]).ravel()
+
+    def _y_ext(self, bgr):
+        """Y dari potongan BGR, ditambah kolom reflect-101 di kanan."""
+        Y = cv2.cvtColor(bgr, cv2.COLOR_BGR2YCrCb)[:, :, 0]
+        if self.pad_x:
+            Y = np.hstack((Y, Y[:, self.W - 2 - np.arange(self.pad_x)]))
+        return Y
+
+    def add_band(self, bgr, r0):
+        """Menambah band BGR hasil tahap sebelum CLAHE (baris mulai r0)."""
+        Y = self._y_ext(bgr)
+        r1 = r0 + Y.shape[0]
+        for ty in range(r0 // self.th, (r1 - 1) // self.th + 1):
+            a, b = max(r0, ty * self.th), min(r1, (ty + 1) * self.th)
+            self._add(Y[a - r0:b - r0], ty)
+
+    def add_border(self, img_bgr):
+        """Menambah baris reflect-101 di bawah gambar (dipanggil sekali)."""
+        for k in range(self.pad_y):
+            src_row = self.H - 2 - k
+            Y = self._y_ext(img_bgr[src_row:src_row + 1])
+            self._add(Y, (self.H + k) // self.th)
+
+    def luts(self, clipLimit):
+        return clahe_cell_luts(self.hists, self.tw * self.th, clipLimit)
+
+
+def _tile_size(budget_mb, halo):
+    """
+    Ukuran tile (tinggi, lebar) dari anggaran memori: tile + halo di
+    keempat sisi harus muat dalam budget_mb.
+    """
+    side = int(np.sqrt(budget_mb * 1024 * 1024 / TILE_BYTES_PER_PIXEL)) - 2 * halo
+    side = max(side, halo, 64)
+    return side, side
+
+
+def _detect_faces_proxy(img_bgr, face_cascade, point_luts, stats=None):
+    """
+    Deteksi wajah cepat (dipakai mode video): pada gambar proxy (sisi
+    terpanjang TILE_FACE_PROXY_SIDE) yang sudah diberi koreksi
+    point-wise (AWB/exposure) tanpa denoise, lalu kotak diskalakan
+    kembali ke resolusi penuh. Kotaknya bisa sedikit berbeda dari
+    detect_faces pada gambar hasil denoise.
+    Proxy diambil dari stats (ImageStats img_bgr) jika diisi.
+    """
+    H, W = img_bgr.shape[:2]
+    scale = min(1.0, TILE_FACE_PROXY_SIDE / max(H, W))
+    if stats is None:
+        stats = ImageStats(img_bgr)
+    proxy = run_fused_pipeline(stats.downscaled(TILE_FACE_PROXY_SIDE).image, point_luts)
+    faces = detect_faces(proxy, face_cascade, max_side=None)
+    return [tuple(int(round(v / scale)) for v in box) for box in faces]
+
+
+def enhancement_pipeline_tiled(img_bgr, face_cascade, budget_mb=TILE_BUDGET_MB,
+                               do_awb=True,
+                               do_exposure=True,
+                               do_denoise=True,
+                               do_face_beauty=True,
+                               do_hdr=True,
+                               do_sharpen=True,
+                               do_final_tone=True,
+                               profile=None,
+                               quality='exact',
+                               sharpen_amount=SHARPEN_AMOUNT,
+                               stats=None):
+    """
+    Pipeline yang sama dengan enhancement_pipeline, tetapi diproses per
+    tile dengan halo agar buffer kerja tetap di bawah budget_mb
+    (di luar gambar input & output itu sendiri).
+
+    Cara kerja:
+    1. Statistik global dihitung dari seluruh gambar, per band:
+       rata-rata Gray-World dan percentile exposure (setelah AWB).
+    2. Fase 0: AWB/exposure (LUT tetap) → denoise per tile ke buffer
+       output. Kotak wajah dideteksi dari hasil ini (detect_faces),
+       sama dengan input deteksi di pipeline biasa.
+    3. Fase 1: face beauty → detailEnhance per tile, in-place pada
+       buffer output; halo = jumlah jangkauan filter (TILE_HALOS).
+       Histogram sel CLAHE dikumpulkan dari hasilnya.
+    4. Fase 2 (jika HDR aktif): CLAHE dengan LUT sel global →
+       sharpen → tone, in-place pada buffer output.
+
+    Gambar yang muat dalam satu tile menghasilkan output yang sama
+    persis dengan pipeline biasa (CLAHE memakai pembulatan yang sama
+    dengan cv2.CLAHE). Jika gambar dipecah ke beberapa tile, tahap
+    point-wise, CLAHE, dan deteksi wajah tetap sama, tetapi
+    detailEnhance / edgePreservingFilter (filter rekursif yang
+    jangkauannya melewati TILE_HALOS) membuat sebagian pixel berbeda;
+    umumnya ±1, paling jauh beberapa belas level di dekat tepi tile.
+    Deteksi wajah memakai satu plane grayscale seukuran gambar,
+    seperti pipeline biasa.
+
+    profile (StageProfiler): statistik global dicatat sebagai
+    'stats' / 'face_detect', tahap per tile dijumlahkan per nama.
+
+    quality: tier filter berat (lihat QUALITY_TIERS); jangkauan filter
+    pendekatan tidak melebihi TILE_HALOS tier exact.
+    sharpen_amount: lihat plan_pipeline.
+    stats (ImageStats img_bgr): rata-rata channel untuk AWB diambil
+    dari konteks yang sama (satu lintasan cv2.mean).
+    """
+    H, W = img_bgr.shape[:2]
+    out = np.empty_like(img_bgr)
+    if stats is None:
+        stats = ImageStats(img_bgr)
+
+    halo0 = TILE_HALOS['denoise'] if do_denoise else 0
+    halo1 = 0
+    if do_face_beauty:
+        halo1 += TILE_HALOS['face_beauty']
+    if do_hdr:
+        halo1 += TILE_HALOS['hdr_detail']
+    halo2 = TILE_HALOS['sharpen'] if do_sharpen else 0
+    if not do_hdr:
+        halo1 += halo2
+    tile = _tile_size(budget_mb, max(halo0, halo1, halo2))
+
+    # 1. statistik global
+    def global_stats():
+        point = []
+        if do_awb:
+            point.append(('awb', 'bgr', None, _fixed_luts(awb_luts(stats))))
+        if do_exposure:
+            y_hist = np.zeros(256, np.float64)
+            for r0, r1 in _spans(H, tile[0]):
+                band = run_fused_pipeline(img_bgr[r0:r1], point)
+                y_hist += cv2.calcHist([cv2.cvtColor(band, cv2.COLOR_BGR2YCrCb)],
+                                       [0], None, [256], [0, 256]).ravel()
+            low, high = histogram_percentiles(y_hist, (1, 99))
+            point.append(('exposure', 'ycrcb', None,
+                          _fixed_luts([stretch_lut(low, high), None, None])))
+        return point
+
+    point = profiled(profile, 'stats', global_stats)
+
+    # 2. fase 0: tahap point-wise + denoise ke out
+    def phase0(crop, row0, col0):
+        plan = list(point)
+        if do_denoise:
+            plan.append((tier_stage_name('denoise', quality), 'bgr', denoise_fn(quality), None))
+        return run_fused_pipeline(crop, plan, profile=profile)
+
+    _run_tiles(img_bgr, out, tile, halo0, phase0)
+    faces = []
+    if do_face_beauty:
+        faces = profiled(profile, 'face_detect', detect_faces, out, face_cascade)
+        if profile is not None:
+            profile.records[-1].update(
+                faces=len(faces), face_roi_area=int(sum(w * h for (_, _, w, h) in faces)))
+
+    tail = []
+    if do_sharpen:
+        tail.append((_sharpen_name(sharpen_amount), 'bgr',
+                     lambda img: unsharp_mask(img, amount=sharpen_amount, sigma=1.2), None))
+    if do_final_tone:
+        tail.append(('final_tone', 'hsv', tone_hsv, tone_luts))
+
+    # 3. fase 1: in-place pada out
+    def phase1(crop, row0, col0):
+        plan = []
+        if do_face_beauty:
+            ch, cw = crop.shape[:2]
+            local = [(x - col0, y - row0, w, h) for (x, y, w, h) in faces
+                     if y + h + w >= row0 and y - w <= row0 + ch
+                     and x + w + w >= col0 and x - w <= col0 + cw]
+            if local:
+                plan.append((tier_stage_name('face_beauty', quality), 'bgr',
+                             lambda img: smooth_faces(img, local, quality=quality), None))
+        if do_hdr:
+            plan.append((tier_stage_name('hdr_detail', quality), 'bgr', detail_fn(quality), None))
+        else:
+            plan.extend(tail)
+        return run_fused_pipeline(crop, plan, profile=profile)
+
+    clahe_hists = _ClaheCellHistograms(img_bgr.shape) if do_hdr else None
+    after = (lambda r0, r1: clahe_hists.add_band(out[r0:r1], r0)) if do_hdr else None
+    _run_tiles(out, out, tile, halo1, phase1, after)
+
+    if not do_hdr:
+        return out
+
+    # 4. fase 2: CLAHE global + tahap akhir, in-place pada out
+    clahe_hists.add_border(out)
+    luts = clahe_hists.luts(clipLimit=2.2)
+    cell = (clahe_hists.tw, clahe_hists.th)
+
+    def phase2(crop, row0, col0):
+        clahe = _on_y_plane(lambda Y: clahe_interpolate(Y, row0, col0, luts, cell))
+        return run_fused_pipeline(crop, [('hdr_clahe', 'ycrcb', clahe, None)] + tail,
+                                  profile=profile)
+
+    _run_tiles(out, out, tile, halo2, phase2)
+    return out
@@ -0,0 +1,263 @@
+"""Auto-tune jumlah worker, thread OpenCV, antrean, dan ukuran tile."""
+import os
+import time
+import json
+import shutil
+import tempfile
+import platform
+
+import cv2
+import numpy as np
+
+from .batch import run_batch
+from .encoder import write_bytes
+from .files import default_cache_dir, ensure_dir, list_image_files, load_face_cascade
+from .pipeline import enhancement_pipeline
+
+
+# ============================================================
+#     AUTO-TUNE – WORKER, THREAD OPENCV, ANTREAN & UKURAN TILE
+# ============================================================
+
+# Profil auto-tune di folder cache; dimuat otomatis oleh batch
+TUNE_FILE = "tuning.json"
+
+# Maksimum gambar contoh yang dipakai kalibrasi
+TUNE_MAX_SAMPLES = 8
+
+# Minimum gambar per putaran kalibrasi
+TUNE_MIN_IMAGES = 6
+
+# Ukuran gambar uji mode tiled (megapixel) dan anggaran tile yang dicoba (MB)
+TUNE_TILE_MP = 8
+TUNE_TILE_BUDGETS = (64, 128, 256, 512, 1024)
+
+# Antrean / anggaran tile terkecil yang throughput-nya dalam batas ini
+# dari yang terbaik dipilih (lebih kecil = memori lebih hemat)
+TUNE_TOLERANCE = 0.03
+
+
+def machine_fingerprint():
+    """Identitas mesin & OpenCV; profil tuning hanya berlaku jika sama."""
+    return {'node': platform.node(), 'machine': platform.machine(),
+            'cpu_count': os.cpu_count(), 'opencv': cv2.__version__}
+
+
+def tuning_path():
+    """Lokasi profil tuning: <folder cache>/TUNE_FILE."""
+    return os.path.join(default_cache_dir(), TUNE_FILE)
+
+
+def tuning_key(options):
+    """Kunci profil tuning: opsi tahap, tier, dan auto (tanpa opsi tiled)."""
+    return json.dumps({k: v for k, v in options.items() if k != 'tile_budget_mb'},
+                      sort_keys=True)
+
+
+def load_tuning(path=None):
+    """Profil tuning (dict) untuk mesin ini, atau None jika tidak ada / beda mesin."""
+    try:
+        with open(path or tuning_path(), encoding='utf-8') as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if profile.get('machine') != machine_fingerprint():
+        return None
+    return profile
+
+
+def tuned_settings(options, path=None):
+    """
+    Hasil auto-tune untuk opsi pipeline ini: dict workers, cv_threads,
+    queue_depth, tile_budget_mb, images_per_s. Jika kombinasi opsi ini
+    belum pernah di-tune, dipakai hasil tuning terbaru. None jika
+    belum ada profil untuk mesin ini.
+    """
+    profile = load_tuning(path)
+    if not profile or not profile.get('entries'):
+        return None
+    entries = profile['entries']
+    entry = entries.get(tuning_key(options))
+    if entry is None:
+        entry = max(entries.values(), key=lambda e: e['created'])
+    return entry
+
+
+def batch_settings(options, workers=None, queue_depth=None, tuning=True):
+    """
+    Melengkapi pengaturan batch dari profil auto-tune. Mengembalikan
+    (workers, cv_threads, queue_depth, entry profil atau None).
+
+    Nilai yang diisi pemanggil diutamakan; cv_threads & queue_depth
+    hasil tuning hanya dipakai jika workers sama dengan hasil tuning
+    (keduanya diukur untuk jumlah worker itu).
+    """
+    tuned = tuned_settings(options) if tuning else None
+    cv_threads = None
+    if tuned is not None and workers in (None, tuned['workers']):
+        workers = tuned['workers']
+        cv_threads = tuned['cv_threads']
+        if queue_depth is None:
+            queue_depth = tuned['queue_depth']
+    return workers, cv_threads, queue_depth, tuned
+
+
+def tune_candidates(cores):
+    """
+    Pasangan (workers, cv_threads) yang dicoba: pangkat dua dan jumlah
+    core, dengan workers x cv_threads ≤ jumlah core (tidak oversubscribe).
+    """
+    steps = {1 << i for i in range(cores.bit_length())} | {cores}
+    return [(w, t) for w in sorted(steps)
+            for t in sorted({s for s in steps if w * s <= cores} | {cores // w})]
+
+
+def _tune_pass(folder, files, options, workers, cv_threads, queue_depth, work_dir):
+    """
+    Satu putaran kalibrasi: run_batch sungguhan (baca → pipeline →
+    encode → tulis) pada files. Mengembalikan throughput (gambar/detik)
+    setelah pemanasan: dihitung dari selesainya gambar ke-workers,
+    sehingga start worker tidak ikut terhitung.
+    """
+    done_at = []
+    out = tempfile.mkdtemp(dir=work_dir)
+    try:
+        errors = run_batch(folder, out, options, workers=workers, files=files,
+                           queue_depth=queue_depth, resume=False, cv_threads=cv_threads,
+                           progress_cb=lambda *_: done_at.append(time.perf_counter()))
+    finally:
+        shutil.rmtree(out, ignore_errors=True)
+    if errors:
+        raise ValueError(f"Kalibrasi gagal: {next(iter(errors.values()))}")
+    warm = workers - 1
+    return (len(done_at) - 1 - warm) / max(done_at[-1] - done_at[warm], 1e-9)
+
+
+def _pick(results, key, rate='images_per_s'):
+    """Hasil dengan key terkecil yang throughput (rate)-nya dalam TUNE_TOLERANCE dari terbaik."""
+    best = max(r[rate] for r in results)
+    good = [r for r in results if r[rate] >= best * (1 - TUNE_TOLERANCE)]
+    return min(good, key=key)
+
+
+def _physical_memory_mb():
+    """RAM fisik (MB), atau None jika tidak bisa dibaca."""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // 2**20
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _tune_tile_budget(sample, options, workers, cv_threads, log):
+    """
+    Memilih anggaran tile: pipeline tiled pada sample yang diperbesar ke
+    TUNE_TILE_MP megapixel, dengan cv_threads thread OpenCV. Anggaran x
+    workers dibatasi setengah RAM. Mengembalikan (budget_mb, hasil).
+    """
+    h, w = sample.shape[:2]
+    scale = np.sqrt(TUNE_TILE_MP * 1e6 / (h * w))
+    img = cv2.resize(sample, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_CUBIC)
+    ram = _physical_memory_mb()
+    budgets = [b for b in TUNE_TILE_BUDGETS if ram is None or b * workers <= ram // 2]
+    cascade = load_face_cascade()
+    opts = {k: v for k, v in options.items() if k != 'tile_budget_mb'}
+
+    results = []
+    caller_threads = cv2.getNumThreads()
+    cv2.setNumThreads(cv_threads)
+    try:
+        for budget in budgets or TUNE_TILE_BUDGETS[:1]:
+            t0 = time.perf_counter()
+            enhancement_pipeline(img, cascade, tile_budget_mb=budget, **opts)
+            rate = img.shape[0] * img.shape[1] / 1e6 / (time.perf_counter() - t0)
+            results.append({'tile_budget_mb': budget, 'mp_per_s': rate})
+            log(f"  tile {budget:>5} MB: {rate:7.2f} MP/s")
+    finally:
+        cv2.setNumThreads(caller_threads)
+    return _pick(results, lambda r: r['tile_budget_mb'], 'mp_per_s')['tile_budget_mb'], results
+
+
+def auto_tune(input_folder, options=None, path=None, log=print):
+    """
+    Kalibrasi throughput batch di mesin ini, lalu menyimpan profilnya
+    (dimuat otomatis oleh batch_settings).
+
+    Cara kerja:
+    - Hingga TUNE_MAX_SAMPLES gambar dari input_folder disalin ke folder
+      sementara dengan nama unik sebanyak yang dibutuhkan tiap putaran,
+      sehingga cache kotak wajah tidak membuat putaran lebih cepat.
+    - Setiap pasangan (workers, cv_threads) dari tune_candidates diukur
+      dengan run_batch sungguhan (throughput setelah pemanasan worker).
+    - Untuk pasangan terbaik dicoba kedalaman antrean lain; yang
+      terkecil dalam TUNE_TOLERANCE dari throughput terbaik dipilih.
+    - Anggaran tile mode tiled dipilih dengan cara yang sama
+      (_tune_tile_budget).
+    - Hasil disimpan per mesin (machine_fingerprint) dan per kombinasi
+      opsi (tuning_key) di path (default tuning_path()).
+
+    Gambar contoh yang tidak bisa dibaca dilewati. Jika tidak ada satu
+    pun yang bisa dibaca, kalibrasi dibatalkan dengan peringatan (lewat
+    log) dan None dikembalikan: profil lama tidak diubah dan batch
+    memakai pengaturan bawaan.
+
+    Mengembalikan entry profil yang disimpan, atau None.
+    """
+    options = dict(options or {})
+    samples, largest = [], None
+    for name in list_image_files(input_folder)[:TUNE_MAX_SAMPLES]:
+        img = cv2.imread(os.path.join(input_folder, name))
+        if img is None:
+            log(f"  {name} tidak bisa dibaca, dilewati")
+            continue
+        samples.append(name)
+        if largest is None or img.size > largest.size:
+            largest = img
+    if not samples:
+        log(f"Peringatan: tidak ada gambar contoh yang bisa dibaca di {input_folder}; "
+            "kalibrasi dilewati, batch memakai pengaturan bawaan.")
+        return None
+    cores = os.cpu_count() or 1
+    candidates = tune_candidates(cores)
+    log(f"Kalibrasi {len(candidates)} kombinasi worker x thread OpenCV "
+        f"({cores} core, {len(samples)} gambar contoh)...")
+
+    work_dir = tempfile.mkdtemp(prefix="enhance_tune_")
+    try:
+        n = max(TUNE_MIN_IMAGES, 3 * max(w for w, _ in candidates), len(samples))
+        files = []
+        for i in range(n):
+            name = samples[i % len(samples)]
+            copy = f"{i:04d}_{os.path.basename(name)}"
+            shutil.copyfile(os.path.join(input_folder, name), os.path.join(work_dir, copy))
+            files.append(copy)
+
+        def measure(workers, cv_threads, queue_depth):
+            rate = _tune_pass(work_dir, files, options, workers, cv_threads,
+                              queue_depth, work_dir)
+            log(f"  {workers:>3} worker x {cv_threads:>2} thread, antrean {queue_depth:>3}: "
+                f"{rate:6.2f} gambar/s")
+            return {'workers': workers, 'cv_threads': cv_threads,
+                    'queue_depth': queue_depth, 'images_per_s': rate}
+
+        runs = [measure(w, t, 2 * w + 2) for w, t in candidates]
+        best = max(runs, key=lambda r: r['images_per_s'])
+        workers, cv_threads = best['workers'], best['cv_threads']
+        depths = [measure(workers, cv_threads, d) for d in (workers + 1, 4 * workers + 4)]
+        runs += depths
+        chosen = _pick([best] + depths, lambda r: r['queue_depth'])
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    tile_budget, tile_runs = _tune_tile_budget(largest, options, workers, cv_threads, log)
+
+    entry = {'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+             'workers': workers, 'cv_threads': cv_threads,
+             'queue_depth': chosen['queue_depth'], 'tile_budget_mb': tile_budget,
+             'images_per_s': chosen['images_per_s'], 'samples': len(samples),
+             'runs': runs, 'tile_runs': tile_runs}
+    path = path or tuning_path()
+    profile = load_tuning(path) or {'machine': machine_fingerprint(), 'entries': {}}
+    profile['entries'][tuning_key(options)] = entry
+    ensure_dir(os.path.dirname(path))
+    write_bytes(path, json.dumps(profile, indent=2).encode('utf-8'))
+    return entry
@@ -0,0 +1,317 @@
+"""Mode video / urutan frame dengan statistik antar frame."""
+import os
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .files import ensure_dir, load_face_cascade
+from .filters import histogram_percentiles, smooth_faces, stage_base_name, stretch_lut
+from .fused import plan_pipeline, run_fused_pipeline
+from .pool import BufferPool
+from .stats import ImageStats, gray_world_luts
+from .tiled import TILE_FACE_PROXY_SIDE, _detect_faces_proxy, _fixed_luts
+
+
+# ============================================================
+#      MODE VIDEO / URUTAN FRAME – STATISTIK ANTAR FRAME
+# ============================================================
+
+# Statistik global diukur ulang setiap sekian frame (atau saat ganti adegan)
+VIDEO_STATS_INTERVAL = 15
+
+# Sisi terpanjang proxy untuk mengukur rata-rata Gray-World & percentile
+VIDEO_STATS_SIDE = 640
+
+# Jarak Bhattacharyya histogram thumbnail terhadap frame kunci yang
+# dianggap ganti adegan (0 = sama, 1 = berbeda total)
+VIDEO_SCENE_THRESHOLD = 0.3
+
+# Batas buffer bebas di BufferPool mode video
+VIDEO_POOL_BYTES = 512 * 1024 * 1024
+
+
+def is_frame_sequence(path):
+    """True jika path berupa pola urutan frame (mis. frames/%04d.png)."""
+    return '%' in path
+
+
+class VideoStats:
+    """
+    Statistik global pipeline untuk video: rata-rata Gray-World,
+    percentile exposure (low/high), dan kotak wajah.
+
+    Cara kerja update(frame), dipanggil untuk setiap frame:
+    - Setiap `interval` frame, atau saat histogram thumbnail berbeda
+      jauh dari frame kunci terakhir (ganti adegan), statistik diukur
+      ulang pada proxy kecil (target) dan wajah dideteksi ulang.
+    - Di antara pengukuran, nilai yang dipakai bergerak menuju target
+      sebesar `smoothing` per frame (EMA) agar tidak berkedip; frame
+      pertama dan ganti adegan langsung memakai target.
+    - Mengembalikan rencana tahap (plan_pipeline) dengan LUT AWB /
+      exposure dan kotak wajah tetap untuk frame tersebut.
+    """
+    def __init__(self, face_cascade, options, interval=VIDEO_STATS_INTERVAL,
+                 smoothing=0.2, scene_threshold=VIDEO_SCENE_THRESHOLD):
+        self.face_cascade = face_cascade
+        self.options = options
+        self.interval = interval
+        self.smoothing = smoothing
+        self.scene_threshold = scene_threshold
+        self.values = None      # [mean_B, mean_G, mean_R, low, high]
+        self.target = None
+        self.faces = []
+        self.key_hist = None
+        self.since = 0
+        self.refreshes = 0
+        self.scene_cuts = 0
+
+    @staticmethod
+    def _thumb_hist(frame):
+        small = cv2.resize(frame, (64, 64), interpolation=cv2.INTER_AREA)
+        hist = cv2.calcHist([cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)], [0], None, [32], [0, 256])
+        return cv2.normalize(hist, hist)
+
+    def _point_plan(self, values):
+        """Tahap AWB & exposure dengan LUT tetap dari values."""
+        point = []
+        if self.options.get('do_awb', True):
+            point.append(('awb', 'bgr', None, _fixed_luts(gray_world_luts(values[:3]))))
+        if self.options.get('do_exposure', True):
+            lut = stretch_lut(np.float32(values[3]), np.float32(values[4]))
+            point.append(('exposure', 'ycrcb', None, _fixed_luts([lut, None, None])))
+        return point
+
+    def _measure(self, frame):
+        """
+        Mengukur statistik (pada proxy) dan kotak wajah satu frame.
+        Frame hanya diperkecil sekali: proxy statistik diambil dari
+        proxy deteksi wajah (ImageStats yang sama).
+        """
+        stats = ImageStats(frame)
+        proxy = stats.downscaled(TILE_FACE_PROXY_SIDE).downscaled(VIDEO_STATS_SIDE)
+        values = np.array(proxy.means() + [0.0, 255.0])
+        if self.options.get('do_exposure', True):
+            if self.options.get('do_awb', True):
+                proxy = proxy.mapped(gray_world_luts(values[:3]))
+            values[3:] = histogram_percentiles(proxy.luma_hist(), (1, 99))
+        faces = []
+        if self.options.get('do_face_beauty', True):
+            faces = _detect_faces_proxy(frame, self.face_cascade, self._point_plan(values),
+                                        stats)
+        return values, faces
+
+    def update(self, frame):
+        hist = self._thumb_hist(frame)
+        cut = (self.key_hist is not None and
+               cv2.compareHist(self.key_hist, hist, cv2.HISTCMP_BHATTACHARYYA) > self.scene_threshold)
+        if self.values is None or cut or self.since >= self.interval:
+            self.target, self.faces = self._measure(frame)
+            self.key_hist = hist
+            self.since = 0
+            self.refreshes += 1
+            if self.values is None or cut:
+                self.values = self.target.copy()
+                self.scene_cuts += int(cut)
+        self.since += 1
+        self.values += self.smoothing * (self.target - self.values)
+        return self.plan()
+
+    def plan(self):
+        """Rencana tahap untuk frame saat ini (lihat plan_pipeline)."""
+        point = {st[0]: st for st in self._point_plan(self.values)}
+        faces = self.faces
+        plan = []
+        for st in plan_pipeline(self.face_cascade, **self.options):
+            if st[0] in point:
+                st = point[st[0]]
+            elif stage_base_name(st[0]) == 'face_beauty':
+                quality = self.options.get('quality', 'exact')
+                st = (st[0], 'bgr',
+                      lambda img, dst=None: smooth_faces(img, faces, dst=dst, quality=quality),
+                      None)
+            plan.append(st)
+        return plan
+
+
+def enhance_video(src, dst, options=None, face_cascade=None, workers=None,
+                  queue_depth=None, stats_interval=VIDEO_STATS_INTERVAL,
+                  smoothing=0.2, scene_threshold=VIDEO_SCENE_THRESHOLD,
+                  fps=None, fourcc="mp4v", progress_cb=None):
+    """
+    Menjalankan pipeline pada file video atau urutan frame bernomor.
+
+    - src : file video, atau pola urutan frame (mis. "in/%04d.png").
+    - dst : file video output, atau pola urutan frame output.
+    - options : dict opsi pipeline (do_awb, ... seperti enhancement_pipeline).
+    - workers : jumlah thread pipeline (default: jumlah core).
+    - queue_depth : maksimum frame di setiap antrean (default 2 x workers + 2).
+    - stats_interval / smoothing / scene_threshold : lihat VideoStats.
+    - fps : fps output (default: fps sumber, atau 25).
+    - progress_cb : callback(frame_selesai, fps_rata_rata).
+
+    Cara kerja (streaming, memori terbatas berapa pun panjang klip):
+    1. Thread pembaca men-decode frame ke buffer dari BufferPool.
+    2. Thread utama memperbarui VideoStats (murah, berurutan) lalu
+       mengirim frame + rencananya ke pool thread pipeline.
+    3. Hasil diambil sesuai urutan frame dan dikirim ke thread
+       penulis (VideoWriter / imwrite), lalu buffernya dikembalikan.
+    Semua antrean dibatasi queue_depth.
+
+    Mengembalikan dict: frames, seconds, fps, refreshes, scene_cuts.
+    """
+    options = dict(options or {})
+    options.pop('tile_budget_mb', None)
+    # mode auto tidak dipakai: tahap yang menyala/mati antar frame
+    # akan terlihat berkedip
+    options.pop('auto', None)
+    cap = cv2.VideoCapture(src)
+    if not cap.isOpened():
+        raise ValueError(f"Gagal membuka {src}")
+    if fps is None:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if queue_depth is None:
+        queue_depth = 2 * workers + 2
+    if face_cascade is None:
+        face_cascade = load_face_cascade()
+    if is_frame_sequence(dst):
+        ensure_dir(os.path.dirname(dst) or ".")
+
+    stats = VideoStats(face_cascade, options, stats_interval, smoothing, scene_threshold)
+    pool = BufferPool(VIDEO_POOL_BYTES)
+    frames_q = queue.Queue(maxsize=queue_depth)
+    out_q = queue.Queue(maxsize=queue_depth)
+    stop = threading.Event()
+    failures = []
+
+    def put(q, item):
+        """Memasukkan item ke antrean; False (item tidak masuk) jika sudah stop."""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def put_sentinel(q):
+        """
+        Memasukkan None (akhir antrean) apa pun yang terjadi, agar
+        konsumen yang sedang menunggu di q.get() selalu bangun. Setelah
+        stop, frame yang masih menunggu di antrean penuh dibuang.
+        """
+        if put(q, None):
+            return
+        while True:
+            try:
+                q.put_nowait(None)
+                return
+            except queue.Full:
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    continue
+                if item is not None:
+                    pool.release(item)
+
+    def reader():
+        shape = None
+        try:
+            while not stop.is_set():
+                buf = pool.lease(shape) if shape is not None else None
+                ok, frame = cap.read(buf)
+                if not ok:
+                    break
+                shape = frame.shape
+                if not put(frames_q, frame):
+                    pool.release(frame)
+        except Exception as e:
+            failures.append(e)
+        finally:
+            put_sentinel(frames_q)
+
+    video_writer = []
+
+    def write(idx, img):
+        if is_frame_sequence(dst):
+            if not cv2.imwrite(dst % idx, img):
+                raise ValueError(f"Gagal menulis {dst % idx}")
+            return
+        if not video_writer:
+            vw = cv2.VideoWriter(dst, cv2.VideoWriter_fourcc(*fourcc), fps,
+                                 (img.shape[1], img.shape[0]))
+            if not vw.isOpened():
+                raise ValueError(f"Gagal membuat video {dst}")
+            video_writer.append(vw)
+        video_writer[0].write(img)
+
+    def writer():
+        # terus mengosongkan antrean sampai sentinel, juga setelah error
+        idx = 0
+        while True:
+            img = out_q.get()
+            if img is None:
+                break
+            if not failures:
+                try:
+                    write(idx, img)
+                except Exception as e:
+                    failures.append(e)
+                    stop.set()
+            pool.release(img)
+            idx += 1
+        for vw in video_writer:
+            vw.release()
+
+    threads = [threading.Thread(target=reader, daemon=True),
+               threading.Thread(target=writer, daemon=True)]
+    for t in threads:
+        t.start()
+    compute = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    done = 0
+    t0 = time.perf_counter()
+
+    def flush_one():
+        nonlocal done
+        frame, fut = pending.popleft()
+        out = fut.result()
+        pool.release(frame)
+        if not put(out_q, out):
+            pool.release(out)
+            return
+        done += 1
+        if progress_cb is not None:
+            progress_cb(done, done / max(time.perf_counter() - t0, 1e-9))
+
+    try:
+        while not stop.is_set():
+            frame = frames_q.get()
+            if frame is None:
+                break
+            plan = stats.update(frame)
+            pending.append((frame, compute.submit(run_fused_pipeline, frame, plan,
+                                                  None, None, None, pool)))
+            if len(pending) >= queue_depth:
+                flush_one()
+        while pending and not stop.is_set():
+            flush_one()
+    finally:
+        stop.set()
+        compute.shutdown(wait=True)
+        out_q.put(None)
+        for t in threads:
+            t.join()
+        cap.release()
+
+    if failures:
+        raise failures[0]
+    seconds = time.perf_counter() - t0
+    return {'frames': done, 'seconds': seconds, 'fps': done / max(seconds, 1e-9),
+            'refreshes': stats.refreshes, 'scene_cuts': stats.scene_cuts}
@@ -0,0 +1,24 @@
+"""Fixture bersama: gambar contoh di folder input/ dan Haar Cascade."""
+import os
+
+import cv2
+import pytest
+
+from pengolahan_citra import load_face_cascade
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "input")
+
+# Gambar contoh kecil untuk tes pipeline penuh (gambar besar lambat)
+SMALL_SAMPLES = ["cahaya_rendah.jpg", "kontras_rendah.jpg", "noise.jpg"]
+ALL_SAMPLES = sorted(f for f in os.listdir(INPUT_DIR) if f.lower().endswith(".jpg"))
+
+
+def read_sample(name):
+    img = cv2.imread(os.path.join(INPUT_DIR, name))
+    assert img is not None, name
+    return img
+
+
+@pytest.fixture(scope="session")
+def face_cascade():
+    return load_face_cascade()
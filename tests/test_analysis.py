@@ -0,0 +1,49 @@
+"""Mode auto: analisis murah dan keputusan tahap yang dilewati."""
+import cv2
+import numpy as np
+
+from pengolahan_citra import analyze_image, auto_adjustments, detect_faces
+
+from conftest import read_sample
+
+
+def test_analyze_image_measures_cast_and_noise():
+    rng = np.random.default_rng(0)
+    flat = np.full((600, 800, 3), 128, np.uint8)
+    # noise sama di ketiga kanal: diukur pada luminance
+    noise = rng.normal(0, 8, flat.shape[:2])[:, :, None]
+    noisy = np.clip(flat + noise, 0, 255).astype(np.uint8)
+    cast = flat.copy()
+    cast[:, :, 2] = 160
+
+    a = analyze_image(flat)
+    assert a['cast'] < 0.01 and a['noise'] < 0.5 and a['faces'] is None
+    assert abs(analyze_image(noisy)['noise'] - 8) < 1.5
+    assert analyze_image(cast)['cast'] > 0.1
+
+
+def test_auto_adjustments():
+    clean = {'cast': 0.0, 'low': 0.0, 'high': 255.0, 'noise': 0.1,
+             'sharpness': 1e5, 'faces': 0}
+    changes, skipped, weakened = auto_adjustments(clean, {'do_denoise': False})
+    assert list(skipped) == ['awb', 'exposure', 'face_beauty', 'sharpen']
+    assert 'do_denoise' not in changes and not weakened
+
+    needy = {'cast': 0.2, 'low': 40.0, 'high': 200.0, 'noise': 6.0,
+             'sharpness': 2000.0, 'faces': None}
+    changes, skipped, weakened = auto_adjustments(needy, {})
+    assert not skipped and list(weakened) == ['sharpen']
+    assert list(changes) == ['sharpen_amount']
+
+
+def test_small_face_in_large_frame_is_found(face_cascade):
+    # wajah ~160 px di bingkai 4000 px: masih ditemukan detect_faces
+    face = cv2.resize(read_sample("noise.jpg"), None, fx=1.5, fy=1.5,
+                      interpolation=cv2.INTER_AREA)
+    img = np.full((3000, 4000, 3), (120, 130, 140), np.uint8)
+    img[1400:1400 + face.shape[0], 1800:1800 + face.shape[1]] = face
+    assert detect_faces(img, face_cascade)
+
+    a = analyze_image(img, face_cascade)
+    assert a['faces'] >= 1
+    assert 'face_beauty' not in auto_adjustments(a, {})[1]
@@ -0,0 +1,66 @@
+"""Batch headless: file gagal dilaporkan, resume dari manifest, state worker."""
+import os
+import shutil
+
+import cv2
+
+from pengolahan_citra import batch, output_paths
+from pengolahan_citra.batch import batch_worker_init, batch_worker_release, run_batch
+
+from conftest import INPUT_DIR, SMALL_SAMPLES
+
+
+def test_run_batch_reports_bad_file(tmp_path):
+    src, dst = tmp_path / "in", tmp_path / "out"
+    src.mkdir()
+    for name in SMALL_SAMPLES[:2]:
+        shutil.copy(os.path.join(INPUT_DIR, name), src / name)
+    (src / "rusak.jpg").write_bytes(b"bukan jpeg")
+
+    seen = []
+    errors = run_batch(str(src), str(dst), workers=1,
+                       progress_cb=lambda done, total, fname, err: seen.append((done, total)))
+    assert list(errors) == ["rusak.jpg"]
+    assert sorted(seen) == [(1, 3), (2, 3), (3, 3)]
+    for name in SMALL_SAMPLES[:2]:
+        final, before_after = output_paths(str(dst), name)
+        assert cv2.imread(final).shape == cv2.imread(str(src / name)).shape
+        assert cv2.imread(before_after) is not None
+
+
+def test_run_batch_resumes_from_manifest(tmp_path):
+    src, dst = tmp_path / "in", tmp_path / "out"
+    src.mkdir()
+    names = SMALL_SAMPLES
+    for name in names:
+        shutil.copy(os.path.join(INPUT_DIR, name), src / name)
+
+    def rerun(**kwargs):
+        skipped = []
+        errors = run_batch(str(src), str(dst), workers=1, skip_cb=skipped.append, **kwargs)
+        assert errors == {}
+        return sorted(skipped)
+
+    assert rerun() == []
+    assert rerun() == names
+
+    # konten berubah, hanya di-touch, dan output hilang
+    shutil.copy(os.path.join(INPUT_DIR, names[1]), src / names[0])
+    os.utime(src / names[1], ns=(1, 1))
+    os.remove(output_paths(str(dst), names[2])[1])
+    assert rerun() == [names[1]]
+
+    assert rerun(options={"do_hdr": False}) == []
+    assert rerun(options={"do_hdr": False}, resume=False) == []
+
+
+def test_worker_face_cache_is_a_copy():
+    # workers=1: worker jalan di thread proses utama, dict tidak dibagi
+    boxes = {"a": [(1, 2, 3, 4)]}
+    batch_worker_init(1, boxes)
+    try:
+        batch._WORKER_FACE_CACHE.put("b", [(5, 6, 7, 8)])
+        assert batch._WORKER_FACE_CACHE.get("a") == [(1, 2, 3, 4)]
+        assert boxes == {"a": [(1, 2, 3, 4)]}
+    finally:
+        batch_worker_release()
@@ -0,0 +1,43 @@
+"""Encoder output: pengaturan format, encode default, dan penulisan atomik."""
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from pengolahan_citra import (encode_outputs, make_before_after_image, parse_output_spec,
+                              write_bytes)
+
+from conftest import read_sample
+
+
+def test_parse_output_spec():
+    assert parse_output_spec("jpeg:q=90,progressive") == {
+        'format': 'jpg', 'quality': 90, 'progressive': True, 'optimize': False, 'scale': 1.0}
+    assert parse_output_spec("webp:scale=0.5", 'before_after')['scale'] == 0.5
+    assert parse_output_spec("off", 'before_after') is None
+    for bad in ["off", "gif", "png:q=90", "jpg:q=0", "jpg:q=abc", "webp:scale=2"]:
+        with pytest.raises(ValueError):
+            parse_output_spec(bad)
+
+
+def test_default_outputs_match_imencode():
+    before = read_sample("noise.jpg")
+    after = cv2.GaussianBlur(before, (5, 5), 0)
+    final, ba = encode_outputs(before, after)
+    assert final == cv2.imencode(".jpg", after)[1].tobytes()
+    assert ba == cv2.imencode(".jpg", make_before_after_image(before, after))[1].tobytes()
+
+    specs = {'final': parse_output_spec("png:scale=0.5"), 'before_after': None}
+    (small,) = encode_outputs(before, after, specs)
+    img = cv2.imdecode(np.frombuffer(small, np.uint8), cv2.IMREAD_COLOR)
+    assert img.shape[:2] == (round(after.shape[0] / 2), round(after.shape[1] / 2))
+
+
+def test_write_bytes_atomic(tmp_path):
+    path = str(tmp_path / "a.jpg")
+    assert write_bytes(path, b"lama") == 4
+    assert write_bytes(path, b"baru!") == 5
+    with open(path, "rb") as f:
+        assert f.read() == b"baru!"
+    assert os.listdir(tmp_path) == ["a.jpg"]
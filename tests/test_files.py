@@ -0,0 +1,102 @@
+"""Scan folder, cek file selesai ditulis, dan cache thumbnail di disk (LRU, clear)."""
+import os
+import shutil
+import time
+
+import cv2
+import numpy as np
+
+from pengolahan_citra import ThumbnailCache, image_file_key, imread_reduced, list_image_files
+from pengolahan_citra.files import image_file_complete
+
+from conftest import INPUT_DIR, SMALL_SAMPLES
+
+
+def _cached(cache, path):
+    return os.path.exists(cache._cache_path(image_file_key(path)))
+
+
+def test_thumbnail_cache_hit_matches_decode(tmp_path):
+    path = str(tmp_path / "a.jpg")
+    shutil.copy(os.path.join(INPUT_DIR, SMALL_SAMPLES[0]), path)
+    cache = ThumbnailCache(str(tmp_path / "thumbs"), max_side=64)
+
+    expected = imread_reduced(path, 64)
+    assert np.array_equal(cache.load(path), expected)
+    assert _cached(cache, path)
+    # kedua kalinya dibaca dari PNG di cache (lossless)
+    assert np.array_equal(cache.load(path), expected)
+
+    # file yang berubah mendapat kunci (dan thumbnail) baru
+    shutil.copy(os.path.join(INPUT_DIR, SMALL_SAMPLES[1]), path)
+    assert np.array_equal(cache.load(path), imread_reduced(path, 64))
+
+
+def test_thumbnail_cache_prunes_least_recently_used(tmp_path):
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(4):
+        path = str(tmp_path / f"img{i}.png")
+        cv2.imwrite(path, rng.integers(0, 256, (64, 64, 3), dtype=np.uint8))
+        paths.append(path)
+
+    cache = ThumbnailCache(str(tmp_path / "thumbs"), max_side=64, max_bytes=10**9)
+    for path in paths[:3]:
+        cache.load(path)
+        time.sleep(0.01)
+    # img0 dipakai lagi, sehingga yang paling lama tidak dipakai img1, img2
+    assert cache.load(paths[0]) is not None
+    time.sleep(0.01)
+
+    size = os.path.getsize(cache._cache_path(image_file_key(paths[0])))
+    cache.max_bytes = 3 * size
+    cache.load(paths[3])
+    assert cache.nbytes <= cache.max_bytes
+    assert [_cached(cache, p) for p in paths] == [True, False, False, True]
+
+    # cache baru di folder yang sama membaca ukuran yang tersisa
+    assert ThumbnailCache(cache.folder, max_side=64).nbytes == cache.nbytes
+
+    cache.clear()
+    assert cache.nbytes == 0
+    assert not any(_cached(cache, p) for p in paths)
+
+
+def test_list_image_files_recursive_with_exclude(tmp_path):
+    for rel in ["a.jpg", "b.txt", "sub/c.png", "sub/deep/d.JPG", ".tersembunyi/e.jpg",
+                "out/f.jpg"]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+    folder = str(tmp_path)
+    assert list_image_files(folder) == ["a.jpg"]
+    assert list_image_files(folder, recursive=True, exclude=[str(tmp_path / "out")]) == [
+        "a.jpg", os.path.join("sub", "c.png"), os.path.join("sub", "deep", "d.JPG")]
+
+
+def test_image_file_complete_detects_truncated_files(tmp_path):
+    img = cv2.resize(cv2.imread(os.path.join(INPUT_DIR, SMALL_SAMPLES[0])), (64, 48))
+    for ext in (".jpg", ".png", ".bmp"):
+        path = str(tmp_path / f"a{ext}")
+        cv2.imwrite(path, img)
+        assert image_file_complete(path), ext
+        with open(path, "rb") as f:
+            data = f.read()
+        with open(path, "wb") as f:
+            f.write(data[:len(data) // 2])
+        assert not image_file_complete(path), ext
+    assert not image_file_complete(str(tmp_path / "tidak_ada.jpg"))
+
+
+def test_image_file_complete_jpeg_end_marker(tmp_path):
+    img = cv2.resize(cv2.imread(os.path.join(INPUT_DIR, SMALL_SAMPLES[0])), (64, 48))
+    data = cv2.imencode(".jpg", img)[1].tobytes()
+    path = str(tmp_path / "a.jpg")
+    # padding byte nol setelah EOI tetap lengkap
+    with open(path, "wb") as f:
+        f.write(data + b"\x00" * 64)
+    assert image_file_complete(path)
+    # FF D9 milik thumbnail yang tertanam, gambar utamanya terpotong
+    with open(path, "wb") as f:
+        f.write(data + data[:len(data) // 2])
+    assert not image_file_complete(path)
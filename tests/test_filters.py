@@ -0,0 +1,86 @@
+"""Tahap filter dan before-after tanpa PIL, dibandingkan dengan versi lamanya."""
+import cv2
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from pengolahan_citra import (apply_point_stages, auto_exposure_stretch,
+                              auto_white_balance_grayworld, make_before_after_image)
+from pengolahan_citra.composite import _default_label_font
+from pengolahan_citra.stats import awb_luts, exposure_luts
+
+from conftest import ALL_SAMPLES, read_sample
+
+
+def exposure_reference(img_bgr, low_perc=1, high_perc=99):
+    """auto_exposure_stretch versi lama: np.percentile + stretch float."""
+    img_yuv = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2YCrCb)
+    Y = img_yuv[:, :, 0].astype(np.float32)
+    low = np.percentile(Y, low_perc)
+    high = np.percentile(Y, high_perc)
+    Y_stretch = (Y - low) * (255.0 / (high - low + 1e-8))
+    img_yuv[:, :, 0] = np.clip(Y_stretch, 0, 255).astype(np.uint8)
+    return cv2.cvtColor(img_yuv, cv2.COLOR_YCrCb2BGR)
+
+
+def before_after_reference(before_bgr, after_bgr, label_font):
+    """make_before_after_image versi lama (lewat PIL)."""
+    H = max(before_bgr.shape[0], after_bgr.shape[0])
+
+    def resize_to_h(img):
+        if img.shape[0] == H:
+            return img
+        return cv2.resize(img, (int(img.shape[1] * H / img.shape[0]), H))
+
+    combined = np.hstack((resize_to_h(before_bgr), resize_to_h(after_bgr)))
+    pil = Image.fromarray(cv2.cvtColor(combined, cv2.COLOR_BGR2RGB))
+    draw = ImageDraw.Draw(pil)
+    W = pil.size[0]
+    overlay = Image.new('RGBA', (W, 48), (0, 0, 0, 140))
+    pil.paste(overlay, (0, 0), overlay)
+    draw.text((12, 8), "BEFORE", font=label_font, fill=(255, 255, 255))
+    draw.text((W // 2 + 12, 8), "AFTER", font=label_font, fill=(255, 255, 255))
+    bg = Image.new('RGB', (pil.size[0] + 12, pil.size[1] + 12), (255, 255, 255))
+    bg.paste(pil, (6, 6))
+    return cv2.cvtColor(np.array(bg), cv2.COLOR_RGB2BGR)
+
+
+@pytest.mark.parametrize("name", ALL_SAMPLES)
+def test_exposure_matches_float_percentile(name):
+    img = read_sample(name)
+    assert np.array_equal(auto_exposure_stretch(img), exposure_reference(img))
+
+
+def test_exposure_matches_float_percentile_random():
+    rng = np.random.default_rng(1)
+    for shape in [(1, 1, 3), (7, 13, 3), (101, 57, 3)]:
+        img = rng.integers(0, 256, shape, dtype=np.uint8)
+        for perc in [(1, 99), (5, 95), (0, 100)]:
+            assert np.array_equal(auto_exposure_stretch(img, *perc),
+                                  exposure_reference(img, *perc)), (shape, perc)
+
+
+@pytest.mark.parametrize("name", ALL_SAMPLES)
+def test_composed_luts_match_sequential_stages(name):
+    img = read_sample(name)
+    # dua tahap di ruang warna yang sama: histogram tahap kedua dipetakan
+    # lewat LUT tahap pertama, bukan dihitung ulang dari gambar
+    twice = auto_white_balance_grayworld(auto_white_balance_grayworld(img))
+    assert np.array_equal(apply_point_stages(img, [awb_luts, awb_luts]), twice)
+
+    ycrcb = cv2.cvtColor(img, cv2.COLOR_BGR2YCrCb)
+    out = cv2.cvtColor(apply_point_stages(ycrcb, [exposure_luts]), cv2.COLOR_YCrCb2BGR)
+    assert np.array_equal(out, auto_exposure_stretch(img))
+
+
+def test_before_after_matches_pil():
+    rng = np.random.default_rng(2)
+    font = _default_label_font()
+    pairs = [(read_sample("noise.jpg"), read_sample("cahaya_rendah.jpg")),
+             (read_sample("kontras_rendah.jpg"), read_sample("noise.jpg"))]
+    for h1, w1, h2, w2 in [(30, 40, 30, 40), (120, 90, 80, 200), (5, 3, 9, 2)]:
+        pairs.append((rng.integers(0, 256, (h1, w1, 3), dtype=np.uint8),
+                      rng.integers(0, 256, (h2, w2, 3), dtype=np.uint8)))
+    for before, after in pairs:
+        assert np.array_equal(make_before_after_image(before, after),
+                              before_after_reference(before, after, font))
@@ -0,0 +1,133 @@
+"""
+Kesetaraan mode pipeline pada gambar contoh: setiap mode harus
+menghasilkan output yang sama persis dengan pipeline klasik.
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from pengolahan_citra import (BufferPool, FaceBoxCache, ImageStats, StageCache, StageProfiler,
+                              enhancement_pipeline, run_presets)
+
+from conftest import SMALL_SAMPLES, read_sample
+
+_CLASSIC = {}
+
+
+def classic(name, face_cascade, **stages):
+    """Output pipeline klasik (di-cache per gambar & opsi)."""
+    key = (name, tuple(sorted(stages.items())))
+    if key not in _CLASSIC:
+        _CLASSIC[key] = enhancement_pipeline(read_sample(name), face_cascade, **stages)
+    return _CLASSIC[key]
+
+
+@pytest.mark.parametrize("name", SMALL_SAMPLES)
+@pytest.mark.parametrize("stages", [{}, {"do_hdr": False}, {"do_denoise": False,
+                                                             "do_final_tone": False}])
+def test_fused_matches_classic(name, stages, face_cascade):
+    out = enhancement_pipeline(read_sample(name), face_cascade, fused=True, **stages)
+    assert np.array_equal(out, classic(name, face_cascade, **stages))
+
+
+@pytest.mark.parametrize("name", SMALL_SAMPLES)
+def test_point_stages_only_match_classic(name, face_cascade):
+    # hanya tahap point-wise: semuanya dijalankan sebagai LUT
+    stages = dict(do_denoise=False, do_face_beauty=False, do_hdr=False, do_sharpen=False)
+    out = enhancement_pipeline(read_sample(name), face_cascade, fused=True, **stages)
+    assert np.array_equal(out, classic(name, face_cascade, **stages))
+
+
+@pytest.mark.parametrize("name", SMALL_SAMPLES)
+def test_exact_tier_and_shared_stats_match_classic(name, face_cascade):
+    img = read_sample(name)
+    out = enhancement_pipeline(img, face_cascade, quality='exact', fused=True,
+                               stats=ImageStats(img))
+    assert np.array_equal(out, classic(name, face_cascade))
+
+
+def test_approximate_tiers(face_cascade):
+    img = read_sample("noise.jpg")
+    for quality in ("balanced", "fast"):
+        out = enhancement_pipeline(img, face_cascade, quality=quality)
+        assert out.shape == img.shape and out.dtype == img.dtype
+    with pytest.raises(ValueError):
+        enhancement_pipeline(img, face_cascade, quality="kilat")
+
+
+@pytest.mark.parametrize("name", SMALL_SAMPLES)
+def test_stage_cache_matches_classic(name, face_cascade):
+    img = read_sample(name)
+    cache = StageCache()
+    first = enhancement_pipeline(img, face_cascade, cache=cache, cache_key=name)
+    # semua tahap dari cache
+    again = enhancement_pipeline(img, face_cascade, cache=cache, cache_key=name)
+    # prefix dipakai ulang, hanya tahap setelah HDR dihitung ulang
+    no_sharpen = enhancement_pipeline(img, face_cascade, cache=cache, cache_key=name,
+                                      do_sharpen=False)
+    assert np.array_equal(first, classic(name, face_cascade))
+    assert np.array_equal(again, first)
+    assert np.array_equal(no_sharpen, classic(name, face_cascade, do_sharpen=False))
+
+
+@pytest.mark.parametrize("name", SMALL_SAMPLES)
+def test_buffer_pool_matches_classic(name, face_cascade):
+    img = read_sample(name)
+    pool = BufferPool()
+    for _ in range(2):
+        # putaran kedua memakai ulang buffer yang sudah dikembalikan
+        out = enhancement_pipeline(img, face_cascade, pool=pool)
+        assert np.array_equal(out, classic(name, face_cascade))
+        pool.release(out)
+    assert pool.reuses > 0
+
+
+@pytest.mark.parametrize("name", SMALL_SAMPLES)
+def test_face_cache_matches_classic(name, face_cascade):
+    img = read_sample(name)
+    faces = FaceBoxCache()
+    for _ in range(2):
+        out = enhancement_pipeline(img, face_cascade, face_cache=faces, cache_key=name)
+        assert np.array_equal(out, classic(name, face_cascade))
+
+
+@pytest.mark.parametrize("fused", [False, True])
+def test_profiled_matches_classic(fused, face_cascade):
+    name = "noise.jpg"
+    profile = StageProfiler(track_memory=True)
+    out = enhancement_pipeline(read_sample(name), face_cascade, fused=fused, profile=profile)
+    assert np.array_equal(out, classic(name, face_cascade))
+    totals = profile.totals()
+    assert "face_beauty" in totals
+    assert all(t["wall_s"] >= 0 and t["alloc_bytes"] >= 0 for t in totals.values())
+
+
+def test_profiler_cpu_time_is_per_thread():
+    # thread lain yang sibuk tidak ikut dihitung sebagai CPU tahap ini
+    stop = threading.Event()
+
+    def busy():
+        while not stop.is_set():
+            sum(range(1000))
+
+    other = threading.Thread(target=busy)
+    other.start()
+    try:
+        profile = StageProfiler()
+        profile.run("tidur", time.sleep, 0.3)
+    finally:
+        stop.set()
+        other.join()
+    rec = profile.records[0]
+    assert rec["wall_s"] >= 0.3 and rec["cpu_s"] < 0.1
+
+
+def test_presets_match_separate_runs(face_cascade):
+    name = "noise.jpg"
+    presets = {"penuh": {}, "natural": {"do_hdr": False, "do_face_beauty": False},
+               "tanpa_tone": {"do_final_tone": False}}
+    outs = run_presets(read_sample(name), face_cascade, presets)
+    for preset, stages in presets.items():
+        assert np.array_equal(outs[preset], classic(name, face_cascade, **stages)), preset
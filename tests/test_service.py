@@ -0,0 +1,98 @@
+"""
+Layanan HTTP: request enhance, opsi, metrik, validasi Content-Length,
+dan admission sebelum body dibaca.
+"""
+import http.client
+import json
+import os
+import socket
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from pengolahan_citra.service import EnhanceService, make_service_server
+
+from conftest import INPUT_DIR
+
+
+@pytest.fixture(scope="module")
+def server():
+    service = EnhanceService(workers=1, queue_size=0)
+    srv = make_service_server(service, port=0)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield service, srv.server_address[1]
+    srv.shutdown()
+    srv.server_close()
+    service.close()
+
+
+def _request(port, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        conn.request(method, path, body)
+        resp = conn.getresponse()
+        return resp.status, resp.getheader("Content-Type"), resp.read()
+    finally:
+        conn.close()
+
+
+def test_enhance_round_trip(server):
+    service, port = server
+    with open(os.path.join(INPUT_DIR, "noise.jpg"), "rb") as f:
+        data = f.read()
+    status, ctype, body = _request(port, "POST", "/enhance?do_hdr=0", data)
+    assert (status, ctype) == (200, "image/jpeg")
+    out = cv2.imdecode(np.frombuffer(body, np.uint8), cv2.IMREAD_COLOR)
+    assert out.shape == cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR).shape
+
+    status, ctype, body = _request(port, "POST", "/enhance?before_after=1", data)
+    assert status == 200 and ctype.startswith("multipart/mixed")
+    assert body.count(b"Content-Type: image/jpeg") == 2
+
+    assert json.loads(_request(port, "GET", "/metrics")[2])["completed"] == 2
+
+
+@pytest.mark.parametrize("path, body, code", [
+    ("/enhance?warna=1", b"x", 400),
+    ("/enhance?do_hdr=mungkin", b"x", 400),
+    ("/enhance", b"bukan gambar", 400),
+    ("/lain", b"x", 404),
+])
+def test_bad_requests(server, path, body, code):
+    _, port = server
+    assert _request(port, "POST", path, body)[0] == code
+
+
+def _status(port, headers):
+    """Mengirim header POST /enhance tanpa body, mengembalikan kode status."""
+    with socket.create_connection(("127.0.0.1", port), timeout=10) as s:
+        s.sendall(b"POST /enhance HTTP/1.1\r\nHost: localhost\r\n" + headers + b"\r\n")
+        # respons error menutup koneksi: baca sampai habis
+        response = b""
+        while chunk := s.recv(4096):
+            response += chunk
+        return int(response.split()[1])
+
+
+@pytest.mark.parametrize("headers, code", [
+    (b"", 411),
+    (b"Content-Length: abc\r\n", 400),
+    (b"Content-Length: -5\r\n", 400),
+    (b"Content-Length: 0\r\n", 400),
+    (b"Content-Length: 999999999999\r\n", 413),
+])
+def test_content_length_validated(server, headers, code):
+    _, port = server
+    assert _status(port, headers) == code
+
+
+def test_full_queue_rejected_before_body(server):
+    service, port = server
+    service.reserve()
+    try:
+        # body tidak pernah dikirim: 503 harus datang tanpa menunggu body
+        assert _status(port, b"Content-Length: 100000\r\n") == 503
+    finally:
+        service.unreserve()
@@ -0,0 +1,57 @@
+"""Mode tiled: CLAHE per sel dan kesetaraan dengan pipeline biasa."""
+import cv2
+import numpy as np
+import pytest
+
+from pengolahan_citra import enhancement_pipeline
+from pengolahan_citra.tiled import _ClaheCellHistograms, clahe_interpolate
+
+from conftest import ALL_SAMPLES, SMALL_SAMPLES, read_sample
+
+# AWB & exposure memakai statistik global yang sama dengan pipeline biasa
+POINT_ONLY = dict(do_denoise=False, do_face_beauty=False, do_hdr=False, do_sharpen=False,
+                  do_final_tone=False)
+
+
+@pytest.mark.parametrize("name", ALL_SAMPLES)
+def test_clahe_matches_opencv(name):
+    img = read_sample(name)
+    Y = cv2.cvtColor(img, cv2.COLOR_BGR2YCrCb)[:, :, 0]
+    expected = cv2.createCLAHE(clipLimit=2.2, tileGridSize=(8, 8)).apply(Y)
+
+    hists = _ClaheCellHistograms(img.shape)
+    hists.add_band(img, 0)
+    hists.add_border(img)
+    luts = hists.luts(clipLimit=2.2)
+    cell = (hists.tw, hists.th)
+
+    assert np.array_equal(clahe_interpolate(Y, 0, 0, luts, cell), expected)
+    # potongan di tengah gambar (seperti satu tile) memberi hasil yang sama
+    r0, c0 = Y.shape[0] // 3, Y.shape[1] // 3
+    part = clahe_interpolate(Y[r0:, c0:], r0, c0, luts, cell)
+    assert np.array_equal(part, expected[r0:, c0:])
+
+
+@pytest.mark.parametrize("name", SMALL_SAMPLES)
+def test_single_tile_matches_pipeline(name, face_cascade):
+    img = read_sample(name)
+    expected = enhancement_pipeline(img, face_cascade)
+    out = enhancement_pipeline(img, face_cascade, tile_budget_mb=512)
+    assert np.array_equal(out, expected)
+
+
+@pytest.mark.parametrize("name", SMALL_SAMPLES)
+def test_point_stages_tiled_match_pipeline(name, face_cascade):
+    img = read_sample(name)
+    expected = enhancement_pipeline(img, face_cascade, **POINT_ONLY)
+    out = enhancement_pipeline(img, face_cascade, tile_budget_mb=4, **POINT_ONLY)
+    assert np.array_equal(out, expected)
+
+
+def test_multi_tile_within_tolerance(face_cascade):
+    img = read_sample("kontras_rendah.jpg")
+    expected = enhancement_pipeline(img, face_cascade)
+    out = enhancement_pipeline(img, face_cascade, tile_budget_mb=4)
+    diff = np.abs(out.astype(np.int16) - expected)
+    assert diff.max() <= 16
+    assert np.count_nonzero(diff > 1) < diff.size // 100
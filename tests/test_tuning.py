@@ -0,0 +1,54 @@
+"""Auto-tune: kandidat yang dicoba, pemakaian profil tuning, dan gambar contoh."""
+import json
+import os
+
+from pengolahan_citra import cli
+from pengolahan_citra.tuning import (auto_tune, batch_settings, machine_fingerprint,
+                                     tune_candidates, tuning_key, tuning_path)
+
+
+def test_tune_candidates_do_not_oversubscribe():
+    assert tune_candidates(1) == [(1, 1)]
+    for cores in (4, 6):
+        pairs = tune_candidates(cores)
+        assert all(w * t <= cores for w, t in pairs)
+        assert (1, cores) in pairs and (cores, 1) in pairs
+
+
+def test_batch_settings_from_profile(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    options = {'do_hdr': False}
+    assert batch_settings(options) == (None, None, None, None)
+
+    entry = {'workers': 3, 'cv_threads': 2, 'queue_depth': 7, 'tile_budget_mb': 256,
+             'images_per_s': 1.0, 'created': 1}
+    path = tuning_path()
+    (tmp_path / "image_enhancer").mkdir()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'machine': machine_fingerprint(),
+                   'entries': {tuning_key(options): entry}}, f)
+
+    assert batch_settings(options) == (3, 2, 7, entry)
+    # nilai dari pemanggil diutamakan
+    assert batch_settings(options, queue_depth=4)[:3] == (3, 2, 4)
+    assert batch_settings(options, workers=2)[:3] == (2, None, None)
+    assert batch_settings(options, tuning=False)[:3] == (None, None, None)
+
+
+def test_auto_tune_without_readable_samples_falls_back(tmp_path):
+    folder = tmp_path / "contoh"
+    folder.mkdir()
+    (folder / "rusak.jpg").write_bytes(b"bukan jpeg")
+    profile = tmp_path / "tuning.json"
+    messages = []
+
+    assert auto_tune(str(folder), path=str(profile), log=messages.append) is None
+    assert not os.path.exists(profile)
+    assert any("pengaturan bawaan" in m for m in messages)
+
+
+def test_tune_cli_requires_sample_folder(tmp_path, monkeypatch, capsys):
+    # default input/ dicari di folder kerja, bukan di lokasi paket
+    monkeypatch.chdir(tmp_path)
+    assert cli.main(["--tune"]) == 2
+    assert str(tmp_path / "input") in capsys.readouterr().err
@@ -0,0 +1,74 @@
+"""Mode video / urutan frame."""
+import threading
+import time
+
+import cv2
+
+from pengolahan_citra.video import enhance_video
+
+from conftest import read_sample
+
+
+def write_frames(folder, count=6):
+    base = cv2.resize(read_sample("noise.jpg"), (96, 64))
+    for i in range(count):
+        cv2.imwrite(str(folder / f"{i:04d}.png"), cv2.add(base, i * 5))
+    return str(folder / "%04d.png")
+
+
+def test_frame_sequence_round_trip(tmp_path, face_cascade):
+    (tmp_path / "in").mkdir()
+    src = write_frames(tmp_path / "in")
+    dst = str(tmp_path / "out" / "%04d.png")
+
+    result = enhance_video(src, dst, face_cascade=face_cascade, workers=2,
+                           queue_depth=2, stats_interval=2)
+    assert result["frames"] == 6
+    for i in range(6):
+        out = cv2.imread(dst % i)
+        assert out is not None and out.shape == (64, 96, 3)
+
+
+_VideoCapture = cv2.VideoCapture
+
+
+class _SlowCapture:
+    """VideoCapture yang lambat: thread utama menunggu di antrean frame yang kosong."""
+    def __init__(self, src):
+        self.cap = _VideoCapture(src)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def read(self, buf=None):
+        time.sleep(0.05)
+        return self.cap.read(buf)
+
+    def release(self):
+        self.cap.release()
+
+
+def test_write_failure_returns_error(tmp_path, face_cascade, monkeypatch):
+    (tmp_path / "in").mkdir()
+    src = write_frames(tmp_path / "in", count=12)
+    # frame ke-3 tidak bisa ditulis: path-nya berupa folder
+    (tmp_path / "out" / "0003.png").mkdir(parents=True)
+    dst = str(tmp_path / "out" / "%04d.png")
+    monkeypatch.setattr(cv2, "VideoCapture", _SlowCapture)
+
+    errors = []
+
+    def run():
+        try:
+            enhance_video(src, dst, face_cascade=face_cascade, workers=2, queue_depth=2)
+        except ValueError as e:
+            errors.append(e)
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    t.join(60)
+    assert not t.is_alive(), "enhance_video menggantung setelah penulis gagal"
+    assert len(errors) == 1 and "0003.png" in str(errors[0])